@@ -0,0 +1,260 @@
+import os
+import sys
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import shapely
+from .logger_creator import CreateLogger
+from .region_index import load_region_index
+from .data_fetcher import run_pipeline
+from .pipeline_spec import PipelineSpec, compile_pipeline, load_template_stages
+
+logger = CreateLogger('BatchFetch')
+logger = logger.get_default_logger()
+
+
+class FieldResult(NamedTuple):
+    """Cloud points of a single field of a batch."""
+    field_id: object
+    access_url: str
+    cloud_points: np.ndarray
+
+
+def get_field_regions(bounds: np.array, catalog_file: str = '') -> list:
+    """Finds the region variant of every field, the one containing the field bounds ranked first by coverage.
+
+    Parameters
+    ----------
+    bounds : np.array
+        (minx, miny, maxx, maxy) of every field in EPSG:3857
+    catalog_file : str, optional
+        Catalog to search, see region_index.load_region_index
+
+    Returns
+    -------
+    list
+        Access url of the region of every field, '' for fields no region contains
+    """
+    index = load_region_index(catalog_file)
+    regions = []
+    for minx, miny, maxx, maxy in bounds:
+        candidates = index.query(minx, miny, maxx, maxy, predicate='contains')
+        regions.append(candidates[0].access_url if len(
+            candidates) > 0 else '')
+
+    return regions
+
+
+def group_fields(bounds: np.array, regions: list, group_size: float = 2000, max_fields: int = 64) -> list:
+    """Groups fields of the same region which are close to each other, so each group is fetched with a
+    single read. Fields are bucketed by the grid cell of size group_size their center falls in.
+
+    Parameters
+    ----------
+    bounds : np.array
+        (minx, miny, maxx, maxy) of every field in EPSG:3857
+    regions : list
+        Access url of the region of every field
+    group_size : float, optional
+        Width and height of the grid cells fields are bucketed in, in meters
+    max_fields : int, optional
+        Maximum number of fields in a group, larger buckets are split along x
+
+    Returns
+    -------
+    list
+        Access url and field indices of every group
+    """
+    if(len(bounds) == 0):
+        return []
+
+    centers = (bounds[:, :2] + bounds[:, 2:]) / 2
+    cells = np.floor(centers / group_size).astype(np.int64)
+    region_names, region_ids = np.unique(
+        np.asarray(regions, dtype=object).astype(str), return_inverse=True)
+
+    # Sorting by region, cell and x keeps the fields of a bucket consecutive and ordered along x
+    order = np.lexsort((centers[:, 0], cells[:, 1], cells[:, 0], region_ids))
+    keys = np.stack(
+        (region_ids[order], cells[order, 0], cells[order, 1]), axis=1)
+    starts = np.flatnonzero(np.concatenate(
+        ([True], (keys[1:] != keys[:-1]).any(axis=1))))
+
+    groups = []
+    for start, stop in zip(starts, np.append(starts[1:], len(order))):
+        for chunk_start in range(start, stop, max_fields):
+            groups.append((region_names[region_ids[order[start]]],
+                           order[chunk_start:min(chunk_start + max_fields, stop)]))
+
+    return groups
+
+
+def split_points(cloud_points: np.array, polygons: list) -> list:
+    """Assigns the cloud points of a shared read to the fields containing them, with vectorized point in
+    polygon tests limited to the points within the x range of every field.
+
+    Parameters
+    ----------
+    cloud_points : np.array
+        Cloud points with x, y and z values in a single element
+    polygons : list
+        Field polygons, in the CRS of the cloud points
+
+    Returns
+    -------
+    list
+        Indices of the cloud points inside every field
+    """
+    order = np.argsort(cloud_points[:, 0], kind='stable')
+    sorted_x = cloud_points[order, 0]
+
+    indices = []
+    for polygon in polygons:
+        minx, miny, maxx, maxy = polygon.bounds
+        candidates = order[np.searchsorted(
+            sorted_x, minx, side='left'):np.searchsorted(sorted_x, maxx, side='right')]
+        y = cloud_points[candidates, 1]
+        candidates = candidates[(y >= miny) & (y <= maxy)]
+
+        # Points on the boundary belong to the field too, like filters.crop keeps them
+        shapely.prepare(polygon)
+        inside = shapely.intersects_xy(
+            polygon, cloud_points[candidates, 0], cloud_points[candidates, 1])
+        indices.append(np.sort(candidates[inside]))
+
+    return indices
+
+
+class BatchFetcher():
+    """Fetches the cloud points of many field polygons at once. Fields are grouped by region and proximity,
+    every group is read with a single Pdal pipeline cropped to its fields, and the points are split back to
+    the fields. The catalog, the pipeline template and the reprojection of the fields are shared by the
+    whole batch.
+
+    Parameters
+    ----------
+    fields : gpd.GeoDataFrame or str
+        Field polygons with a CRS, or the path of a file geopandas can read (e.g a shapefile)
+    epsg : str
+        CRS the cloud points are returned in
+    id_column : str, optional
+        Column identifying the fields, the index is used if not provided
+    group_size : float, optional
+        Width and height in meters of the areas nearby fields are merged in
+    max_fields : int, optional
+        Maximum number of fields sharing a read
+    catalog_file : str, optional
+        Catalog to search the regions in, see region_index.load_region_index
+    template_file : str, optional
+        Pipeline template the pipelines are built from
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, fields, epsg: str, id_column: str = '', group_size: float = 2000, max_fields: int = 64,
+                 catalog_file: str = '', template_file: str = './pipeline_template.json') -> None:
+        try:
+            if(isinstance(fields, (str, os.PathLike))):
+                import geopandas as gpd
+
+                fields = gpd.read_file(fields)
+
+            self.epsg = epsg
+            self.field_ids = list(
+                fields[id_column] if id_column != '' else fields.index)
+            self.web_polygons = list(fields.geometry.to_crs(epsg=3857))
+            self.polygons = list(fields.geometry.to_crs(epsg=epsg))
+
+            self.template_stages = load_template_stages(template_file)
+
+            bounds = np.array([polygon.bounds for polygon in self.web_polygons]).reshape(-1, 4)
+            self.regions = get_field_regions(bounds, catalog_file)
+
+            missing = [field_id for field_id, region in zip(
+                self.field_ids, self.regions) if region == '']
+            if(len(missing) > 0):
+                logger.warning(
+                    f'{len(missing)} Fields Not Contained in Any Region, Skipping: {missing[:10]}')
+
+            self.groups = [(region, indices) for region, indices in group_fields(
+                bounds, self.regions, group_size, max_fields) if region != '']
+
+            logger.info(
+                f'Successfully Grouped {len(self.field_ids) - len(missing)} Fields in {len(self.groups)} Reads')
+
+        except Exception as e:
+            logger.exception('Failed to Instantiate BatchFetcher Class Object')
+            sys.exit(1)
+
+    def get_group_pipeline(self, access_url: str, indices: np.array) -> str:
+        """Builds the pipeline of a group, reading the bounds of its fields and cropping to the fields.
+
+        Parameters
+        ----------
+        access_url : str
+            Access url of the region's ept.json file
+        indices : np.array
+            Indices of the fields of the group
+
+        Returns
+        -------
+        str
+            Pipeline JSON
+        """
+        polygons = [self.web_polygons[index] for index in indices]
+        minx, miny, maxx, maxy = [float(value)
+                                  for value in shapely.total_bounds(polygons)]
+
+        stages = self.template_stages
+
+        return compile_pipeline(PipelineSpec((
+            stages['reader'].with_options(
+                bounds=f"({[minx, maxx]},{[miny, maxy]})", filename=access_url),
+            stages['cropping_filter'].with_options(
+                polygon=[polygon.wkt for polygon in polygons]),
+            stages['range_filter'], stages['assign_filter'],
+            stages['reprojection_filter'].with_options(out_srs=f"EPSG:{self.epsg}"))))
+
+    def split_group(self, indices: np.array, access_url: str, cloud_points: np.array) -> list:
+        field_points = split_points(
+            cloud_points, [self.polygons[index] for index in indices])
+
+        return [FieldResult(self.field_ids[index], access_url, cloud_points[points])
+                for index, points in zip(indices, field_points)]
+
+    def fetch(self, max_workers: int = 0, dtype: type = np.float64, worker=run_pipeline):
+        """Fetches every group, yielding the results of the fields of a group as soon as its read finishes.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Maximum number of reads running at the same time, defaults to the number of cores. With 1 the
+            reads run one after the other in the current process
+        dtype : type, optional
+            Numeric type of the cloud points
+        worker : callable, optional
+            Picklable function executing a pipeline JSON and returning its cloud points
+
+        Returns
+        -------
+        generator
+            FieldResult of every field, in completion order
+        """
+        pipelines = [self.get_group_pipeline(region, indices)
+                     for region, indices in self.groups]
+        max_workers = min(max_workers if max_workers > 0 else (
+            os.cpu_count() or 1), max(len(pipelines), 1))
+
+        if(max_workers == 1):
+            for (region, indices), pipeline_json in zip(self.groups, pipelines):
+                yield from self.split_group(indices, region, worker(pipeline_json, dtype))
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(worker, pipeline_json, dtype): group
+                       for group, pipeline_json in zip(self.groups, pipelines)}
+            for future in as_completed(futures):
+                region, indices = futures[future]
+                yield from self.split_group(indices, region, future.result())
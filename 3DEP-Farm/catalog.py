@@ -0,0 +1,264 @@
+import os
+import struct
+from json import dumps, loads
+import numpy as np
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('Catalog')
+logger = logger.get_default_logger()
+
+CATALOG_MAGIC = b'DEPCAT01'
+SECTION_ALIGNMENT = 64
+
+# Catalogs already opened in this process, keyed by the absolute catalog path
+_loaded_catalogs = {}
+
+
+class StringColumn():
+    """Read only column of strings stored as one UTF-8 byte buffer plus offsets, strings are only
+    decoded when they are accessed.
+
+    Parameters
+    ----------
+    data : np.array
+        uint8 array of all the encoded strings joined together
+    offsets : np.array
+        int64 array of string start offsets, with the end offset of the last string appended
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, data: np.array, offsets: np.array) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if(index < 0):
+            index += len(self)
+        if(index < 0 or index >= len(self)):
+            raise IndexError('StringColumn index out of range')
+
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_list(self) -> list:
+        return list(self)
+
+
+def encode_strings(values: list) -> tuple:
+    """Encodes a list of strings into a StringColumn byte buffer and offsets.
+
+    Parameters
+    ----------
+    values : list
+        Strings to encode
+
+    Returns
+    -------
+    tuple
+        uint8 data array and int64 offsets array
+    """
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+class Catalog():
+    """Compiled AWS dataset catalog with one row per region variant, whose columns are memory mapped
+    straight from the catalog file.
+
+    Parameters
+    ----------
+    columns : dict
+        Column name to array mapping, string columns are StringColumn instances
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, columns: dict) -> None:
+        self.columns = columns
+
+        self.bounds = columns['bounds']
+        self.points = columns['points']
+        self.regions = columns['regions']
+        self.years = columns['years']
+        self.access_urls = columns['access_urls']
+        self.folders = columns['folders']
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def get_folder_set(self) -> set:
+        """Returns the folder names of the AWS dataset as a set, built the first time it is requested.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        set
+            Folder names of the AWS dataset storage
+        """
+        if(not hasattr(self, 'folder_set')):
+            self.folder_set = set(self.folders)
+
+        return self.folder_set
+
+
+def get_variant_bounds(bounds: list, variants: int) -> list:
+    """Matches the bounds of an aws_dataset.csv row to its region variants. Regions with the same bounds are
+    merged into a single row by merge_similar_bounds, which keeps one bound for the years and access urls of
+    every merged region, so the last bound is repeated for the variants without one of their own.
+
+    Parameters
+    ----------
+    bounds : list
+        Bounds of the row
+    variants : int
+        Number of region variants of the row, the length of its access url list
+
+    Returns
+    -------
+    list
+        One bound per region variant
+    """
+    return list(bounds) + [bounds[-1]] * (variants - len(bounds))
+
+
+def write_catalog(file_name: str, bounds: np.array, points: np.array, regions: list, years: list, access_urls: list, folders: list) -> None:
+    """Writes a compiled catalog file. The file holds a small JSON header describing every column
+    followed by the raw, aligned column buffers. It is laid out for memory mapping, not for size: uncompressed
+    and with the folder names, the shipped catalog is about as large as aws_dataset.csv and filename.txt together.
+
+    Parameters
+    ----------
+    file_name : str
+        Path plus file name of the catalog file
+    bounds : np.array
+        (minx, miny, minz, maxx, maxy, maxz) bounds of every region variant
+    points : np.array
+        Number of points of every region variant, -1 where unknown
+    regions : list
+        Region name of every region variant
+    years : list
+        Year of every region variant
+    access_urls : list
+        Access url of every region variant
+    folders : list
+        Folder names located in the AWS dataset storage
+
+    Returns
+    -------
+    None
+    """
+    arrays = {
+        'bounds': np.ascontiguousarray(bounds, dtype='<f8').reshape(-1, 6),
+        'points': np.ascontiguousarray(points, dtype='<i8'),
+    }
+    for name, values in [('regions', regions), ('years', years), ('access_urls', access_urls), ('folders', folders)]:
+        arrays[f'{name}.data'], arrays[f'{name}.offsets'] = encode_strings(
+            values)
+
+    # The header length depends on the offsets it lists, so fix the offsets on a generous header size
+    header_size = SECTION_ALIGNMENT * 32
+    header = {}
+    offset = header_size
+    for name, array in arrays.items():
+        header[name] = {'dtype': array.dtype.str,
+                        'shape': list(array.shape), 'offset': offset}
+        offset += int(np.ceil(array.nbytes / SECTION_ALIGNMENT)) * \
+            SECTION_ALIGNMENT
+
+    encoded_header = dumps(header).encode('utf-8')
+    prefix = CATALOG_MAGIC + struct.pack('<Q', len(encoded_header))
+    if(len(prefix) + len(encoded_header) > header_size):
+        raise ValueError('Catalog header does not fit the reserved space')
+
+    temp_file_name = file_name + '.tmp'
+    with open(temp_file_name, 'wb') as file_handler:
+        file_handler.write(prefix + encoded_header)
+        for name, array in arrays.items():
+            file_handler.seek(header[name]['offset'])
+            file_handler.write(array.tobytes())
+        file_handler.truncate(offset)
+
+    os.replace(temp_file_name, file_name)
+
+    logger.info(f'Successfully Wrote Compiled Catalog to {file_name}')
+
+
+def read_catalog(file_name: str) -> Catalog:
+    """Memory maps a compiled catalog file.
+
+    Parameters
+    ----------
+    file_name : str
+        Path plus file name of the catalog file
+
+    Returns
+    -------
+    Catalog
+        Catalog whose columns are views into the memory mapped file
+    """
+    buffer = np.memmap(file_name, dtype=np.uint8, mode='r')
+
+    if(bytes(buffer[:len(CATALOG_MAGIC)]) != CATALOG_MAGIC):
+        raise ValueError(f'{file_name} is not a compiled catalog file')
+
+    header_length, = struct.unpack(
+        '<Q', bytes(buffer[len(CATALOG_MAGIC):len(CATALOG_MAGIC) + 8]))
+    header_start = len(CATALOG_MAGIC) + 8
+    header = loads(bytes(buffer[header_start:header_start + header_length]))
+
+    arrays = {}
+    for name, description in header.items():
+        dtype = np.dtype(description['dtype'])
+        shape = tuple(description['shape'])
+        size = int(np.prod(shape)) * dtype.itemsize
+        start = description['offset']
+        arrays[name] = buffer[start:start + size].view(dtype).reshape(shape)
+
+    columns = {}
+    for name in list(arrays):
+        if(name.endswith('.data')):
+            column = name[:-len('.data')]
+            columns[column] = StringColumn(
+                arrays[name], arrays[column + '.offsets'])
+        elif(not name.endswith('.offsets')):
+            columns[name] = arrays[name]
+
+    return Catalog(columns)
+
+
+def load_catalog(file_name: str = './aws_dataset.catalog') -> Catalog:
+    """Loads a compiled catalog, memory mapping it only the first time it is requested in the process.
+
+    Parameters
+    ----------
+    file_name : str, optional
+        Path plus file name of the catalog file
+
+    Returns
+    -------
+    Catalog
+        The compiled catalog
+    """
+    key = os.path.abspath(file_name)
+    if(key not in _loaded_catalogs):
+        _loaded_catalogs[key] = read_catalog(file_name)
+        logger.info(f'Successfully Loaded Compiled Catalog from {file_name}')
+
+    return _loaded_catalogs[key]
@@ -0,0 +1,335 @@
+"""Command line entry point of 3DEP-Farm.
+
+    depfarm fetch --bounds -93.756 41.918 -93.747 41.921 --epsg 4326 --output field.laz
+    depfarm sample field.laz sampled.npy --method grid --size 2
+    depfarm export sampled.npy sampled.xyz
+    depfarm serve --port 8642 --workers 4
+
+Only the modules a command needs are imported, so short lived jobs start within STARTUP_BUDGET seconds.
+"""
+import os
+import sys
+import logging
+import argparse
+import numpy as np
+from .exporters import WRITERS, EXTENSIONS, get_file_format, export_chunks, export_points, load_npy
+from .subsampler import CloudSubSampler, iter_array_chunks, iter_las_chunks
+
+# Seconds a command may spend importing and parsing its arguments before doing any work
+STARTUP_BUDGET = 1.0
+
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+
+def get_ascii_delimiter(file_name: str) -> str:
+    """Finds the delimiter of an ASCII point file from its first line, ';' as written by the package
+    exporters, ',' or whitespace.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the point file
+
+    Returns
+    -------
+    str
+        Delimiter to pass to np.loadtxt, None for whitespace
+    """
+    with open(file_name, 'r') as file_handler:
+        line = file_handler.readline()
+
+    for delimiter in [';', ',']:
+        if(delimiter in line):
+            return delimiter
+
+    return None
+
+
+def iter_file_chunks(file_name: str, chunk_size: int = 1000000, dtype: type = np.float64):
+    """Streams the points of a LAS/LAZ, .npy or ASCII (x;y;z, x,y,z or x y z per line) file in chunks.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the point file
+    chunk_size : int, optional
+        Number of points in a single chunk
+    dtype : type, optional
+        Numeric type of the returned points
+
+    Returns
+    -------
+    generator
+        Chunks of at most chunk_size points
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if(extension in ['.las', '.laz']):
+        return iter_las_chunks(file_name, chunk_size, dtype=dtype)
+    elif(extension == '.npy'):
+        points = load_npy(file_name)
+    else:
+        points = np.loadtxt(file_name, dtype=dtype, delimiter=get_ascii_delimiter(file_name), ndmin=2)[:, :3]
+
+    return (chunk.astype(dtype, copy=False) for chunk in iter_array_chunks(points, chunk_size))
+
+
+def fetch_points(bounds: list, epsg: str = '4326', region: str = '', multi_region: bool = False, tile_size: float = 0,
+                 workers: int = 0, dtype: type = np.float64, cache=None, metrics=None, spacing: float = 0,
+                 point_budget: int = 0) -> np.array:
+    """Fetches the cloud points of an area.
+
+    Parameters
+    ----------
+    bounds : list
+        (minx, miny, maxx, maxy) of the area in the EPSG CRS
+    epsg : str, optional
+        CRS of the bounds and of the returned points
+    region : str, optional
+        Region to read from, searched in the catalog if not provided
+    multi_region : bool, optional
+        To merge every region intersecting the bounds
+    tile_size : float, optional
+        If provided, tiles of this size in meters are fetched in parallel
+    workers : int, optional
+        Parallel reads of tiled and multi region fetches, defaults to the number of cores
+    dtype : type, optional
+        Numeric type of the cloud points
+    cache : FetchCache, optional
+        On-disk cache of fetched cloud points
+    metrics : Metrics, optional
+        Metrics the fetch is recorded in
+    spacing : float, optional
+        If provided, only the EPT octree depths needed for this ground spacing in metres are read
+    point_budget : int, optional
+        If provided instead of a spacing, only the EPT octree depths fitting this many points are read
+
+    Returns
+    -------
+    np.array
+        Cloud points with x, y and z values in a single element
+    """
+    from shapely.geometry import box
+    from .data_fetcher import DataFetcher
+
+    fetcher = DataFetcher(box(*bounds), epsg, region=region,
+                          multi_region=multi_region, metrics=metrics)
+    fetcher.limit_resolution(spacing, point_budget)
+
+    if(multi_region):
+        fetcher.get_data_multi_region(max_workers=workers, dtype=dtype)
+    elif(tile_size > 0):
+        fetcher.get_data_tiled(tile_size=tile_size,
+                               max_workers=workers, dtype=dtype)
+    else:
+        fetcher.construct_simple_pipeline()
+        fetcher.get_data(dtype=dtype, lazy_geodf=True, cache=cache)
+
+    return fetcher.cloud_points
+
+
+def sample_points(input: str, method: str = 'grid', size: float = 1, sampling_type: str = 'closest', seed: int = None,
+                  chunk_size: int = 0) -> np.array:
+    """Subsamples the points of a file.
+
+    Parameters
+    ----------
+    input : str
+        LAS/LAZ, .npy or ASCII point file
+    method : str, optional
+        Sampling method, grid, distance or factor
+    size : float, optional
+        Voxel size of grid sampling, minimum distance of distance sampling or factor of factor sampling
+    sampling_type : str, optional
+        Point kept in every voxel by grid sampling, closest or barycenter
+    seed : int, optional
+        Seed of the point order of distance sampling
+    chunk_size : int, optional
+        If provided, LAS/LAZ files are streamed in chunks of this size
+
+    Returns
+    -------
+    np.array
+        The sampled points
+    """
+    if(method not in ['grid', 'distance', 'factor']):
+        raise ValueError(f'Unknown sampling method {method}')
+
+    if(os.path.splitext(input)[1].lower() in ['.las', '.laz']):
+        sampler = CloudSubSampler(file_name=input, chunk_size=chunk_size)
+    else:
+        sampler = CloudSubSampler(np.concatenate(
+            list(iter_file_chunks(input))))
+
+    if(method == 'grid'):
+        return sampler.get_grid_subsampling(
+            size, 'closest' if sampling_type == 'closest' else 'barycenter_sample')
+    elif(method == 'distance'):
+        return sampler.get_distance_subsampling(size, seed=seed)
+
+    return sampler.get_factor_subsampling(int(size))
+
+
+def fetch(args: argparse.Namespace) -> int:
+    from .fetch_cache import FetchCache
+
+    dtype = DTYPES[args.dtype]
+    if(args.chunk_size > 0 and not args.multi_region and args.tile_size == 0):
+        from shapely.geometry import box
+        from .data_fetcher import DataFetcher
+
+        # Streams the points to the file without holding the whole cloud
+        fetcher = DataFetcher(box(*args.bounds), args.epsg, region=args.region)
+        fetcher.construct_simple_pipeline(args.spacing, args.point_budget)
+
+        return fetcher.export_cloud_points_stream(args.output, args.format, args.chunk_size, dtype, epsg=args.epsg)
+
+    points = fetch_points(args.bounds, args.epsg, args.region, args.multi_region, args.tile_size, args.workers,
+                          dtype, FetchCache(args.cache) if args.cache != '' else None,
+                          spacing=args.spacing, point_budget=args.point_budget)
+
+    return export_points(args.output, points, args.format, epsg=args.epsg)
+
+
+def sample(args: argparse.Namespace) -> int:
+    points = sample_points(args.input, args.method, args.size,
+                           args.sampling_type, args.seed, args.chunk_size)
+
+    return export_points(args.output, points, args.format)
+
+
+def export(args: argparse.Namespace) -> int:
+    return export_chunks(args.output, iter_file_chunks(args.input, args.chunk_size, DTYPES[args.dtype]),
+                         args.format)
+
+
+def serve(args: argparse.Namespace) -> int:
+    from .service import FetchService
+
+    FetchService(args.workers, args.max_queued, args.cache).serve(
+        args.host, args.port, args.socket)
+
+    return 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='depfarm', description='Fetch, sample and export 3DEP point clouds.')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Only log warnings and errors')
+    commands = parser.add_subparsers(dest='command', required=True)
+    file_formats = sorted(WRITERS)
+
+    fetch_parser = commands.add_parser(
+        'fetch', help='Fetch the points of an area and write them to a file')
+    fetch_parser.add_argument('--bounds', nargs=4, type=float, required=True,
+                              metavar=('MINX', 'MINY', 'MAXX', 'MAXY'), help='Bounds of the area in the EPSG CRS')
+    fetch_parser.add_argument('--epsg', default='4326',
+                              help='CRS of the bounds and of the returned points')
+    fetch_parser.add_argument('--output', required=True,
+                              help='File the points are written to')
+    fetch_parser.add_argument('--region', default='',
+                              help='Region to read from, searched in the catalog if not provided')
+    fetch_parser.add_argument('--multi-region', action='store_true',
+                              help='Merge every region intersecting the bounds')
+    fetch_parser.add_argument('--tile-size', type=float, default=0,
+                              help='Fetch tiles of this size in meters in parallel')
+    fetch_parser.add_argument('--workers', type=int, default=0,
+                              help='Parallel reads of tiled and multi region fetches, defaults to the number of cores')
+    fetch_parser.add_argument('--chunk-size', type=int, default=0,
+                              help='Stream the points to the file in chunks of this size')
+    fetch_parser.add_argument('--cache', default='',
+                              help='Directory of the on-disk fetch cache, for single region fetches held in memory')
+    fetch_parser.add_argument('--spacing', type=float, default=0,
+                              help='Only read the EPT octree depths needed for this ground point spacing in metres')
+    fetch_parser.add_argument('--point-budget', type=int, default=0,
+                              help='Only read the EPT octree depths fitting this many points')
+    fetch_parser.set_defaults(handler=fetch)
+
+    sample_parser = commands.add_parser(
+        'sample', help='Subsample the points of a file')
+    sample_parser.add_argument('input', help='LAS/LAZ, .npy or ASCII point file')
+    sample_parser.add_argument('output', help='File the sampled points are written to')
+    sample_parser.add_argument('--method', choices=['grid', 'distance', 'factor'], default='grid',
+                               help='Sampling method')
+    sample_parser.add_argument('--size', type=float, required=True,
+                               help='Voxel size of grid sampling, minimum distance of distance sampling or factor of factor sampling')
+    sample_parser.add_argument('--sampling-type', choices=['closest', 'barycenter'], default='closest',
+                               help='Point kept in every voxel by grid sampling')
+    sample_parser.add_argument('--seed', type=int, default=None,
+                               help='Seed of the point order of distance sampling')
+    sample_parser.add_argument('--chunk-size', type=int, default=0,
+                               help='Stream LAS/LAZ input in chunks of this size')
+    sample_parser.set_defaults(handler=sample)
+
+    export_parser = commands.add_parser(
+        'export', help='Convert a point file to another format')
+    export_parser.add_argument('input', help='LAS/LAZ, .npy or ASCII point file')
+    export_parser.add_argument('output', help='File the points are written to')
+    export_parser.add_argument('--chunk-size', type=int, default=1000000,
+                               help='Number of points converted at once')
+    export_parser.set_defaults(handler=export)
+
+    serve_parser = commands.add_parser(
+        'serve', help='Serve fetch and sample jobs over a local HTTP or UNIX socket API')
+    serve_parser.add_argument('--host', default='127.0.0.1',
+                              help='Address to listen on')
+    serve_parser.add_argument('--port', type=int, default=8642,
+                              help='Port to listen on')
+    serve_parser.add_argument('--socket', default='',
+                              help='Listen on this UNIX socket instead of TCP')
+    serve_parser.add_argument('--workers', type=int, default=2,
+                              help='Number of jobs running at the same time')
+    serve_parser.add_argument('--max-queued', type=int, default=64,
+                              help='Maximum number of waiting jobs, further jobs are rejected until the queue drains')
+    serve_parser.add_argument('--cache', default='',
+                              help='Directory of the on-disk fetch cache')
+    serve_parser.set_defaults(handler=serve)
+
+    for command_parser in [fetch_parser, sample_parser, export_parser]:
+        command_parser.add_argument('--format', choices=file_formats, default='',
+                                    help=f'Output format, taken from the output extension ({", ".join(sorted(EXTENSIONS))}) if not provided')
+    for command_parser in [fetch_parser, export_parser]:
+        command_parser.add_argument('--dtype', choices=sorted(DTYPES), default='float64',
+                                    help='Numeric type of the points')
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Runs a depfarm command.
+
+    Parameters
+    ----------
+    argv : list, optional
+        Command line arguments, defaults to sys.argv[1:]
+
+    Returns
+    -------
+    int
+        Exit status
+    """
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if(args.quiet):
+        logging.disable(logging.INFO)
+
+    if(args.command == 'serve'):
+        return args.handler(args)
+
+    # Only the in-memory single region fetch goes through the cache
+    if(args.command == 'fetch' and args.cache != '' and (args.chunk_size > 0 or args.multi_region or args.tile_size > 0)):
+        parser.error('--cache cannot be combined with --chunk-size, --tile-size or --multi-region')
+
+    # Fails before any fetch if the output format is unknown
+    try:
+        get_file_format(args.output, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    count = args.handler(args)
+    print(f'Wrote {count} points to {args.output}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,84 @@
+from __future__ import annotations
 import logging
-from typing import Tuple
-import pdal
+from typing import Tuple, TYPE_CHECKING
 from json import load, dumps
+import os
 import sys
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits import mplot3d
-import geopandas as gpd
-from shapely.geometry import Polygon
-from shapely.geometry import Point
-from logger_creator import CreateLogger
-from subsampler import CloudSubSampler
+from .logger_creator import CreateLogger
+from .subsampler import CloudSubSampler
+from .region_index import load_region_index
+from .catalog import load_catalog
+from .fetch_cache import FetchCache
+from .tiled_fetch import split_bounds, get_tile_bounds, get_tile_range_filter, fetch_tiles, fetch_pipelines
+from .mosaic import order_sources, resolve_overlaps, get_cell_sizes
+from .lod_pyramid import write_lod_pyramid, LodPyramid
+from .exporters import export_points, export_chunks
+from .rasterizer import rasterize, RASTER_OUTPUTS
+from .shared_cloud import SharedPointCloud
+from .rendering import get_elevation_image, draw_elevation_image, get_ground_cell_size, get_axis_labels
+from .metrics import Metrics, get_metrics, record_pipeline_metrics
+from .ept_resolution import plan_resolution, ResolutionPlan
+from .pipeline_spec import PipelineSpec, create_stage, compile_pipeline, load_template_stages
+
+# Pdal, the GIS and the plotting libraries take most of the import time and are imported by the methods
+# using them, so jobs which only fetch and export never load the plotting stack
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+    import geopandas as gpd
+    from shapely.geometry import Polygon
 
 
 logger = CreateLogger('DataFetcher')
 logger = logger.get_default_logger()
 
 
+def get_xyz_points(points: np.array, dtype: type = np.float64) -> np.array:
+    """Gathers the X, Y and Z dimensions of a Pdal structured point array by name into a single
+    (n, 3) array, without converting the points record by record.
+
+    Parameters
+    ----------
+    points : np.array
+        Structured point array returned by a Pdal pipeline
+    dtype : type, optional
+        Numeric type of the returned cloud points
+
+    Returns
+    -------
+    np.array
+        Cloud points with x, y and z values in a single element
+    """
+    cloud_points = np.empty((len(points), 3), dtype=dtype)
+    for index, dimension in enumerate(['X', 'Y', 'Z']):
+        cloud_points[:, index] = points[dimension]
+
+    return cloud_points
+
+
+def run_pipeline(pipeline_json: str, dtype: type = np.float64) -> np.array:
+    """Executes a Pdal pipeline and returns its cloud points, used as the process pool worker of tiled fetches.
+
+    Parameters
+    ----------
+    pipeline_json : str
+        Pipeline JSON string
+    dtype : type, optional
+        Numeric type of the returned cloud points
+
+    Returns
+    -------
+    np.array
+        Cloud points with x, y and z values in a single element
+    """
+    import pdal
+
+    pipeline = pdal.Pipeline(pipeline_json)
+    pipeline.execute()
+
+    return get_xyz_points(pipeline.arrays[0], dtype)
+
+
 class DataFetcher():
     """A Data Fetcher Class which handles all data fetching activites with the AWS dataset 
     and uses all the supporting classes like subsampling.
@@ -31,23 +92,42 @@ class DataFetcher():
     region: str, optional
         Region where the specified polygon is located in from the file name folder located in the AWS dataset. If
         not provided the program will search and provide the region if it is in the AWS dataset
+    multi_region: bool, optional
+        Allow polygons which are not fully contained in a single region, every intersecting region variant is kept
+        in region_candidates for get_data_multi_region
+    metrics: Metrics, optional
+        Metrics the stage timings and counters of the fetcher are recorded in, defaults to the metrics of the
+        process (see metrics.enable_metrics)
 
     Returns
     -------
     None
     """
 
-    def __init__(self, polygon: Polygon, epsg: str, region: str = '') -> None:
+    def __init__(self, polygon: Polygon, epsg: str, region: str = '', multi_region: bool = False, metrics: Metrics = None) -> None:
         try:
+            self._metrics = metrics
             self.data_location = "https://s3-us-west-2.amazonaws.com/usgs-lidar-public/"
             minx, miny, maxx, maxy = self.get_polygon_edges(polygon, epsg)
 
-            if(region != ''):
-                self.region = self.check_region(region)
-                self.file_location = self.data_location + self.region + "/ept.json"
-            else:
-                self.region = self.get_region_by_bounds(minx, miny, maxx, maxy)
-                self.file_location = self.region
+            with self.metrics.span('catalog_lookup'):
+                if(region != ''):
+                    self.region = self.check_region(region)
+                    self.file_location = self.data_location + self.region + "/ept.json"
+                elif(multi_region):
+                    from shapely.geometry import box
+
+                    self.region_candidates = [candidate for candidate in self.get_regions_by_bounds(
+                        minx, miny, maxx, maxy) if box(*candidate.bounds).intersects(self.extraction_polygon)]
+                    if(len(self.region_candidates) == 0):
+                        logger.error('Region Not Available')
+                        sys.exit(1)
+
+                    self.region = self.region_candidates[0].access_url
+                    self.file_location = self.region
+                else:
+                    self.region = self.get_region_by_bounds(minx, miny, maxx, maxy)
+                    self.file_location = self.region
             print(self.region)
 
             self.load_pipeline_template()
@@ -59,6 +139,37 @@ class DataFetcher():
             logger.exception('Failed to Instantiate DataFetcher Class Object')
             sys.exit(1)
 
+    @property
+    def metrics(self) -> Metrics:
+        """Metrics the stage timings and counters of the fetcher are recorded in.
+        """
+        metrics = self.__dict__.get('_metrics')
+
+        return metrics if metrics is not None else get_metrics()
+
+    def get_metrics_report(self, json_file: str = '', prometheus_file: str = '') -> dict:
+        """Returns the recorded stage timings and counters, optionally exporting them.
+
+        Parameters
+        ----------
+        json_file : str, optional
+            If provided, the metrics are written to this file as JSON
+        prometheus_file : str, optional
+            If provided, the metrics are written to this file in the Prometheus text format
+
+        Returns
+        -------
+        dict
+            Total seconds and runs of every stage, and the counters. The bytes Pdal downloads are not
+            included, readers.ept neither reports them nor reads through the EPT metadata cache
+        """
+        if(json_file != ''):
+            self.metrics.to_json(json_file)
+        if(prometheus_file != ''):
+            self.metrics.to_prometheus(prometheus_file)
+
+        return {'stages': self.metrics.get_stage_totals(), 'counters': self.metrics.to_dict()['counters']}
+
     def check_region(self, region: str) -> str:
         """Checks if a region provided is within the file name folders in the AWS dataset.
 
@@ -72,11 +183,15 @@ class DataFetcher():
         str
             Returns the same regions folder file name if it was successfully located
         """
-        with open('./filename.txt', 'r') as locations:
-            locations_list = locations.readlines()
+        if(os.path.exists('./aws_dataset.catalog')):
+            locations = load_catalog().get_folder_set()
+        else:
+            with open('./filename.txt', 'r') as location_file:
+                locations = set(location.strip().strip('/')
+                                for location in location_file.readlines())
 
-        if(region in locations_list):
-            return region
+        if(region.strip('/') in locations):
+            return region.strip('/')
         else:
             logger.error('Region Not Available')
             sys.exit(1)
@@ -96,36 +211,51 @@ class DataFetcher():
         maxy : float
             Maximum latitude value of the polygon
         indx : int, optional
-            Bound indexing, to select the first or other access url's of multiple values for a region
+            Candidate indexing, to select the first or other access url's among every region variant containing
+            the polygon ranked by coverage
         Returns
         -------
         str
             Access url to retrieve the data from the AWS dataset
         """
 
-        aws_dataset_info_csv = pd.read_csv('./aws_dataset.csv')
-        for index, bound in enumerate(aws_dataset_info_csv['Bound/s'].to_list()):
-            bound = bound.strip('][').replace(
-                ']', '').replace('[', '').split(',')
-            bound = list(map(float, bound))
-
-            bminx, bminy, bmaxx, bmaxy = bound[0 * indx], bound[1 *
-                                                                indx], bound[3 * indx], bound[4 * indx]
+        candidates = self.get_regions_by_bounds(
+            minx, miny, maxx, maxy, predicate='contains')
 
-            if((minx >= bminx and maxx <= bmaxx) and (miny >= bminy and maxy <= bmaxy)):
-                access_url = aws_dataset_info_csv['Access Url/s'].to_list()[
-                    index][2:-2]
+        if(len(candidates) >= indx):
+            candidate = candidates[indx - 1]
 
-                region = aws_dataset_info_csv['Region/s'].to_list()[
-                    index] + '_' + aws_dataset_info_csv['Year/s'].to_list()[index][2:-2]
-
-                logger.info(f'Region found in {region} folder')
+            logger.info(
+                f'Region found in {candidate.region}_{candidate.year} folder')
 
-                return access_url
+            return candidate.access_url
         else:
             logger.error('Region Not Available')
             sys.exit()
 
+    def get_regions_by_bounds(self, minx: float, miny: float, maxx: float, maxy: float, predicate: str = 'intersects') -> list:
+        """Searchs the region index for every region variant which intersects or contains the polygon bounds.
+
+        Parameters
+        ----------
+        minx : float
+            Minimum longitude value of the polygon
+        miny : float
+            Minimum latitude value of the polygon
+        maxx : float
+            Maximum longitude value of the polygon
+        maxy : float
+            Maximum latitude value of the polygon
+        predicate : str, optional
+            Either 'intersects' or 'contains'
+
+        Returns
+        -------
+        list
+            RegionCandidate values of every matching region variant ranked by coverage of the polygon bounds
+        """
+        return load_region_index().query(minx, miny, maxx, maxy, predicate=predicate)
+
     def load_pipeline_template(self, file_name: str = './pipeline_template.json') -> None:
         """Loads Pipeline Template to constructe Pdal Pipelines from.
 
@@ -140,10 +270,10 @@ class DataFetcher():
         None
         """
         try:
-            with open(file_name, 'r') as read_file:
-                template = load(read_file)
-
-            self.template_pipeline = template
+            # Immutable stages shared by every fetcher, pipelines are composed from them without copies
+            self.template_stages = load_template_stages(file_name)
+            self.template_pipeline = {name: stage.to_dict()
+                                      for name, stage in self.template_stages.items()}
 
             logger.info('Successfully Loaded Pdal Pipeline Template')
 
@@ -167,20 +297,22 @@ class DataFetcher():
             Returns bounds of the polygon provided(minx, miny, maxx, maxy)
         """
         try:
-            grid = gpd.GeoDataFrame([polygon], columns=["geometry"])
-            grid.set_crs(epsg=epsg, inplace=True)
+            from pyproj import Transformer
+            from shapely.ops import transform
 
-            grid['geometry'] = grid.geometry.to_crs(epsg=3857)
+            # Reprojected with pyproj directly, geopandas is only imported if geo_df is used
+            web_polygon = transform(Transformer.from_crs(
+                f'EPSG:{epsg}', 'EPSG:3857', always_xy=True).transform, polygon)
 
-            minx, miny, maxx, maxy = grid.geometry[0].bounds
+            minx, miny, maxx, maxy = web_polygon.bounds
             # bounds: ([minx, maxx], [miny, maxy])
             self.extraction_bounds = f"({[minx, maxx]},{[miny,maxy]})"
+            self.polygon_bounds = (minx, miny, maxx, maxy)
+            self.extraction_polygon = web_polygon
+            self.polygon_epsg = epsg
 
             # Cropping Bounds
-            self.polygon_cropping = self.get_crop_polygon(grid.geometry[0])
-
-            grid['geometry'] = grid.geometry.to_crs(epsg=epsg)
-            self.geo_df = grid
+            self.polygon_cropping = self.get_crop_polygon(web_polygon)
 
             logger.info(
                 'Successfully Extracted Polygon Edges and Polygon Cropping Bounds')
@@ -191,6 +323,20 @@ class DataFetcher():
             logger.exception(
                 'Failed to Extract Polygon Edges and Polygon Cropping Bounds')
 
+    @property
+    def geo_df(self) -> gpd.GeoDataFrame:
+        """Geopandas dataframe of the polygon in its CRS, built on first access."""
+        if(self.__dict__.get('_geo_df') is None):
+            import geopandas as gpd
+
+            grid = gpd.GeoDataFrame(
+                [self.extraction_polygon], columns=["geometry"])
+            grid.set_crs(epsg=3857, inplace=True)
+            grid['geometry'] = grid.geometry.to_crs(epsg=self.polygon_epsg)
+            self._geo_df = grid
+
+        return self._geo_df
+
     def get_crop_polygon(self, polygon: Polygon) -> str:
         """Calculates Polygons Cropping string used when building Pdal's crop pipeline.
 
@@ -212,35 +358,121 @@ class DataFetcher():
 
         return polygon_cords
 
-    def construct_simple_pipeline(self) -> None:
-        """Generates a generic Pdal pipeline.
+    def get_simple_pipeline_spec(self, extraction_bounds: str = '', extra_stages: list = [], file_location: str = '',
+                                 resolution_plan: ResolutionPlan = None) -> PipelineSpec:
+        """Composes the spec of a generic Pdal pipeline from the template stages, leaving the template untouched.
 
         Parameters
         ----------
-        None
+        extraction_bounds : str, optional
+            Bounds to read instead of the polygon's extraction bounds, as ([minx, maxx],[miny, maxy])
+        extra_stages : list, optional
+            Stages inserted right after the reader, before cropping and reprojection
+        file_location : str, optional
+            ept.json url to read instead of the region's file location
+        resolution_plan : ResolutionPlan, optional
+            Plan of the ept.json read instead of the one of the region's file location (see limit_resolution)
 
         Returns
         -------
-        None
+        PipelineSpec
+            Spec of the pipeline
         """
-        self.pipeline = []
-        reader = self.template_pipeline['reader']
-        reader['bounds'] = self.extraction_bounds
-        reader['filename'] = self.file_location
-        self.pipeline.append(reader)
+        stages = self.template_stages
+        reader = stages['reader'].with_options(
+            bounds=extraction_bounds if extraction_bounds != '' else self.extraction_bounds,
+            filename=file_location if file_location != '' else self.file_location)
+        resolution_plan = resolution_plan if resolution_plan is not None else self.__dict__.get('resolution_plan')
+        if(resolution_plan is not None):
+            reader = reader.with_options(resolution=resolution_plan.resolution)
+
+        return PipelineSpec((reader, *[create_stage(stage) for stage in extra_stages],
+                             stages['cropping_filter'].with_options(
+                                 polygon=self.polygon_cropping),
+                             stages['range_filter'], stages['assign_filter'],
+                             stages['reprojection_filter'].with_options(out_srs=f"EPSG:{self.epsg}")))
+
+    def get_simple_pipeline_stages(self, extraction_bounds: str = '', extra_stages: list = [], file_location: str = '') -> list:
+        """Builds the stages of a generic Pdal pipeline, see get_simple_pipeline_spec.
 
-        cropper = self.template_pipeline['cropping_filter']
-        cropper['polygon'] = self.polygon_cropping
-        self.pipeline.append(cropper)
+        Parameters
+        ----------
+        extraction_bounds : str, optional
+            Bounds to read instead of the polygon's extraction bounds, as ([minx, maxx],[miny, maxy])
+        extra_stages : list, optional
+            Stages inserted right after the reader, before cropping and reprojection
+        file_location : str, optional
+            ept.json url to read instead of the region's file location
 
-        self.pipeline.append(self.template_pipeline['range_filter'])
-        self.pipeline.append(self.template_pipeline['assign_filter'])
+        Returns
+        -------
+        list
+            Pipeline stages
+        """
+        return self.get_simple_pipeline_spec(extraction_bounds, extra_stages, file_location).to_list()
+
+    def limit_resolution(self, spacing: float = 0, point_budget: int = 0) -> ResolutionPlan:
+        """Limits the EPT reads of the pipelines built afterwards to the octree depths needed for a target
+        spacing or a point budget, so deeper levels are never downloaded. The plan is read from the EPT
+        hierarchy within the polygon bounds, and the estimated bytes saved against reading the full cloud and
+        subsampling it locally are recorded in the metrics.
+
+        Parameters
+        ----------
+        spacing : float, optional
+            Target ground spacing of the points in metres, whatever the requested CRS is. For a following
+            apply_grid_sampling in a projected metric CRS, this is its voxel size
+        point_budget : int, optional
+            Maximum number of points to read within the polygon bounds, used if no spacing is provided. Both
+            set to 0 removes the limit. get_data_multi_region plans every source on its own, each one within
+            this budget
+
+        Returns
+        -------
+        ResolutionPlan
+            The chosen octree depth and its estimated savings, None if the limit was removed
+        """
+        try:
+            self.resolution_plan = None
+            self.resolution_limit = (spacing, point_budget)
+            if(spacing > 0 or point_budget > 0):
+                with self.metrics.span('resolution_plan'):
+                    self.resolution_plan = plan_resolution(
+                        self.file_location, self.polygon_bounds, spacing, point_budget)
+                self.metrics.increment(
+                    'ept_points_skipped_estimate', self.resolution_plan.full_points - self.resolution_plan.points)
+                self.metrics.increment(
+                    'ept_bytes_saved_estimate', self.resolution_plan.bytes_saved)
+
+            return self.resolution_plan
+
+        except Exception as e:
+            logger.exception('Failed to Plan the EPT Read Resolution')
+            sys.exit(1)
+
+    def construct_simple_pipeline(self, spacing: float = 0, point_budget: int = 0) -> None:
+        """Generates a generic Pdal pipeline.
+
+        Parameters
+        ----------
+        spacing : float, optional
+            If provided, only the EPT octree depths needed for this ground spacing in metres are read, see
+            limit_resolution
+        point_budget : int, optional
+            If provided instead of a spacing, only the EPT octree depths fitting this many points are read
+
+        Returns
+        -------
+        None
+        """
+        if(spacing > 0 or point_budget > 0):
+            self.limit_resolution(spacing, point_budget)
 
-        reprojection = self.template_pipeline['reprojection_filter']
-        reprojection['out_srs'] = f"EPSG:{self.epsg}"
-        self.pipeline.append(reprojection)
+        self.pipeline_spec = self.get_simple_pipeline_spec()
+        import pdal
 
-        self.pipeline = pdal.Pipeline(dumps(self.pipeline))
+        self.pipeline_json = compile_pipeline(self.pipeline_spec)
+        self.pipeline = pdal.Pipeline(self.pipeline_json)
 
     def construct_pipeline_template_1(self, file_name: str, resolution: int = 1, window_size: int = 6, tif_values: list = ["all"]):
         """Generates a Pdal Pipeline with some configurations available.
@@ -260,56 +492,260 @@ class DataFetcher():
         -------
         None
         """
-        self.pipeline = []
-        reader = self.template_pipeline['reader']
-        reader['bounds'] = self.extraction_bounds
-        reader['filename'] = self.data_location + self.region + "/ept.json"
-        self.pipeline.append(reader)
+        stages = self.template_stages
+        self.pipeline_spec = PipelineSpec((
+            stages['reader'].with_options(bounds=self.extraction_bounds,
+                                          filename=self.data_location + self.region + "/ept.json"),
+            stages['range_filter'], stages['assign_filter'],
+            stages['reprojection_filter'].with_options(
+                out_srs=f"EPSG:{self.epsg}"),
+            # Simple Morphological Filter
+            stages['smr_filter'], stages['smr_range_filter'],
+            stages['laz_writer'].with_options(
+                filename=f"{file_name}_{self.region}.laz"),
+            stages['tif_writer'].with_options(filename=f"{file_name}_{self.region}.tif", output_type=tif_values,
+                                              resolution=resolution, window_size=window_size)))
+
+        import pdal
+
+        self.pipeline_json = compile_pipeline(self.pipeline_spec)
+        self.pipeline = pdal.Pipeline(self.pipeline_json)
+
+    def get_data(self, dtype: type = np.float64, lazy_geodf: bool = False, cache: FetchCache = None):
+        """Retrieves Data from the AWS Dataset, builds the cloud points from it and 
+        assignes and stores the original cloud points and original elevation geopandas dataframe.
 
-        self.pipeline.append(self.template_pipeline['range_filter'])
-        self.pipeline.append(self.template_pipeline['assign_filter'])
+        Parameters
+        ----------
+        dtype : type, optional
+            Numeric type of the cloud points, np.float32 halves the memory used by the cloud points
+        lazy_geodf : bool, optional
+            To build the original elevation geopandas dataframe only when it is first accessed
+        cache : FetchCache, optional
+            On-disk cache of fetched cloud points. A hit skips running the Pdal pipeline, pipelines writing
+            files are always run
 
-        reprojection = self.template_pipeline['reprojection_filter']
-        reprojection['out_srs'] = f"EPSG:{self.epsg}"
-        self.pipeline.append(reprojection)
+        Returns
+        -------
+        None
+        """
+        try:
+            use_cache = cache is not None and '"writers.' not in self.pipeline_json
+            cloud_points = None
+            if(use_cache):
+                with self.metrics.span('cache_lookup'):
+                    cache_key = self.get_cache_key(cache, dtype)
+                    cloud_points = cache.get(cache_key)
+                self.metrics.increment(
+                    'cache_misses' if cloud_points is None else 'cache_hits')
+
+            if(cloud_points is None):
+                with self.metrics.span('pipeline_execute'):
+                    self.data_count = self.pipeline.execute()
+                record_pipeline_metrics(self.metrics, self.pipeline)
+                self.create_cloud_points(dtype)
+                if(use_cache):
+                    with self.metrics.span('cache_store'):
+                        cache.put(cache_key, self.cloud_points)
+            else:
+                self.cloud_points = cloud_points
+                self.data_count = len(cloud_points)
+            self.metrics.increment('points_returned', self.data_count)
+
+            self.original_cloud_points = self.cloud_points
+            self.original_elevation_geodf = None
+            if(not lazy_geodf):
+                self.original_elevation_geodf = self.get_elevation_geodf()
+        except Exception as e:
+            sys.exit(1)
 
-        # Simple Morphological Filter
-        self.pipeline.append(self.template_pipeline['smr_filter'])
-        self.pipeline.append(self.template_pipeline['smr_range_filter'])
+    def get_cache_key(self, cache: FetchCache, dtype: type = np.float64) -> str:
+        """Calculates the cache key of the current pipeline, from the canonical hash of its spec when the
+        pipeline was built from one, so the key does not depend on how the JSON was formatted.
 
-        laz_writer = self.template_pipeline['laz_writer']
-        laz_writer['filename'] = f"{file_name}_{self.region}.laz"
-        self.pipeline.append(laz_writer)
+        Parameters
+        ----------
+        cache : FetchCache
+            Cache the key is used with
+        dtype : type, optional
+            Numeric type of the cloud points
 
-        tif_writer = self.template_pipeline['tif_writer']
-        tif_writer['filename'] = f"{file_name}_{self.region}.tif"
-        tif_writer['output_type'] = tif_values
-        tif_writer["resolution"] = resolution
-        tif_writer["window_size"] = window_size
-        self.pipeline.append(tif_writer)
+        Returns
+        -------
+        str
+            Cache key of the fetch
+        """
+        spec = self.__dict__.get('pipeline_spec')
+        # The pipeline JSON may have been replaced after the spec was built
+        if(spec is not None and compile_pipeline(spec) == self.pipeline_json):
+            return cache.get_spec_key(spec.get_hash(), dtype)
 
-        self.pipeline = pdal.Pipeline(dumps(self.pipeline))
+        return cache.get_key(self.file_location, self.extraction_bounds,
+                             self.polygon_cropping, self.pipeline_json, dtype)
 
-    def get_data(self):
-        """Retrieves Data from the AWS Dataset, builds the cloud points from it and 
-        assignes and stores the original cloud points and original elevation geopandas dataframe.
+    def get_data_tiled(self, tile_size: float = 0, grid: Tuple[int, int] = (2, 2), max_workers: int = 0, dtype: type = np.float64):
+        """Retrieves Data from the AWS Dataset by splitting the polygon bounds into tiles and running one simple
+        pipeline per tile in a process pool. Tiles own half open bounds, so points on shared tile edges are
+        only fetched once. Assignes and stores the merged cloud points like get_data.
 
         Parameters
         ----------
+        tile_size : float, optional
+            Width and height of a tile in meters (EPSG:3857), if provided the grid is derived from it
+        grid : Tuple[int, int], optional
+            Number of tile columns and rows, used when no tile size is provided
+        max_workers : int, optional
+            Maximum number of tiles fetched at the same time, defaults to the number of cores
+        dtype : type, optional
+            Numeric type of the cloud points
+
+        Returns
+        -------
         None
+        """
+        try:
+            from shapely.geometry import box
+
+            pipeline_jsons = []
+            for tile in split_bounds(*self.polygon_bounds, tile_size=tile_size, grid=grid):
+                if(not box(*tile[:4]).intersects(self.extraction_polygon)):
+                    continue
+
+                pipeline_jsons.append(compile_pipeline(self.get_simple_pipeline_spec(
+                    get_tile_bounds(tile), [get_tile_range_filter(tile)])))
+
+            with self.metrics.span('tiled_fetch', tiles=len(pipeline_jsons)):
+                self.cloud_points = fetch_tiles(
+                    run_pipeline, pipeline_jsons, max_workers, dtype)
+            self.data_count = len(self.cloud_points)
+            self.metrics.increment('points_returned', self.data_count)
+            self.original_cloud_points = self.cloud_points
+            self.original_elevation_geodf = None
+
+        except Exception as e:
+            logger.exception('Failed to Fetch Tiled Data')
+            sys.exit(1)
+
+    def get_data_multi_region(self, priority='newest', cell_size: float = 1, max_workers: int = 0, dtype: type = np.float64):
+        """Retrieves Data for a polygon spanning several regions. The overlap of the polygon bounds with every
+        intersecting region variant is fetched in parallel and merged into one cloud. Where sources overlap, the
+        points of the highest priority source present in a cell are kept. Assignes and stores the merged cloud
+        points like get_data, along with the source of every point in cloud_sources (an index into source_names).
+
+        Parameters
+        ----------
+        priority : str or list, optional
+            'newest', 'oldest', 'coverage' or a list of region_year names, see mosaic.order_sources
+        cell_size : float, optional
+            Size in metres of the cells overlapping sources are resolved in, converted to the output CRS units
+            (degrees in a geographic CRS)
+        max_workers : int, optional
+            Maximum number of regions fetched at the same time, defaults to the number of cores
+        dtype : type, optional
+            Numeric type of the cloud points
 
         Returns
         -------
         None
         """
         try:
-            self.data_count = self.pipeline.execute()
-            self.create_cloud_points()
+            if(not hasattr(self, 'region_candidates')):
+                from shapely.geometry import box
+
+                self.region_candidates = [candidate for candidate in self.get_regions_by_bounds(
+                    *self.polygon_bounds) if box(*candidate.bounds).intersects(self.extraction_polygon)]
+
+            sources = order_sources(self.region_candidates, priority)
+            minx, miny, maxx, maxy = self.polygon_bounds
+
+            spacing, point_budget = self.__dict__.get('resolution_limit', (0, 0))
+            pipeline_jsons = []
+            for source in sources:
+                bminx, bminy, bmaxx, bmaxy = source.bounds
+                overlap = [max(minx, bminx), max(miny, bminy),
+                           min(maxx, bmaxx), min(maxy, bmaxy)]
+                # Every source has its own EPT bounds and span, so its own octree depth
+                resolution_plan = None
+                if(spacing > 0 or point_budget > 0):
+                    with self.metrics.span('resolution_plan'):
+                        resolution_plan = plan_resolution(source.access_url, tuple(overlap), spacing, point_budget)
+                pipeline_jsons.append(compile_pipeline(self.get_simple_pipeline_spec(
+                    f"({[overlap[0], overlap[2]]},{[overlap[1], overlap[3]]})", file_location=source.access_url,
+                    resolution_plan=resolution_plan)))
+
+            with self.metrics.span('multi_region_fetch', sources=len(pipeline_jsons)):
+                source_points = fetch_pipelines(
+                    run_pipeline, pipeline_jsons, max_workers, dtype)
+
+            cloud_points = np.concatenate(source_points) if len(
+                source_points) > 0 else np.zeros((0, 3), dtype=dtype)
+            cloud_sources = np.repeat(np.arange(len(source_points), dtype=np.int16), [
+                                      len(points) for points in source_points])
+
+            with self.metrics.span('mosaic'):
+                keep = resolve_overlaps(cloud_points, cloud_sources, get_cell_sizes(
+                    cell_size, self.epsg, cloud_points))
+
+            self.source_names = [
+                f'{source.region}_{source.year}' for source in sources]
+            self.cloud_sources = cloud_sources[keep]
+            self.cloud_points = cloud_points[keep]
+            self.data_count = len(self.cloud_points)
+            self.metrics.increment('points_returned', self.data_count)
             self.original_cloud_points = self.cloud_points
-            self.original_elevation_geodf = self.get_elevation_geodf()
+            self.original_elevation_geodf = None
+
+            logger.info(
+                f'Successfully Merged Data from {len(sources)} Region Variants')
+
         except Exception as e:
+            logger.exception('Failed to Fetch Multi Region Data')
+            sys.exit(1)
+
+    def iter_cloud_points(self, chunk_size: int = 1000000, dtype: type = np.float64):
+        """Streams the cloud points in fixed size batches using Pdal's chunked pipeline iteration instead of
+        executing the whole pipeline in memory. Batches can be passed on to the stages in the streaming module,
+        so peak memory depends on the chunk size and not the size of the area.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of points in a single batch
+        dtype : type, optional
+            Numeric type of the cloud points
+
+        Returns
+        -------
+        generator
+            Cloud point batches with x, y and z values in a single element
+        """
+        if(not hasattr(self.pipeline, 'iterator')):
+            logger.error(
+                'Streaming requires a Pdal python binding with pipeline iterator support (pdal>=3.0)')
             sys.exit(1)
 
+        self.data_count = 0
+        for array in self.pipeline.iterator(chunk_size=chunk_size):
+            self.data_count += len(array)
+            self.metrics.increment('points_returned', len(array))
+            yield get_xyz_points(array, dtype)
+
+    def share_cloud_points(self) -> SharedPointCloud:
+        """Copies the cloud points to shared memory once, so other processes (e.g rasterize workers) attach to
+        them through the cloud descriptor instead of receiving pickled copies. The caller owns the returned
+        cloud and unlinks it when done, e.g by using it as a context manager.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        SharedPointCloud
+            Shared copy of the cloud points
+        """
+        return SharedPointCloud.from_array(self.cloud_points)
+
     def get_pipeline_arrays(self):
         """Returns the Pdal pipelines retrieved data arrays after the pipeline is run.
 
@@ -349,33 +785,70 @@ class DataFetcher():
         """
         return self.pipeline.log
 
-    def create_cloud_points(self):
+    def create_cloud_points(self, dtype: type = np.float64):
         """Creates Cloud Points from the retrieved Pipeline Arrays consisting of other unwanted data.
 
         Parameters
         ----------
-        None
+        dtype : type, optional
+            Numeric type of the cloud points, np.float32 halves the memory used by the cloud points
 
         Returns
         -------
         None
         """
         try:
-            cloud_points = []
-            for row in self.get_pipeline_arrays()[0]:
-                lst = row.tolist()[-3:]
-                cloud_points.append(lst)
-
-            cloud_points = np.array(cloud_points)
-
-            self.cloud_points = cloud_points
+            with self.metrics.span('array_conversion'):
+                self.cloud_points = get_xyz_points(
+                    self.get_pipeline_arrays()[0], dtype)
 
         except:
             print('Failed to create cloud points')
             sys.exit(1)
 
+    @property
+    def original_elevation_geodf(self) -> gpd.GeoDataFrame:
+        """Geopandas elevation dataframe of the original cloud points, built on first access when the data
+        was retrieved lazily.
+        """
+        if(self.__dict__.get('_original_elevation_geodf') is None):
+            if(self.original_cloud_points is self.cloud_points):
+                self._original_elevation_geodf = self.get_elevation_geodf()
+            else:
+                self._original_elevation_geodf = self.build_elevation_geodf(
+                    self.original_cloud_points)
+
+        return self._original_elevation_geodf
+
+    @original_elevation_geodf.setter
+    def original_elevation_geodf(self, elevation_geodf: gpd.GeoDataFrame) -> None:
+        self._original_elevation_geodf = elevation_geodf
+
+    def build_elevation_geodf(self, cloud_points: np.array) -> gpd.GeoDataFrame:
+        """Builds a geopandas elevation dataframe from the coordinate arrays of the cloud points in bulk.
+
+        Parameters
+        ----------
+        cloud_points : np.array
+            Cloud points with x, y and z values in a single element
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            Geopandas Dataframe with Elevation and coordinate points referenced as Geometry points
+        """
+        import geopandas as gpd
+
+        with self.metrics.span('geodataframe_build'):
+            return gpd.GeoDataFrame({'elevation': cloud_points[:, 2]},
+                                    geometry=gpd.points_from_xy(
+                                        cloud_points[:, 0], cloud_points[:, 1]),
+                                    crs=f'EPSG:{self.epsg}')
+
     def get_elevation_geodf(self) -> gpd.GeoDataFrame:
         """Calculates and returns a geopandas elevation dataframe from the cloud points generated before.
+        The dataframe is cached against the current cloud points, so repeated calls are free until the
+        cloud points are replaced (e.g by sampling).
 
         Parameters
         ----------
@@ -386,23 +859,77 @@ class DataFetcher():
         gpd.GeoDataFrame
             Geopandas Dataframe with Elevation and coordinate points referenced as Geometry points
         """
-        elevation = gpd.GeoDataFrame()
-        elevations = []
-        points = []
-        for row in self.cloud_points:
-            elevations.append(row[2])
-            point = Point(row[0], row[1])
-            points.append(point)
+        if(self.__dict__.get('elevation_geodf_source') is not self.cloud_points):
+            self.elevation_geodf = self.build_elevation_geodf(
+                self.cloud_points)
+            self.elevation_geodf_source = self.cloud_points
 
-        elevation['elevation'] = elevations
-        elevation['geometry'] = points
-        elevation.set_crs(epsg=self.epsg, inplace=True)
+        return self.elevation_geodf
 
-        self.elevation_geodf = elevation
+    def build_lod_pyramid(self, file_name: str, voxel_size: float = 0, levels: int = 8) -> LodPyramid:
+        """Builds the level of detail pyramid of the cloud points once and saves it to disk, so lighter
+        versions of the cloud can be read later without scanning the whole cloud.
 
-        return self.elevation_geodf
+        Parameters
+        ----------
+        file_name : str
+            Path of the .npy file to save the pyramid in, a .json sidecar is saved next to it
+        voxel_size : float, optional
+            Voxel size of the finest sampled level, derived from the extent of the cloud points if not provided
+        levels : int, optional
+            Number of sampled levels below the full resolution level
+
+        Returns
+        -------
+        LodPyramid
+            The saved pyramid
+        """
+        try:
+            write_lod_pyramid(file_name, self.cloud_points,
+                              voxel_size, levels)
+            self.lod_pyramid = LodPyramid(file_name)
+
+            return self.lod_pyramid
+
+        except Exception as e:
+            logger.exception('Failed to build the level of detail pyramid')
+            sys.exit(1)
+
+    def load_lod_pyramid(self, file_name: str) -> LodPyramid:
+        """Loads a level of detail pyramid saved before by build_lod_pyramid.
+
+        Parameters
+        ----------
+        file_name : str
+            Path of the .npy file of the pyramid
+
+        Returns
+        -------
+        LodPyramid
+            The loaded pyramid
+        """
+        self.lod_pyramid = LodPyramid(file_name)
 
-    def get_scatter_plot(self, factor_value: int = 1, view_angle: Tuple[int, int] = (0, 0)) -> plt:
+        return self.lod_pyramid
+
+    def get_lod_level(self, level: int) -> np.array:
+        """Returns the cloud points of a level of the built or loaded level of detail pyramid.
+
+        Parameters
+        ----------
+        level : int
+            Level from 0 (coarsest) to the full resolution level, negative values count from the full
+            resolution level
+
+        Returns
+        -------
+        np.array
+            Read only view of the cloud points of the level
+        """
+        return self.lod_pyramid.get_level(level)
+
+    def get_scatter_plot(self, factor_value: int = 1, view_angle: Tuple[int, int] = (0, 0), lod_level: int = None,
+                         render: str = 'points', pixels: int = 1000) -> plt:
         """Constructs a scatter plot graph of the cloud points.
 
         Parameters
@@ -411,14 +938,33 @@ class DataFetcher():
             Factoring value if the data points are huge
         view_angle : tuple(int, int), optional
             Values to change the view angle of the 3D projection
+        lod_level : int, optional
+            If provided, plots this level of the level of detail pyramid instead of the factored cloud points
+        render : str, optional
+            points draws every point in 3D. image bins the points into a hillshaded elevation image seen from
+            above instead, which draws in the same time for any number of points
+        pixels : int, optional
+            Number of cells along the longest side of the image when rendering an image
 
         Returns
         -------
         plt
             Returns a scatter plot grpah of the cloud points
         """
+        import matplotlib.pyplot as plt
+
+        if(lod_level is not None):
+            values = self.get_lod_level(lod_level)
+        else:
+            values = self.cloud_points[::factor_value]
+
+        if(render == 'image'):
+            return self.get_elevation_image_plot(values, pixels, (10, 15), 'Elevation Scatter Plot')
+        elif(render != 'points'):
+            raise ValueError(f'Invalid render: {render}, expected points or image')
 
-        values = self.cloud_points[::factor_value]
+        # Registers the 3d projection on older matplotlib versions
+        from mpl_toolkits import mplot3d
 
         fig = plt.figure(figsize=(10, 15))
 
@@ -427,8 +973,9 @@ class DataFetcher():
         ax.scatter3D(values[:, 0], values[:, 1],
                      values[:, 2], c=values[:, 2], s=0.1, cmap='terrain')
 
-        ax.set_xlabel('Longitude')
-        ax.set_ylabel('Latitude')
+        x_label, y_label = get_axis_labels(self.epsg)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
         ax.set_zlabel('Elevation')
 
         ax.set_title('Elevation Scatter Plot')
@@ -437,7 +984,96 @@ class DataFetcher():
 
         return plt
 
-    def get_terrain_map(self, markersize: int = 10, fig_size: Tuple[int, int] = (15, 20)) -> plt:
+    def get_raster(self, resolution: float = 1, outputs: list = ['idw'], window_size: int = 0, radius: float = 0,
+                   power: float = 1.0, max_workers: int = 0, nodata: float = np.nan) -> dict:
+        """Rasterizes the fetched cloud points in memory, without re-running the Pdal pipeline. The binned
+        points are kept, so new outputs or window sizes at the same resolution skip the binning.
+
+        Parameters
+        ----------
+        resolution : float, optional
+            Width and height of a raster cell, in the units of the cloud points CRS
+        outputs : list, optional
+            Statistics to compute, among min, max, mean, idw, count and stdev, or ["all"]
+        window_size : int, optional
+            If provided, empty cells are filled from the non empty cells within this many cells
+        radius : float, optional
+            Distance from a cell center within which points contribute to the cell, defaults to resolution * sqrt(2)
+        power : float, optional
+            Power of the inverse distance weighting
+        max_workers : int, optional
+            Number of raster row bands computed at the same time, defaults to the number of cores
+        nodata : float, optional
+            Value of the cells without any point
+
+        Returns
+        -------
+        dict
+            Raster of every output, row 0 being the northern edge. The (minx, maxy, resolution) of the raster
+            is kept in raster_transform
+        """
+        try:
+            parameters = (resolution, radius, power)
+            if(getattr(self, 'raster_source', None) is not self.cloud_points or self.raster_parameters != parameters):
+                with self.metrics.span('rasterize'):
+                    self.raster_accumulator = rasterize(
+                        self.cloud_points, resolution, radius=radius, power=power, max_workers=max_workers)
+                self.raster_source = self.cloud_points
+                self.raster_parameters = parameters
+
+                minx, _, _, maxy = self.raster_accumulator.bounds
+                self.raster_transform = (minx, maxy, resolution)
+            else:
+                logger.info('Points Already Binned, Using Previous Values')
+
+            outputs = RASTER_OUTPUTS if 'all' in outputs else outputs
+
+            return {output: self.raster_accumulator.get_raster(output, window_size, nodata) for output in outputs}
+
+        except Exception as e:
+            logger.exception('Failed to Rasterize the Cloud Points')
+            sys.exit(1)
+
+    def get_elevation_image_plot(self, points: np.array, pixels: int, fig_size: Tuple[int, int], title: str,
+                                 classes: int = 0) -> plt:
+        """Plots cloud points as a hillshaded elevation image binned at screen resolution.
+
+        Parameters
+        ----------
+        points : np.array
+            Cloud points with x, y and z values in a single element
+        pixels : int
+            Number of cells along the longest side of the image
+        fig_size : Tuple[int, int]
+            Size of the figure to be returned
+        title : str
+            Title of the figure
+        classes : int, optional
+            If provided, elevations are colored by this many quantile classes instead of continuously
+
+        Returns
+        -------
+        plt
+            Returns the plotted elevation image
+        """
+        import matplotlib.pyplot as plt
+
+        with self.metrics.span('render_image', points=len(points)):
+            elevation, cell_size, bounds = get_elevation_image(points, pixels)
+            fig, ax = plt.subplots(figsize=fig_size)
+            mappable = draw_elevation_image(ax, elevation, cell_size, bounds, classes=classes,
+                                            ground_cell_size=get_ground_cell_size(cell_size, self.epsg, bounds))
+            fig.colorbar(mappable, ax=ax, label='Elevation', shrink=0.5)
+
+        x_label, y_label = get_axis_labels(self.epsg)
+        ax.set_title(title)
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+
+        return plt
+
+    def get_terrain_map(self, markersize: int = 10, fig_size: Tuple[int, int] = (15, 20), render: str = 'points',
+                        pixels: int = 1000) -> plt:
         """Constructs a Terrain Map from the cloud points.
 
         Parameters
@@ -446,12 +1082,25 @@ class DataFetcher():
             Marker size used when ploting the figure
         fig_size : Tuple[int, int], optional
             Size of the figure to be returned
+        render : str, optional
+            points plots one marker per point of the elevation geopandas dataframe. image bins the points into
+            a hillshaded elevation image colored by the same quantile classes, which draws in the same time for
+            any number of points and does not build the dataframe
+        pixels : int, optional
+            Number of cells along the longest side of the image when rendering an image
 
         Returns
         -------
         plt
             Returns a Terrain Map constructed from the cloud points
         """
+        if(render == 'image'):
+            return self.get_elevation_image_plot(self.cloud_points, pixels, fig_size, 'Terrain Elevation Map', 5)
+        elif(render != 'points'):
+            raise ValueError(f'Invalid render: {render}, expected points or image')
+
+        import matplotlib.pyplot as plt
+
         self.get_elevation_geodf()
 
         self.elevation_geodf.plot(c='elevation', scheme="quantiles", cmap='terrain', legend=True,
@@ -465,8 +1114,9 @@ class DataFetcher():
                                   )
 
         plt.title('Terrain Elevation Map')
-        plt.xlabel('Longitude')
-        plt.ylabel('Latitude')
+        x_label, y_label = get_axis_labels(self.epsg)
+        plt.xlabel(x_label)
+        plt.ylabel(y_label)
 
         return plt
 
@@ -486,8 +1136,9 @@ class DataFetcher():
         None
         """
         self.sampler_class = CloudSubSampler(self.cloud_points)
-        self.cloud_points = self.sampler_class.get_factor_subsampling(
-            factor=factor)
+        with self.metrics.span('factor_sampling'):
+            self.cloud_points = self.sampler_class.get_factor_subsampling(
+                factor=factor)
 
     def apply_grid_sampling(self, voxel_size: float, sampling_type: str = 'closest'):
         """Apply Grid Sampling on the Cloud Points.
@@ -504,26 +1155,81 @@ class DataFetcher():
         None
         """
         self.sampler_class = CloudSubSampler(self.cloud_points)
-        self.cloud_points = self.sampler_class.get_grid_subsampling(
-            voxel_size=voxel_size, sampling_type=sampling_type)
+        with self.metrics.span('grid_sampling'):
+            self.cloud_points = self.sampler_class.get_grid_subsampling(
+                voxel_size=voxel_size, sampling_type=sampling_type)
 
-    def save_cloud_points_for_3d(self, filename: str):
-        """Save the variable to an ASCII file to open in a 3D Software.
+    def apply_distance_sampling(self, radius: float, batch_size: int = 65536):
+        """Apply Minimum Distance Sampling on the Cloud Points.
+
+        Parameters
+        ----------
+        radius : float
+            Minimum distance between two sampled points
+        batch_size : int, optional
+            Number of candidate points accepted in a single pass
+
+        Returns
+        -------
+        None
+        """
+        self.sampler_class = CloudSubSampler(self.cloud_points)
+        with self.metrics.span('distance_sampling'):
+            self.cloud_points = self.sampler_class.get_distance_subsampling(
+                radius=radius, batch_size=batch_size)
+
+    def save_cloud_points_for_3d(self, filename: str, file_format: str = 'xyz', **options):
+        """Save the variable to a file to open in a 3D Software.
 
         Parameters
         ----------
         file_name : str
             String of the path plus name to save the cloud point on to
+        file_format : str, optional
+            One of xyz (ASCII), npy, las, laz, parquet or arrow, binary formats are faster and smaller
+        options : dict, optional
+            Options passed to the exporter, like precision, dtype, scales or compression. LAS/LAZ files store
+            the CRS of the fetcher unless another epsg is given
 
         Returns
         -------
         None
         """
-        np.savetxt(filename + "_cloud_points.xyz",
-                   self.cloud_points, delimiter=";", fmt="%s")
+        options.setdefault('epsg', self.epsg)
+        export_points(filename + f"_cloud_points.{file_format}",
+                      self.cloud_points, file_format, **options)
+
+    def export_cloud_points_stream(self, file_name: str, file_format: str = '', chunk_size: int = 1000000,
+                                   dtype: type = np.float64, **options) -> int:
+        """Streams the cloud points of the pipeline straight to a file, without holding the whole cloud in
+        memory.
+
+        Parameters
+        ----------
+        file_name : str
+            Path of the file to write
+        file_format : str, optional
+            One of xyz, npy, las, laz, parquet or arrow, taken from the file extension if not provided
+        chunk_size : int, optional
+            Number of points in a single batch
+        dtype : type, optional
+            Numeric type of the cloud points
+        options : dict, optional
+            Options passed to the exporter. LAS/LAZ files store the CRS of the fetcher unless another epsg is
+            given
+
+        Returns
+        -------
+        int
+            Number of points exported
+        """
+        options.setdefault('epsg', self.epsg)
+        return export_chunks(file_name, self.iter_cloud_points(chunk_size, dtype), file_format, **options)
 
 
 if __name__ == "__main__":
+    from shapely.geometry import Polygon
+
     MINX, MINY, MAXX, MAXY = [-93.756155, 41.918015, -93.747334, 41.921429]
     polygon = Polygon(((MINX, MINY), (MINX, MAXY),
                        (MAXX, MAXY), (MAXX, MINY), (MINX, MINY)))
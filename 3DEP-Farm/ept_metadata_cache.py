@@ -0,0 +1,183 @@
+import os
+import tempfile
+import threading
+from hashlib import sha256
+from json import dumps, load, loads
+from .logger_creator import CreateLogger
+from .http_client import ConnectionPool, request_with_retries
+
+logger = CreateLogger('EptMetadataCache')
+logger = logger.get_default_logger()
+
+
+class EptMetadataCache():
+    """Local cache of EPT metadata files (ept.json and ept-hierarchy/*.json). Responses are kept in an
+    in-process memo and on disk with their ETag/Last-Modified validators, and stale disk entries are
+    revalidated with conditional requests over pooled keep-alive connections.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory the metadata files are cached in
+    pool : ConnectionPool, optional
+        Connection pool to send requests over, a new pool is created if not provided
+    revalidate : bool, optional
+        To revalidate disk entries with the server the first time they are used in the process. If disabled,
+        disk entries are used without any request
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, directory: str = './.depfarm_cache/ept', pool: ConnectionPool = None, revalidate: bool = True) -> None:
+        self.directory = directory
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.revalidate = revalidate
+        self.memo = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_fetched = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_paths(self, url: str) -> tuple:
+        key = sha256(url.encode('utf-8')).hexdigest()
+
+        return os.path.join(self.directory, key + '.json'), os.path.join(self.directory, key + '.meta')
+
+    def read_entry(self, url: str) -> tuple:
+        body_path, meta_path = self.get_paths(url)
+        try:
+            with open(meta_path, 'r') as file_handler:
+                validators = load(file_handler)
+            with open(body_path, 'rb') as file_handler:
+                body = file_handler.read()
+        except (FileNotFoundError, ValueError):
+            return None, {}
+
+        return body, validators
+
+    def write_entry(self, url: str, body: bytes, validators: dict) -> None:
+        body_path, meta_path = self.get_paths(url)
+
+        # Body first, so a reader never pairs new validators with an old body
+        for path, content in [(body_path, body), (meta_path, dumps(validators).encode('utf-8'))]:
+            handle, temp_path = tempfile.mkstemp(
+                dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as file_handler:
+                file_handler.write(content)
+            os.replace(temp_path, path)
+
+    def get_bytes(self, url: str) -> bytes:
+        """Returns the content of a metadata file, fetching or revalidating it only if it was not used
+        before in the process.
+
+        Parameters
+        ----------
+        url : str
+            URL to the metadata file
+
+        Returns
+        -------
+        bytes
+            Content of the metadata file
+        """
+        with self.lock:
+            if(url in self.memo):
+                return self.memo[url]
+
+        body, validators = self.read_entry(url)
+
+        if(body is None or self.revalidate):
+            headers = {}
+            if(body is not None and 'etag' in validators):
+                headers['If-None-Match'] = validators['etag']
+            if(body is not None and 'last-modified' in validators):
+                headers['If-Modified-Since'] = validators['last-modified']
+
+            status, response_headers, response_body = request_with_retries(
+                self.pool, url, headers, accepted_status=(200, 304))
+            with self.lock:
+                self.requests += 1
+                self.bytes_fetched += len(response_body)
+
+            if(status == 200):
+                body = response_body
+                self.write_entry(url, body, {key: response_headers[key] for key in [
+                                 'etag', 'last-modified'] if key in response_headers})
+
+        with self.lock:
+            self.memo[url] = body
+
+        return body
+
+    def get_json(self, url: str) -> dict:
+        """Returns the parsed content of a JSON metadata file.
+
+        Parameters
+        ----------
+        url : str
+            URL to the metadata file
+
+        Returns
+        -------
+        dict
+            Parsed JSON content
+        """
+        return loads(self.get_bytes(url))
+
+    def get_ept(self, ept_url: str) -> dict:
+        """Returns the parsed ept.json file of a dataset.
+
+        Parameters
+        ----------
+        ept_url : str
+            URL to the ept.json file
+
+        Returns
+        -------
+        dict
+            Parsed ept.json content
+        """
+        return self.get_json(ept_url)
+
+    def get_hierarchy(self, ept_url: str, key: str = '0-0-0-0') -> dict:
+        """Returns a parsed hierarchy file of a dataset.
+
+        Parameters
+        ----------
+        ept_url : str
+            URL to the ept.json file
+        key : str, optional
+            Octree node key (depth-x-y-z) the hierarchy file is named after
+
+        Returns
+        -------
+        dict
+            Parsed hierarchy content, mapping node keys to point counts (-1 for nodes with their own
+            hierarchy file)
+        """
+        return self.get_json(ept_url[:ept_url.rindex('/') + 1] + f'ept-hierarchy/{key}.json')
+
+
+# Shared cache used by get_info and other metadata lookups of the process
+_default_cache = None
+
+
+def get_default_metadata_cache() -> EptMetadataCache:
+    """Returns the process wide EPT metadata cache, creating it on first use.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    EptMetadataCache
+        The process wide cache
+    """
+    global _default_cache
+    if(_default_cache is None):
+        _default_cache = EptMetadataCache()
+
+    return _default_cache
@@ -0,0 +1,205 @@
+import numpy as np
+from typing import NamedTuple
+from .logger_creator import CreateLogger
+from .ept_metadata_cache import EptMetadataCache, get_default_metadata_cache
+
+logger = CreateLogger('EptResolution')
+logger = logger.get_default_logger()
+
+# Radius of the sphere Web Mercator (EPSG:3857) projects from
+MERCATOR_RADIUS = 6378137.0
+
+
+class ResolutionPlan(NamedTuple):
+    """Octree depth an EPT read is limited to and its estimated savings within the read bounds."""
+    depth: int
+    resolution: float
+    points: int
+    full_points: int
+    point_size: int
+    bytes_saved: int
+
+
+def get_depth_spacing(ept: dict, depth: int) -> float:
+    """Calculates the point spacing of an octree depth, in the units of the EPT resource.
+
+    Parameters
+    ----------
+    ept : dict
+        Parsed ept.json content
+    depth : int
+        Octree depth, 0 being the root node
+
+    Returns
+    -------
+    float
+        Spacing of the points kept down to the depth
+    """
+    return (ept['bounds'][3] - ept['bounds'][0]) / ept['span'] / 2 ** depth
+
+
+def get_ground_scale(ept: dict, bounds: tuple) -> float:
+    """Calculates how many EPT resource units make a ground unit at the center of the bounds. Web Mercator
+    stretches distances by 1 / cos(latitude), other resources are assumed to be in ground units.
+
+    Parameters
+    ----------
+    ept : dict
+        Parsed ept.json content
+    bounds : tuple
+        (minx, miny, maxx, maxy) in the EPT resource CRS
+
+    Returns
+    -------
+    float
+        Resource units per ground unit
+    """
+    if(str(ept.get('srs', {}).get('horizontal')) not in ('3857', '900913')):
+        return 1.0
+
+    latitude = np.arctan(np.sinh((bounds[1] + bounds[3]) / 2 / MERCATOR_RADIUS))
+
+    return 1 / np.cos(latitude)
+
+
+def get_point_size(ept: dict) -> int:
+    """Calculates the uncompressed size of a point record from the EPT schema.
+
+    Parameters
+    ----------
+    ept : dict
+        Parsed ept.json content
+
+    Returns
+    -------
+    int
+        Bytes per point
+    """
+    return sum(dimension['size'] for dimension in ept.get('schema', []))
+
+
+def get_node_bounds(ept: dict, key: str) -> tuple:
+    """Calculates the horizontal bounds of an octree node.
+
+    Parameters
+    ----------
+    ept : dict
+        Parsed ept.json content
+    key : str
+        Node key, as depth-x-y-z
+
+    Returns
+    -------
+    tuple
+        (minx, miny, maxx, maxy) of the node
+    """
+    depth, x, y, _ = map(int, key.split('-'))
+    size = (ept['bounds'][3] - ept['bounds'][0]) / 2 ** depth
+    minx = ept['bounds'][0] + x * size
+    miny = ept['bounds'][1] + y * size
+
+    return minx, miny, minx + size, miny + size
+
+
+def count_depth_points(ept_url: str, bounds: tuple, cache: EptMetadataCache = None) -> np.array:
+    """Estimates the points every octree depth holds within the bounds from the EPT hierarchy, without
+    reading any point data. The points of a node partially within the bounds are counted in proportion to
+    the overlapping area. Only the hierarchy files of subtrees intersecting the bounds are fetched.
+
+    Parameters
+    ----------
+    ept_url : str
+        URL to the ept.json file
+    bounds : tuple
+        (minx, miny, maxx, maxy) in the EPT resource CRS
+    cache : EptMetadataCache, optional
+        Metadata cache to read the ept.json and hierarchy files through, defaults to the process wide cache
+
+    Returns
+    -------
+    np.array
+        Estimated points of every depth, index 0 being the root node
+    """
+    cache = cache if cache is not None else get_default_metadata_cache()
+    ept = cache.get_ept(ept_url)
+    hierarchy = dict(cache.get_hierarchy(ept_url))
+
+    counts = []
+    level = ['0-0-0-0']
+    while(len(level) > 0):
+        total = 0.0
+        children = []
+        for key in level:
+            minx, miny, maxx, maxy = get_node_bounds(ept, key)
+            overlap = max(min(maxx, bounds[2]) - max(minx, bounds[0]), 0) * \
+                max(min(maxy, bounds[3]) - max(miny, bounds[1]), 0)
+            if(overlap <= 0):
+                continue
+
+            if(hierarchy[key] == -1):
+                # The subtree is described in a hierarchy file of its own
+                hierarchy.update(cache.get_hierarchy(ept_url, key))
+
+            total += hierarchy[key] * overlap / (maxx - minx) / (maxy - miny)
+            depth, x, y, z = map(int, key.split('-'))
+            children.extend(f'{depth + 1}-{2 * x + i}-{2 * y + j}-{2 * z + k}'
+                            for i in (0, 1) for j in (0, 1) for k in (0, 1))
+
+        counts.append(total)
+        level = [key for key in children if key in hierarchy]
+
+    return np.array(counts)
+
+
+def plan_resolution(ept_url: str, bounds: tuple, spacing: float = 0, point_budget: int = 0,
+                    cache: EptMetadataCache = None) -> ResolutionPlan:
+    """Chooses the shallowest octree depth satisfying a target spacing, or the deepest one fitting a point
+    budget, and estimates the bytes the limited read saves against reading every depth and subsampling
+    locally. Byte estimates use the uncompressed point record size.
+
+    Parameters
+    ----------
+    ept_url : str
+        URL to the ept.json file
+    bounds : tuple
+        (minx, miny, maxx, maxy) in the EPT resource CRS
+    spacing : float, optional
+        Target ground spacing of the points in metres
+    point_budget : int, optional
+        Maximum number of points to read within the bounds, used if no spacing is provided
+    cache : EptMetadataCache, optional
+        Metadata cache to read the ept.json and hierarchy files through, defaults to the process wide cache
+
+    Returns
+    -------
+    ResolutionPlan
+        The chosen depth with the resolution to pass to readers.ept
+    """
+    if(spacing <= 0 and point_budget <= 0):
+        raise ValueError('A Spacing or a Point Budget is Required')
+
+    cache = cache if cache is not None else get_default_metadata_cache()
+    ept = cache.get_ept(ept_url)
+    counts = count_depth_points(ept_url, bounds, cache)
+    cumulative = np.cumsum(counts)
+
+    if(spacing > 0):
+        resolution = spacing * get_ground_scale(ept, bounds)
+        depth = 0
+        while(depth < len(counts) - 1 and get_depth_spacing(ept, depth) > resolution):
+            depth += 1
+    else:
+        # The root depth is always read
+        depth = max(int(np.searchsorted(cumulative, point_budget, side='right')) - 1, 0)
+        resolution = get_depth_spacing(ept, depth)
+
+    point_size = get_point_size(ept)
+    points = int(round(cumulative[depth]))
+    full_points = int(round(cumulative[-1]))
+    plan = ResolutionPlan(depth, float(resolution), points, full_points, point_size,
+                          (full_points - points) * point_size)
+
+    logger.info(f'Reading Octree Depths 0-{depth} of {len(counts) - 1}, About {points} of {full_points} Points, '
+                f'Saving About {plan.bytes_saved} Bytes')
+
+    return plan
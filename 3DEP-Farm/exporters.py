@@ -0,0 +1,400 @@
+import os
+from abc import ABC, abstractmethod
+import numpy as np
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('Exporters')
+logger = logger.get_default_logger()
+
+# Size of the .npy header, large enough for any point count so it can be rewritten in place
+NPY_HEADER_SIZE = 128
+
+COLUMNS = ['x', 'y', 'z']
+
+
+class ChunkWriter(ABC):
+    """Base of the point cloud exporters. Chunks of points are written as they come, so a cloud never has
+    to be held in memory as a whole. Writers are context managers closing the file on exit.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name = file_name
+        self.count = 0
+
+    def write(self, chunk: np.array) -> None:
+        """Writes a chunk of points.
+
+        Parameters
+        ----------
+        chunk : np.array
+            Numpy Array Type consisting of 3 numeric values in a single element
+
+        Returns
+        -------
+        None
+        """
+        chunk = np.asarray(chunk).reshape(-1, 3)
+        self.write_chunk(chunk)
+        self.count += len(chunk)
+
+    @abstractmethod
+    def write_chunk(self, chunk: np.array) -> None:
+        """Writes a chunk of points, reshaped to (n, 3) by write."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finishes the file, called once after the last chunk."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AsciiWriter(ChunkWriter):
+    """Writes points to an ASCII file, one point per line with ';' separated values.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    precision : int, optional
+        Number of decimals written, values are written in full if not provided
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str, precision: int = None) -> None:
+        super().__init__(file_name)
+        self.fmt = "%s" if precision is None else f"%.{precision}f"
+        self.file_handler = open(file_name, 'w')
+
+    def write_chunk(self, chunk: np.array) -> None:
+        np.savetxt(self.file_handler, chunk, delimiter=";", fmt=self.fmt)
+
+    def close(self) -> None:
+        self.file_handler.close()
+
+
+class NpyWriter(ChunkWriter):
+    """Writes points to a .npy file. The header is written with a fixed size and rewritten with the final
+    point count on close, so the file can be reloaded memory mapped with load_npy.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    dtype : type, optional
+        Numeric type the points are stored as
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str, dtype: type = np.float64) -> None:
+        super().__init__(file_name)
+        self.dtype = np.dtype(dtype)
+        self.file_handler = open(file_name, 'wb')
+        self.write_header(0)
+
+    def write_header(self, count: int) -> None:
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (count, 3)})
+        prefix = np.lib.format.magic(1, 0) + \
+            np.uint16(NPY_HEADER_SIZE - 10).tobytes()
+        self.file_handler.seek(0)
+        self.file_handler.write(
+            prefix + header.ljust(NPY_HEADER_SIZE - 11).encode('latin1') + b'\n')
+
+    def write_chunk(self, chunk: np.array) -> None:
+        self.file_handler.write(np.ascontiguousarray(
+            chunk, dtype=self.dtype).tobytes())
+
+    def close(self) -> None:
+        if(self.file_handler.closed):
+            return
+        self.write_header(self.count)
+        self.file_handler.close()
+
+
+class LasWriter(ChunkWriter):
+    """Writes points to a LAS file, or a LAZ file if the file name ends with .laz. Coordinates are stored as
+    integers scaled by the given scales, which sets the stored precision.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    scales : tuple, optional
+        Scale of the x, y and z values, i.e the stored precision
+    offsets : tuple, optional
+        Offset of the x, y and z values, taken from the first chunk if not provided
+    compress : bool, optional
+        To write a LAZ file, taken from the file extension if not provided
+    epsg : str, optional
+        If provided, the CRS of the points is stored in a WKT VLR
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str, scales: tuple = (0.001, 0.001, 0.001), offsets: tuple = None, compress: bool = None,
+                 epsg: str = None) -> None:
+        super().__init__(file_name)
+        self.scales = scales
+        self.offsets = offsets
+        self.compress = compress
+        self.epsg = epsg
+        self.writer = None
+
+    def open_writer(self, chunk: np.array) -> None:
+        import laspy
+
+        header = laspy.LasHeader(point_format=6, version='1.4')
+        header.scales = np.array(self.scales, dtype=np.float64)
+        header.offsets = np.array(self.offsets, dtype=np.float64) if self.offsets is not None else np.floor(
+            np.min(chunk, axis=0) if len(chunk) > 0 else np.zeros(3))
+        if(self.epsg is not None):
+            from pyproj import CRS
+
+            header.add_crs(CRS.from_user_input(f'EPSG:{self.epsg}'))
+        self.header = header
+        self.writer = laspy.open(self.file_name, mode='w', header=header, do_compress=self.compress)
+
+    def write_chunk(self, chunk: np.array) -> None:
+        if(self.writer is None):
+            self.open_writer(chunk)
+        if(len(chunk) == 0):
+            return
+
+        import laspy
+
+        record = laspy.ScaleAwarePointRecord.zeros(
+            len(chunk), header=self.header)
+        record.x, record.y, record.z = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+        self.writer.write_points(record)
+
+    def close(self) -> None:
+        if(self.writer is None):
+            self.open_writer(np.zeros((0, 3)))
+        self.writer.close()
+
+
+class ArrowWriter(ChunkWriter):
+    """Writes points to a compressed columnar Parquet file, or an Arrow IPC file if the file name ends with
+    .arrow or .feather, one row group or record batch per chunk. Requires pyarrow.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    compression : str, optional
+        Compression codec of the columns
+    dtype : type, optional
+        Numeric type the points are stored as
+    ipc : bool, optional
+        To write an Arrow IPC file instead of a Parquet file, taken from the file extension if not provided
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str, compression: str = 'zstd', dtype: type = np.float64, ipc: bool = None) -> None:
+        super().__init__(file_name)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                'pyarrow is required to export Parquet and Arrow files, install it with pip install depfarm[arrow]')
+
+        self.pyarrow = pyarrow
+        self.dtype = np.dtype(dtype)
+        self.schema = pyarrow.schema(
+            [(column, pyarrow.from_numpy_dtype(self.dtype)) for column in COLUMNS])
+
+        if(ipc is None):
+            ipc = os.path.splitext(file_name)[1].lower() in [
+                '.arrow', '.feather']
+
+        if(ipc):
+            import pyarrow.ipc
+            self.writer = pyarrow.ipc.new_file(file_name, self.schema, options=pyarrow.ipc.IpcWriteOptions(
+                compression=compression))
+        else:
+            import pyarrow.parquet
+            self.writer = pyarrow.parquet.ParquetWriter(
+                file_name, self.schema, compression=compression)
+
+    def write_chunk(self, chunk: np.array) -> None:
+        chunk = chunk.astype(self.dtype, copy=False)
+        self.writer.write_table(self.pyarrow.Table.from_arrays(
+            [chunk[:, index] for index in range(3)], schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+WRITERS = {
+    'xyz': AsciiWriter,
+    'npy': NpyWriter,
+    'las': LasWriter,
+    'laz': LasWriter,
+    'parquet': ArrowWriter,
+    'arrow': ArrowWriter
+}
+
+EXTENSIONS = {
+    '.xyz': 'xyz',
+    '.txt': 'xyz',
+    '.npy': 'npy',
+    '.las': 'las',
+    '.laz': 'laz',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow'
+}
+
+
+def get_file_format(file_name: str, file_format: str = '') -> str:
+    """Finds the export format of a file from the given format or from the file extension.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    file_format : str, optional
+        One of xyz, npy, las, laz, parquet or arrow
+
+    Returns
+    -------
+    str
+        The export format
+    """
+    if(file_format == ''):
+        file_format = EXTENSIONS.get(
+            os.path.splitext(file_name)[1].lower(), '')
+
+    if(file_format not in WRITERS):
+        raise ValueError(
+            f'Unknown export format for {file_name}, expected one of {list(WRITERS)}')
+
+    return file_format
+
+
+def get_writer(file_name: str, file_format: str = '', **options) -> ChunkWriter:
+    """Opens the exporter of a file.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    file_format : str, optional
+        One of xyz, npy, las, laz, parquet or arrow, taken from the file extension if not provided
+    options : dict
+        Options passed to the exporter, like precision, dtype, scales or compression. An epsg option is only
+        kept by the LAS/LAZ exporter, the other formats do not store a CRS
+
+    Returns
+    -------
+    ChunkWriter
+        The opened exporter
+    """
+    file_format = get_file_format(file_name, file_format)
+    epsg = options.pop('epsg', None)
+    if(file_format in ['las', 'laz']):
+        options.setdefault('compress', file_format == 'laz')
+        options['epsg'] = epsg
+    elif(file_format in ['parquet', 'arrow']):
+        options.setdefault('ipc', file_format == 'arrow')
+
+    return WRITERS[file_format](file_name, **options)
+
+
+def export_chunks(file_name: str, chunks, file_format: str = '', **options) -> int:
+    """Exports streamed point chunks, one chunk at a time.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    chunks : iterable
+        Point chunks, each a numpy array consisting of 3 numeric values in a single element
+    file_format : str, optional
+        One of xyz, npy, las, laz, parquet or arrow, taken from the file extension if not provided
+    options : dict
+        Options passed to the exporter
+
+    Returns
+    -------
+    int
+        Number of points exported
+    """
+    with get_writer(file_name, file_format, **options) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+
+    logger.info(f'Successfully Exported {writer.count} Points to {file_name}')
+
+    return writer.count
+
+
+def export_points(file_name: str, points: np.array, file_format: str = '', chunk_size: int = 1000000, **options) -> int:
+    """Exports cloud points, written in chunks of bounded size.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    file_format : str, optional
+        One of xyz, npy, las, laz, parquet or arrow, taken from the file extension if not provided
+    chunk_size : int, optional
+        Number of points written at a time
+    options : dict
+        Options passed to the exporter
+
+    Returns
+    -------
+    int
+        Number of points exported
+    """
+    return export_chunks(file_name, (points[start:start + chunk_size] for start in range(0, len(points), chunk_size)),
+                         file_format, **options)
+
+
+def load_npy(file_name: str, mmap: bool = True) -> np.array:
+    """Reloads points exported as .npy.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the .npy file
+    mmap : bool, optional
+        To memory map the points read only instead of reading them in memory
+
+    Returns
+    -------
+    np.array
+        The exported points
+    """
+    try:
+        return np.load(file_name, mmap_mode='r' if mmap else None)
+    except ValueError:
+        # Empty arrays can not be memory mapped
+        return np.load(file_name)
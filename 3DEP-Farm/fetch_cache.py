@@ -0,0 +1,193 @@
+import os
+import tempfile
+from hashlib import sha256
+from json import dumps
+import numpy as np
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('FetchCache')
+logger = logger.get_default_logger()
+
+
+class FetchCache():
+    """Content addressed on-disk cache of fetched cloud points. Entries are .npy files named after the hash
+    of what was fetched, written atomically (temporary file plus rename) so several workers can share a cache
+    directory, and evicted least recently used first once the cache grows over its size limit.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory the cache entries are stored in
+    max_bytes : int, optional
+        Maximum total size of the cache entries
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, directory: str = './.depfarm_cache', max_bytes: int = 2 * 1024 ** 3) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get_key(self, region_url: str, extraction_bounds: str, crop_polygon: str, pipeline_json: str, dtype: type = np.float64) -> str:
+        """Calculates the cache key of a fetch.
+
+        Parameters
+        ----------
+        region_url : str
+            Access url of the region's ept.json file
+        extraction_bounds : str
+            Bounds the points are read from
+        crop_polygon : str
+            Cropping polygon of the fetch
+        pipeline_json : str
+            JSON of the built Pdal pipeline
+        dtype : type, optional
+            Numeric type of the cloud points
+
+        Returns
+        -------
+        str
+            Hex digest identifying the fetch
+        """
+        description = dumps({
+            'region_url': region_url,
+            'extraction_bounds': extraction_bounds,
+            'crop_polygon': crop_polygon,
+            'pipeline': sha256(pipeline_json.encode('utf-8')).hexdigest(),
+            'dtype': np.dtype(dtype).str
+        }, sort_keys=True)
+
+        return sha256(description.encode('utf-8')).hexdigest()
+
+    def get_spec_key(self, spec_hash: str, dtype: type = np.float64) -> str:
+        """Calculates the cache key of a fetch described by a pipeline spec. The spec holds the region url,
+        the bounds and the cropping polygon, so its canonical hash identifies the fetch on its own.
+
+        Parameters
+        ----------
+        spec_hash : str
+            Canonical hash of the pipeline spec, see pipeline_spec.get_spec_hash
+        dtype : type, optional
+            Numeric type of the cloud points
+
+        Returns
+        -------
+        str
+            Hex digest identifying the fetch
+        """
+        description = dumps({
+            'spec': spec_hash,
+            'dtype': np.dtype(dtype).str
+        }, sort_keys=True)
+
+        return sha256(description.encode('utf-8')).hexdigest()
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.npy')
+
+    def get(self, key: str) -> np.array:
+        """Returns the cached cloud points of a key, marking the entry as recently used.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the fetch
+
+        Returns
+        -------
+        np.array
+            The cached cloud points, or None if the key is not cached
+        """
+        path = self.get_path(key)
+        try:
+            points = np.load(path)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        logger.info(f'Cache Hit for {key}')
+
+        return points
+
+    def put(self, key: str, points: np.array) -> None:
+        """Stores cloud points under a key and evicts old entries if the cache is over its size limit.
+
+        Parameters
+        ----------
+        key : str
+            Cache key of the fetch
+        points : np.array
+            Cloud points to store
+
+        Returns
+        -------
+        None
+        """
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        handle, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file_handler:
+                np.save(file_handler, np.ascontiguousarray(points))
+            os.replace(temp_path, path)
+        except Exception:
+            if(os.path.exists(temp_path)):
+                os.remove(temp_path)
+            raise
+
+        self.evict()
+
+    def get_entries(self) -> list:
+        """Lists the cache entries.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list
+            (last use time, size, path) of every entry
+        """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for file_name in files:
+                if(not file_name.endswith('.npy')):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits its size limit.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        entries = sorted(self.get_entries())
+        total = sum(entry[1] for entry in entries)
+
+        for _, size, path in entries:
+            if(total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already evicted by another worker sharing the cache
+                pass
+            total -= size
@@ -0,0 +1,228 @@
+import threading
+import time
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from queue import Empty, LifoQueue
+from urllib.parse import urlsplit
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('HttpClient')
+logger = logger.get_default_logger()
+
+
+class HttpError(Exception):
+    """Raised when a request finishes with an unexpected HTTP status.
+
+    Parameters
+    ----------
+    url : str
+        Requested url
+    status : int
+        HTTP status of the response
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f'HTTP {status} for {url}')
+        self.url = url
+        self.status = status
+
+
+class TokenBucket():
+    """Thread safe token bucket rate limiter.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second, i.e the sustained requests per second
+    capacity : float, optional
+        Maximum tokens held at a time, i.e the allowed burst size. Defaults to the rate
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, rate: float, capacity: float = 0) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity > 0 else max(rate, 1)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and consumes it.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens +
+                                  (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if(self.tokens >= 1):
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class ConnectionPool():
+    """Thread safe pool of persistent (keep-alive) HTTP/HTTPS connections per host.
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        Maximum number of connections open at the same time
+    timeout : float, optional
+        Socket timeout of a connection in seconds
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, max_connections: int = 8, timeout: float = 30) -> None:
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def get_idle_queue(self, host_key: tuple) -> LifoQueue:
+        with self.lock:
+            if(host_key not in self.idle):
+                self.idle[host_key] = LifoQueue()
+
+            return self.idle[host_key]
+
+    def request(self, url: str, headers: dict = {}, method: str = 'GET') -> tuple:
+        """Sends a request over a pooled connection, reusing an idle connection to the host if one exists.
+
+        Parameters
+        ----------
+        url : str
+            Requested url
+        headers : dict, optional
+            Request headers
+        method : str, optional
+            HTTP method
+
+        Returns
+        -------
+        tuple
+            Status, lower cased response headers and response body bytes
+        """
+        parts = urlsplit(url)
+        host_key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path + ('?' + parts.query if parts.query else '')
+        idle = self.get_idle_queue(host_key)
+
+        with self.slots:
+            try:
+                connection = idle.get_nowait()
+            except Empty:
+                connection_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+                connection = connection_class(
+                    parts.hostname, parts.port, timeout=self.timeout)
+
+            try:
+                connection.request(method, path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                response_headers = {key.lower(): value for key,
+                                    value in response.getheaders()}
+
+            except (OSError, HTTPException):
+                connection.close()
+                raise
+
+            if(response.will_close):
+                connection.close()
+            else:
+                idle.put(connection)
+
+            return response.status, response_headers, body
+
+    def close(self) -> None:
+        """Closes every idle connection of the pool.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self.lock:
+            queues = list(self.idle.values())
+
+        for idle in queues:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except Empty:
+                    break
+
+
+def request_with_retries(pool: ConnectionPool, url: str, headers: dict = {}, retries: int = 3, backoff: float = 0.5,
+                         rate_limiter: TokenBucket = None, accepted_status: tuple = (200,)) -> tuple:
+    """Sends a request retrying connection failures, throttling (429) and server errors (5xx) with
+    exponential backoff.
+
+    Parameters
+    ----------
+    pool : ConnectionPool
+        Connection pool to send the request over
+    url : str
+        Requested url
+    headers : dict, optional
+        Request headers
+    retries : int, optional
+        Number of retries after the first attempt
+    backoff : float, optional
+        Delay before the first retry in seconds, doubled on every further retry
+    rate_limiter : TokenBucket, optional
+        Rate limiter every attempt has to acquire a token from
+    accepted_status : tuple, optional
+        Status codes returned to the caller instead of raising
+
+    Returns
+    -------
+    tuple
+        Status, lower cased response headers and response body bytes
+    """
+    for attempt in range(retries + 1):
+        if(rate_limiter is not None):
+            rate_limiter.acquire()
+
+        try:
+            status, response_headers, body = pool.request(url, headers)
+            if(status in accepted_status):
+                return status, response_headers, body
+
+            error = HttpError(url, status)
+            if(status != 429 and status < 500):
+                raise error
+
+        except (OSError, HTTPException) as e:
+            error = e
+
+        if(attempt < retries):
+            logger.warning(f'Retrying {url} after: {error}')
+            time.sleep(backoff * (2 ** attempt))
+
+    raise error
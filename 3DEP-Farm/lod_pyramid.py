@@ -0,0 +1,222 @@
+import os
+import tempfile
+from json import dumps, load
+import numpy as np
+from .logger_creator import CreateLogger
+from .subsampler import get_voxel_grid, get_voxel_keys, get_segments, get_segment_argmin
+
+logger = CreateLogger('LodPyramid')
+logger = logger.get_default_logger()
+
+
+def get_default_voxel_size(points: np.array, levels: int) -> float:
+    """Derives the voxel size of the finest sampled level from the extent of the points, so the coarsest
+    level splits the largest extent in about four voxels.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    levels : int
+        Number of sampled levels
+
+    Returns
+    -------
+    float
+        Voxel size of the finest sampled level
+    """
+    extent = float(np.max(np.max(points, axis=0) - np.min(points, axis=0)))
+
+    return max(extent, 1e-9) / 2 ** (levels + 1)
+
+
+def build_lod_order(points: np.array, voxel_size: float, levels: int) -> tuple:
+    """Orders the points from coarse to fine. Every sampled level adds one point, the closest to the voxel
+    center, for each voxel not yet holding a point of a coarser level, with the voxel size halving from level
+    to level. The points left after the last sampled level form the full resolution level, so any level is a
+    prefix of the ordered points.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    voxel_size : float
+        Voxel size of the finest sampled level
+    levels : int
+        Number of sampled levels
+
+    Returns
+    -------
+    tuple
+        Point order, offsets where every level ends and voxel size of every sampled level
+    """
+    origin = np.min(points, axis=0).astype(np.float64)
+    maximum = np.max(points, axis=0)
+
+    remaining = np.arange(len(points))
+    selected = np.zeros(0, dtype=np.int64)
+    offsets = [0]
+    voxel_sizes = [voxel_size * 2 ** (levels - 1 - level)
+                   for level in range(levels)]
+
+    for size in voxel_sizes:
+        _, grid_shape = get_voxel_grid(origin, maximum, size)
+        keys = get_voxel_keys(points[remaining], origin, grid_shape, size)
+
+        # Voxels of the level already holding a coarser point stay as they are
+        free = ~np.isin(keys, get_voxel_keys(
+            points[selected], origin, grid_shape, size))
+        candidates = remaining[free]
+        order = np.argsort(keys[free], kind='stable')
+        candidates = candidates[order]
+
+        starts, _, _, segment_ids = get_segments(keys[free][order])
+        if(len(candidates) > 0):
+            candidate_points = points[candidates]
+            centers = origin + \
+                (((candidate_points - origin) // size) + 0.5) * size
+            distances = np.square(candidate_points - centers).sum(axis=1)
+            chosen = candidates[get_segment_argmin(
+                distances, starts, segment_ids)]
+        else:
+            chosen = np.zeros(0, dtype=np.int64)
+
+        # Chosen points are ordered by voxel key, a spatially coherent order
+        selected = np.concatenate((selected, chosen))
+        is_chosen = np.zeros(len(points), dtype=bool)
+        is_chosen[chosen] = True
+        remaining = remaining[~is_chosen[remaining]]
+        offsets.append(len(selected))
+
+    offsets.append(len(points))
+
+    return np.concatenate((selected, remaining)), offsets, voxel_sizes
+
+
+def get_sidecar_name(file_name: str) -> str:
+    return os.path.splitext(file_name)[0] + '.json'
+
+
+def write_lod_pyramid(file_name: str, points: np.array, voxel_size: float = 0, levels: int = 8) -> None:
+    """Builds the level of detail pyramid of cloud points and saves it as a .npy file of the coarse to fine
+    ordered points, with a JSON sidecar holding the level offsets. Both files are written atomically.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the .npy file, the sidecar is saved next to it with a .json extension
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    voxel_size : float, optional
+        Voxel size of the finest sampled level, derived from the extent of the points if not provided
+    levels : int, optional
+        Number of sampled levels, the full resolution level comes on top of them
+
+    Returns
+    -------
+    None
+    """
+    if(len(points) == 0):
+        order, offsets, voxel_sizes = np.zeros(
+            0, dtype=np.int64), [0] * (levels + 2), [voxel_size] * levels
+    else:
+        if(voxel_size <= 0):
+            voxel_size = get_default_voxel_size(points, levels)
+        order, offsets, voxel_sizes = build_lod_order(
+            points, voxel_size, levels)
+
+    directory = os.path.dirname(os.path.abspath(file_name))
+    description = {
+        'offsets': [int(offset) for offset in offsets],
+        'voxel_sizes': [float(size) for size in voxel_sizes],
+        'dtype': np.dtype(points.dtype).str
+    }
+
+    # Points first, so a reader never pairs a new sidecar with old points
+    for path, content in [(file_name, np.ascontiguousarray(points[order])),
+                          (get_sidecar_name(file_name), dumps(description).encode('utf-8'))]:
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file_handler:
+                if(isinstance(content, bytes)):
+                    file_handler.write(content)
+                else:
+                    np.save(file_handler, content)
+            os.replace(temp_path, path)
+        except Exception:
+            if(os.path.exists(temp_path)):
+                os.remove(temp_path)
+            raise
+
+    logger.info(
+        f'Successfully Built Level of Detail Pyramid of {len(points)} Points with {levels} Levels')
+
+
+class LodPyramid():
+    """Level of detail pyramid saved by write_lod_pyramid. Points are memory mapped, so a level is a prefix
+    view of the ordered points and reading it only touches the points of that level.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the .npy file of the pyramid
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name = file_name
+        with open(get_sidecar_name(file_name), 'r') as file_handler:
+            description = load(file_handler)
+
+        self.offsets = description['offsets']
+        self.voxel_sizes = description['voxel_sizes']
+        # Empty arrays can not be memory mapped
+        self.points = np.load(file_name, mmap_mode='r' if self.offsets[-1] > 0 else None)
+
+    def get_level_count(self) -> int:
+        """Returns the number of levels, the full resolution level included.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        int
+            Number of levels
+        """
+        return len(self.offsets) - 1
+
+    def get_level(self, level: int) -> np.array:
+        """Returns the points of a level, every level holding the points of the coarser levels.
+
+        Parameters
+        ----------
+        level : int
+            Level from 0 (coarsest) to get_level_count() - 1 (full resolution), negative values count from the
+            full resolution level
+
+        Returns
+        -------
+        np.array
+            Read only view of the points of the level
+        """
+        return self.points[:self.offsets[range(1, len(self.offsets))[level]]]
+
+    def get_level_for_budget(self, max_points: int) -> int:
+        """Finds the finest level holding at most a number of points.
+
+        Parameters
+        ----------
+        max_points : int
+            Maximum number of points
+
+        Returns
+        -------
+        int
+            The finest level within the budget, 0 if even the coarsest level is over it
+        """
+        return max(0, int(np.searchsorted(self.offsets[1:], max_points, side='right')) - 1)
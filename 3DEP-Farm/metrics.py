@@ -0,0 +1,382 @@
+import os
+import re
+import time
+import tempfile
+import threading
+from collections import deque
+from json import dumps, loads
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('Metrics')
+logger = logger.get_default_logger()
+
+
+class Span():
+    """Times the block it is used as a context manager for and records it in its metrics on exit.
+
+    Parameters
+    ----------
+    metrics : Metrics
+        Metrics the span is recorded in
+    name : str
+        Name of the timed stage
+    attributes : dict
+        Extra values recorded with the span
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, metrics, name: str, attributes: dict) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.add_span(self.name, time.perf_counter() - self.start,
+                              **self.attributes)
+
+
+class NullSpan():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Metrics():
+    """Collects timing spans and counters of DataFetcher runs, exported as JSON or in the Prometheus text
+    format. Thread safe.
+
+    Parameters
+    ----------
+    prefix : str, optional
+        Prefix of the exported Prometheus metric names
+    max_spans : int, optional
+        If provided, only the latest spans are kept for export, so long lived processes (e.g the fetch
+        service) do not grow with every job. The stage totals always cover every span
+
+    Returns
+    -------
+    None
+    """
+
+    enabled = True
+
+    def __init__(self, prefix: str = 'depfarm', max_spans: int = 0) -> None:
+        self.prefix = prefix
+        self.max_spans = max_spans
+        self.spans = deque(maxlen=max_spans if max_spans > 0 else None)
+        self.stage_totals = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def span(self, name: str, **attributes) -> Span:
+        """Returns a context manager timing a stage.
+
+        Parameters
+        ----------
+        name : str
+            Name of the timed stage, e.g catalog_lookup or pipeline_execute
+        attributes : dict, optional
+            Extra values recorded with the span
+
+        Returns
+        -------
+        Span
+            The context manager
+        """
+        return Span(self, name, attributes)
+
+    def add_span(self, name: str, seconds: float, **attributes) -> None:
+        """Records the duration of a stage timed elsewhere, e.g parsed from a Pdal log.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage
+        seconds : float
+            Duration of the stage
+        attributes : dict, optional
+            Extra values recorded with the span
+
+        Returns
+        -------
+        None
+        """
+        with self.lock:
+            self.spans.append(
+                {'name': name, 'seconds': seconds, **attributes})
+            total = self.stage_totals.setdefault(
+                name, {'seconds': 0.0, 'count': 0})
+            total['seconds'] += seconds
+            total['count'] += 1
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Adds a value to a counter.
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter, e.g points_returned or cache_hits
+        value : float, optional
+            Value added to the counter
+
+        Returns
+        -------
+        None
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def get_stage_totals(self) -> dict:
+        """Returns the running totals of the spans of every stage, kept as spans are added so exports do not
+        sum every span again.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            Total seconds and number of spans of every stage
+        """
+        with self.lock:
+            return {name: dict(total) for name, total in self.stage_totals.items()}
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {'spans': list(self.spans), 'counters': dict(self.counters)}
+
+    def to_json(self, file_name: str = '') -> str:
+        """Exports the spans, the stage totals and the counters as JSON.
+
+        Parameters
+        ----------
+        file_name : str, optional
+            If provided, the JSON is also written to this file
+
+        Returns
+        -------
+        str
+            The JSON text
+        """
+        content = dumps({**self.to_dict(), 'stages': self.get_stage_totals()},
+                        indent=2, default=str)
+        if(file_name != ''):
+            write_atomic(file_name, content)
+
+        return content
+
+    def to_prometheus(self, file_name: str = '') -> str:
+        """Exports the stage totals and the counters in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        file_name : str, optional
+            If provided, the text is also written to this file, atomically so a node exporter textfile
+            collector never reads it half written
+
+        Returns
+        -------
+        str
+            The Prometheus text
+        """
+        lines = [f'# HELP {self.prefix}_stage_seconds_total Time spent in every stage',
+                 f'# TYPE {self.prefix}_stage_seconds_total counter']
+        totals = self.get_stage_totals()
+        for name, total in sorted(totals.items()):
+            lines.append(
+                f'{self.prefix}_stage_seconds_total{{stage="{name}"}} {total["seconds"]:.9g}')
+        lines += [f'# HELP {self.prefix}_stage_runs_total Number of times every stage ran',
+                  f'# TYPE {self.prefix}_stage_runs_total counter']
+        for name, total in sorted(totals.items()):
+            lines.append(
+                f'{self.prefix}_stage_runs_total{{stage="{name}"}} {total["count"]}')
+
+        with self.lock:
+            counters = sorted(self.counters.items())
+        for name, value in counters:
+            metric = f'{self.prefix}_{re.sub("[^a-zA-Z0-9_]", "_", name)}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value:.9g}']
+
+        content = '\n'.join(lines) + '\n'
+        if(file_name != ''):
+            write_atomic(file_name, content)
+
+        return content
+
+    def reset(self) -> None:
+        with self.lock:
+            self.spans.clear()
+            self.stage_totals = {}
+            self.counters = {}
+
+
+class NullMetrics(Metrics):
+    """Metrics doing nothing, used while instrumentation is disabled so the instrumented code only pays for a
+    method call.
+    """
+
+    enabled = False
+
+    def span(self, name: str, **attributes) -> NullSpan:
+        return NULL_SPAN
+
+    def add_span(self, name: str, seconds: float, **attributes) -> None:
+        pass
+
+    def increment(self, name: str, value: float = 1) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+# Metrics of the process, disabled until enable_metrics is called
+_metrics = NULL_METRICS
+
+
+def get_metrics() -> Metrics:
+    """Returns the metrics of the process, a no-op NullMetrics while instrumentation is disabled.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    Metrics
+        The metrics of the process
+    """
+    return _metrics
+
+
+def enable_metrics(metrics: Metrics = None) -> Metrics:
+    """Enables the instrumentation of the process.
+
+    Parameters
+    ----------
+    metrics : Metrics, optional
+        Metrics to record in, a new one is created if not provided
+
+    Returns
+    -------
+    Metrics
+        The enabled metrics
+    """
+    global _metrics
+    _metrics = metrics if metrics is not None else Metrics()
+
+    return _metrics
+
+
+def disable_metrics() -> None:
+    global _metrics
+    _metrics = NULL_METRICS
+
+
+def write_atomic(file_name: str, content: str) -> None:
+    handle, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_name)), suffix='.tmp')
+    with os.fdopen(handle, 'w') as file_handler:
+        file_handler.write(content)
+    os.replace(temp_path, file_name)
+
+
+STAGE_LOG_PATTERN = re.compile(r'^\((?:pdal )?(?:[\w ]+ )?(\w+\.\w+)[^)]*\)\s*(.*)$')
+DURATION_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(ms|milliseconds?|s|secs?|seconds?)\b', re.IGNORECASE)
+
+
+def parse_pipeline_log(log: str) -> dict:
+    """Gathers the durations Pdal stages report in the pipeline log. Durations are only logged by some stages
+    and at debug log levels (the loglevel option of the pipeline), stages reporting none are left out.
+
+    Parameters
+    ----------
+    log : str
+        Log of an executed Pdal pipeline
+
+    Returns
+    -------
+    dict
+        Total seconds reported by every stage, keyed by stage name (e.g readers.ept)
+    """
+    durations = {}
+    for line in (log or '').splitlines():
+        match = STAGE_LOG_PATTERN.match(line.strip())
+        if(match is None):
+            continue
+        for value, unit in DURATION_PATTERN.findall(match.group(2)):
+            seconds = float(value) / 1000 if unit.lower().startswith('m') else float(value)
+            durations[match.group(1)] = durations.get(
+                match.group(1), 0.0) + seconds
+
+    return durations
+
+
+def parse_pipeline_metadata(metadata) -> dict:
+    """Gathers the point counts Pdal stages report in the pipeline metadata.
+
+    Parameters
+    ----------
+    metadata : str or dict
+        Metadata of an executed Pdal pipeline, as JSON text (python-pdal 2) or a dict (python-pdal 3)
+
+    Returns
+    -------
+    dict
+        Reported point count of every stage, keyed by stage name (e.g filters.crop)
+    """
+    if(isinstance(metadata, (str, bytes))):
+        try:
+            metadata = loads(metadata)
+        except ValueError:
+            return {}
+
+    stages = metadata.get('metadata', metadata) if isinstance(
+        metadata, dict) else {}
+    counts = {}
+    for name, values in stages.items():
+        for value in (values if isinstance(values, list) else [values]):
+            if(not isinstance(value, dict)):
+                continue
+            for key in ['count', 'num_points', 'points']:
+                if(isinstance(value.get(key), (int, float))):
+                    counts[name] = counts.get(name, 0) + value[key]
+                    break
+
+    return counts
+
+
+def record_pipeline_metrics(metrics: Metrics, pipeline) -> None:
+    """Records the stage durations and point counts parsed from an executed Pdal pipeline.
+
+    Parameters
+    ----------
+    metrics : Metrics
+        Metrics to record in
+    pipeline : pdal.Pipeline
+        The executed pipeline
+
+    Returns
+    -------
+    None
+    """
+    if(not metrics.enabled):
+        return
+
+    for stage, seconds in parse_pipeline_log(getattr(pipeline, 'log', '')).items():
+        metrics.add_span(f'pdal.{stage}', seconds)
+    for stage, count in parse_pipeline_metadata(getattr(pipeline, 'metadata', {})).items():
+        metrics.increment(f'{stage}.points', count)
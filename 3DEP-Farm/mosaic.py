@@ -0,0 +1,129 @@
+import re
+import numpy as np
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('Mosaic')
+logger = logger.get_default_logger()
+
+# Metres along a degree of a great circle, on the sphere Web Mercator projects from
+METRES_PER_DEGREE = 6378137.0 * np.pi / 180
+
+
+def get_year_value(year: str) -> int:
+    """Extracts the latest year of a catalog year value (e.g 2012, 2015-2016 or FullState).
+
+    Parameters
+    ----------
+    year : str
+        Year value of a region variant
+
+    Returns
+    -------
+    int
+        Latest four digit year found, -1 if there is none
+    """
+    years = re.findall(r'(?:19|20)\d{2}', year)
+
+    return max(map(int, years)) if len(years) > 0 else -1
+
+
+def order_sources(candidates: list, priority='newest') -> list:
+    """Orders region variants from the highest to the lowest priority.
+
+    Parameters
+    ----------
+    candidates : list
+        RegionCandidate values of the region variants
+    priority : str or list, optional
+        'newest' or 'oldest' to order by year (coverage breaking ties), 'coverage' to keep the coverage
+        ranking, or a list of region_year names where names listed first win and unlisted variants come last
+
+    Returns
+    -------
+    list
+        The region variants ordered by priority
+    """
+    if(priority == 'coverage'):
+        return list(candidates)
+    elif(priority == 'newest'):
+        return sorted(candidates, key=lambda candidate: -get_year_value(candidate.year))
+    elif(priority == 'oldest'):
+        return sorted(candidates, key=lambda candidate: get_year_value(candidate.year))
+    elif(isinstance(priority, (list, tuple))):
+        rank = {name: index for index, name in enumerate(priority)}
+        return sorted(candidates, key=lambda candidate: rank.get(f'{candidate.region}_{candidate.year}', len(rank)))
+    else:
+        raise ValueError(f'Invalid source priority: {priority}')
+
+
+def get_cell_sizes(cell_size: float, epsg: str, points: np.array) -> tuple:
+    """Converts a cell size in metres to the width and height of the cells in the units of a CRS. In a
+    geographic CRS a metre spans more degrees of longitude away from the equator, the latitude of the points
+    center is used.
+
+    Parameters
+    ----------
+    cell_size : float
+        Size of the cells in metres
+    epsg : str
+        CRS of the points
+    points : np.array
+        Cloud points with x, y and z values in a single element, x being the longitude in a geographic CRS
+
+    Returns
+    -------
+    tuple
+        Width and height of the cells in the CRS units
+    """
+    from pyproj import CRS
+
+    crs = CRS.from_user_input(f'EPSG:{epsg}')
+    if(crs.is_geographic):
+        latitude = np.radians((np.min(points[:, 1]) + np.max(points[:, 1])) / 2) if len(points) > 0 else 0
+        return cell_size / (METRES_PER_DEGREE * np.cos(latitude)), cell_size / METRES_PER_DEGREE
+
+    # Projected units, e.g US survey feet, are converted from metres
+    size = cell_size / crs.axis_info[0].unit_conversion_factor
+
+    return size, size
+
+
+def resolve_overlaps(points: np.array, sources: np.array, cell_size) -> np.array:
+    """Resolves overlapping coverage of several sources. The xy plane is split into cells and in every cell
+    only the points of the highest priority source present in that cell are kept.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    sources : np.array
+        Source rank of every point, lower ranks have higher priority
+    cell_size : float or tuple
+        Size of the cells coverage is compared in, or their width and height, in the units of the points
+        (see get_cell_sizes)
+
+    Returns
+    -------
+    np.array
+        Boolean mask of the points to keep
+    """
+    if(len(points) == 0):
+        return np.zeros(0, dtype=bool)
+
+    cells = ((points[:, :2] - np.min(points[:, :2], axis=0)) //
+             np.asarray(cell_size, dtype=np.float64)).astype(np.int64)
+    keys = cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(
+        np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    segment_ids = np.repeat(np.arange(len(starts)),
+                            np.diff(np.append(starts, len(keys))))
+
+    best_sources = np.minimum.reduceat(sources[order], starts)
+
+    keep = np.empty(len(points), dtype=bool)
+    keep[order] = sources[order] == best_sources[segment_ids]
+
+    return keep
@@ -0,0 +1,206 @@
+import os
+from functools import lru_cache
+from hashlib import sha256
+from json import load, dumps
+from typing import NamedTuple
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('PipelineSpec')
+logger = logger.get_default_logger()
+
+
+class FrozenMapping(tuple):
+    """Hashable, immutable mapping stored as sorted (key, value) pairs."""
+
+    # Never equal to a plain tuple of pairs, so a mapping and a list of pairs do not share a hash
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FrozenMapping) and tuple.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash((FrozenMapping, tuple(self)))
+
+    def to_dict(self) -> dict:
+        return {key: thaw(value) for key, value in self}
+
+
+def freeze(value):
+    """Converts a JSON value to an immutable, hashable equivalent (dicts to FrozenMapping, lists to tuples).
+
+    Parameters
+    ----------
+    value : object
+        JSON value
+
+    Returns
+    -------
+    object
+        The immutable value
+    """
+    if(isinstance(value, dict)):
+        return FrozenMapping(sorted((key, freeze(item)) for key, item in value.items()))
+    elif(isinstance(value, (list, tuple))):
+        return tuple(freeze(item) for item in value)
+
+    return value
+
+
+def thaw(value):
+    """Converts a frozen value back to its JSON equivalent.
+
+    Parameters
+    ----------
+    value : object
+        Value returned by freeze
+
+    Returns
+    -------
+    object
+        The JSON value
+    """
+    if(isinstance(value, FrozenMapping)):
+        return value.to_dict()
+    elif(isinstance(value, tuple)):
+        return [thaw(item) for item in value]
+
+    return value
+
+
+class Stage(NamedTuple):
+    """Immutable Pdal pipeline stage. Options are kept sorted, so equal stages compare and hash equally
+    whatever order their options were given in.
+    """
+    options: FrozenMapping
+
+    def get(self, key: str, default=None):
+        for option, value in self.options:
+            if(option == key):
+                return thaw(value)
+
+        return default
+
+    def get_type(self) -> str:
+        return self.get('type', '')
+
+    def with_options(self, **options) -> 'Stage':
+        """Returns a copy of the stage with options added or replaced.
+
+        Parameters
+        ----------
+        options : dict
+            Options to set
+
+        Returns
+        -------
+        Stage
+            The new stage
+        """
+        return create_stage({**self.options.to_dict(), **options})
+
+    def to_dict(self) -> dict:
+        return self.options.to_dict()
+
+
+def create_stage(options: dict) -> Stage:
+    """Creates an immutable stage from its options.
+
+    Parameters
+    ----------
+    options : dict
+        Options of the stage as in a Pdal pipeline JSON, type included
+
+    Returns
+    -------
+    Stage
+        The stage
+    """
+    return Stage(freeze(dict(options)))
+
+
+class PipelineSpec(NamedTuple):
+    """Immutable, hashable description of a Pdal pipeline as a sequence of stages. Specs are composed per
+    request from shared template stages, and compiled to pipeline JSON through a memoized function.
+    """
+    stages: tuple
+
+    def append(self, *stages: Stage) -> 'PipelineSpec':
+        return PipelineSpec(self.stages + tuple(stages))
+
+    def to_list(self) -> list:
+        return [stage.to_dict() for stage in self.stages]
+
+    def to_json(self) -> str:
+        return compile_pipeline(self)
+
+    def get_hash(self) -> str:
+        return get_spec_hash(self)
+
+
+@lru_cache(maxsize=4096)
+def compile_pipeline(spec: PipelineSpec) -> str:
+    """Compiles a pipeline spec to Pdal pipeline JSON. Results are memoized, so equal specs share a single
+    JSON string.
+
+    Parameters
+    ----------
+    spec : PipelineSpec
+        The pipeline spec
+
+    Returns
+    -------
+    str
+        Pipeline JSON
+    """
+    return dumps(spec.to_list())
+
+
+@lru_cache(maxsize=4096)
+def get_spec_hash(spec: PipelineSpec) -> str:
+    """Calculates the canonical hash of a pipeline spec, independent of option order and formatting, usable
+    as the cache key of the fetch the spec describes.
+
+    Parameters
+    ----------
+    spec : PipelineSpec
+        The pipeline spec
+
+    Returns
+    -------
+    str
+        Hex digest of the spec
+    """
+    canonical = dumps(spec.to_list(), sort_keys=True,
+                      separators=(',', ':'), ensure_ascii=True)
+
+    return sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=32)
+def read_template_stages(file_name: str, modified: float) -> FrozenMapping:
+    with open(file_name, 'r') as read_file:
+        template = load(read_file)
+
+    logger.info(f'Successfully Loaded Pdal Pipeline Template {file_name}')
+
+    return FrozenMapping(sorted((name, create_stage(options)) for name, options in template.items()))
+
+
+def load_template_stages(file_name: str = './pipeline_template.json') -> dict:
+    """Loads the stages of a pipeline template. The file is only read again when it changes, and the
+    immutable stages are shared by every caller, so they can be used across threads without copies.
+
+    Parameters
+    ----------
+    file_name : str, optional
+        Path plus file name of the pipeline template
+
+    Returns
+    -------
+    dict
+        Stage of every template entry, keyed by entry name (e.g reader or cropping_filter)
+    """
+    file_name = os.path.abspath(file_name)
+
+    return dict(read_template_stages(file_name, os.path.getmtime(file_name)))
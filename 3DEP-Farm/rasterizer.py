@@ -0,0 +1,439 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .logger_creator import CreateLogger
+from .shared_cloud import SharedPointCloud, SharedCloudDescriptor
+
+logger = CreateLogger('Rasterizer')
+logger = logger.get_default_logger()
+
+RASTER_OUTPUTS = ['min', 'max', 'mean', 'idw', 'count', 'stdev']
+
+
+def get_raster_shape(bounds: tuple, resolution: float) -> tuple:
+    """Calculates the number of rows and columns of a raster covering bounds, the same way Pdal's
+    writers.gdal does.
+
+    Parameters
+    ----------
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the raster
+    resolution : float
+        Width and height of a raster cell
+
+    Returns
+    -------
+    tuple
+        Number of rows and columns
+    """
+    minx, miny, maxx, maxy = bounds
+
+    return int((maxy - miny) // resolution) + 1, int((maxx - minx) // resolution) + 1
+
+
+class RasterAccumulator():
+    """Bins cloud points into a north up raster grid, accumulating every statistic in a single pass over the
+    points. Like Pdal's writers.gdal, a point contributes to every cell whose center is within the radius.
+    Chunks can be added one at a time, and accumulators of neighbouring row bands can be stacked.
+
+    Parameters
+    ----------
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the raster
+    resolution : float
+        Width and height of a raster cell
+    radius : float, optional
+        Distance from a cell center within which points contribute to the cell, defaults to resolution * sqrt(2)
+    power : float, optional
+        Power of the inverse distance weighting
+    row_range : tuple, optional
+        First and last (exclusive) raster row accumulated, defaults to every row
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, bounds: tuple, resolution: float, radius: float = 0, power: float = 1.0, row_range: tuple = None) -> None:
+        self.bounds = tuple(float(value) for value in bounds)
+        self.resolution = resolution
+        self.radius = radius if radius > 0 else resolution * np.sqrt(2)
+        self.power = power
+        self.height, self.width = get_raster_shape(self.bounds, resolution)
+        self.row_start, self.row_stop = row_range if row_range is not None else (
+            0, self.height)
+
+        shape = (self.row_stop - self.row_start, self.width)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.square_sum = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.weight_sum = np.zeros(shape)
+        self.weighted_sum = np.zeros(shape)
+
+    def add(self, chunk: np.array) -> None:
+        """Adds a chunk of points to the raster.
+
+        Parameters
+        ----------
+        chunk : np.array
+            Cloud points with x, y and z values in a single element
+
+        Returns
+        -------
+        None
+        """
+        if(len(chunk) == 0):
+            return
+
+        minx, _, _, maxy = self.bounds
+        z = np.asarray(chunk[:, 2], dtype=np.float64)
+        column_positions = (np.asarray(
+            chunk[:, 0], dtype=np.float64) - minx) / self.resolution
+        row_positions = (
+            maxy - np.asarray(chunk[:, 1], dtype=np.float64)) / self.resolution
+        columns = np.floor(column_positions).astype(np.int64)
+        rows = np.floor(row_positions).astype(np.int64)
+        # Position of the points inside their cell, relative to the cell center
+        column_positions -= columns + 0.5
+        row_positions -= rows + 0.5
+
+        all_cells, all_values, all_distances = [], [], []
+        reach = int(np.ceil(self.radius / self.resolution))
+        for row_offset in range(-reach, reach + 1):
+            for column_offset in range(-reach, reach + 1):
+                # Skip neighbour cells no point of the cell can be within the radius of
+                if(np.hypot(max(abs(row_offset) - 0.5, 0), max(abs(column_offset) - 0.5, 0)) * self.resolution > self.radius):
+                    continue
+
+                cell_rows = rows + row_offset
+                cell_columns = columns + column_offset
+                distances = np.hypot(column_positions - column_offset,
+                                     row_positions - row_offset) * self.resolution
+
+                inside = (distances <= self.radius) & (cell_rows >= self.row_start) & (cell_rows < self.row_stop) & \
+                    (cell_columns >= 0) & (cell_columns < self.width)
+
+                all_cells.append(
+                    (cell_rows[inside] - self.row_start) * self.width + cell_columns[inside])
+                all_values.append(z[inside])
+                all_distances.append(distances[inside])
+
+        cells = np.concatenate(all_cells)
+        values = np.concatenate(all_values)
+        weights = 1 / np.maximum(np.concatenate(all_distances), 1e-9) ** self.power
+
+        shape, size = self.count.shape, self.count.size
+        self.count += np.bincount(cells, minlength=size).reshape(shape)
+        self.sum += np.bincount(cells, values, minlength=size).reshape(shape)
+        self.square_sum += np.bincount(cells, values * values,
+                                       minlength=size).reshape(shape)
+        self.weight_sum += np.bincount(cells, weights,
+                                       minlength=size).reshape(shape)
+        self.weighted_sum += np.bincount(cells, weights * values,
+                                         minlength=size).reshape(shape)
+        np.minimum.at(self.min.reshape(-1), cells, values)
+        np.maximum.at(self.max.reshape(-1), cells, values)
+
+    def stack(self, bands: list) -> None:
+        """Fills the accumulator with the accumulators of consecutive row bands covering all of its rows.
+
+        Parameters
+        ----------
+        bands : list
+            RasterAccumulator values of the row bands, ordered by row
+
+        Returns
+        -------
+        None
+        """
+        for name in ['count', 'sum', 'square_sum', 'min', 'max', 'weight_sum', 'weighted_sum']:
+            setattr(self, name, np.vstack(
+                [getattr(band, name) for band in bands]))
+
+    def get_raster(self, output: str, window_size: int = 0, nodata: float = np.nan) -> np.array:
+        """Returns a statistic of the accumulated points as a raster.
+
+        Parameters
+        ----------
+        output : str
+            One of min, max, mean, idw, count or stdev
+        window_size : int, optional
+            If provided, empty cells are filled with the inverse distance weighted average of the non empty cells
+            within this many cells, like writers.gdal's window_size
+        nodata : float, optional
+            Value of the cells without any point
+
+        Returns
+        -------
+        np.array
+            Raster of the statistic, row 0 being the northern edge
+        """
+        empty = self.count == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if(output == 'min'):
+                raster = self.min.copy()
+            elif(output == 'max'):
+                raster = self.max.copy()
+            elif(output == 'mean'):
+                raster = self.sum / self.count
+            elif(output == 'idw'):
+                raster = self.weighted_sum / self.weight_sum
+            elif(output == 'count'):
+                raster = self.count.astype(np.float64)
+            elif(output == 'stdev'):
+                raster = np.sqrt(np.maximum(
+                    self.square_sum / self.count - np.square(self.sum / self.count), 0))
+            else:
+                raise ValueError(
+                    f'Invalid raster output: {output}, expected one of {RASTER_OUTPUTS}')
+
+        if(output != 'count'):
+            raster[empty] = np.nan
+            if(window_size > 0):
+                raster = fill_window(raster, window_size)
+            raster[np.isnan(raster)] = nodata
+
+        return raster
+
+
+def fill_window(raster: np.array, window_size: int) -> np.array:
+    """Fills empty (nan) cells with the inverse distance weighted average of the non empty cells within a
+    square window around them.
+
+    Parameters
+    ----------
+    raster : np.array
+        Raster with nan values in the empty cells
+    window_size : int
+        Number of cells the window reaches on every side
+
+    Returns
+    -------
+    np.array
+        The filled raster, cells without any non empty cell in their window stay nan
+    """
+    empty = np.isnan(raster)
+    if(not empty.any()):
+        return raster
+
+    height, width = raster.shape
+    padded = np.pad(raster, window_size, constant_values=np.nan)
+    weight_sum = np.zeros(raster.shape)
+    weighted_sum = np.zeros(raster.shape)
+
+    for row_offset in range(-window_size, window_size + 1):
+        for column_offset in range(-window_size, window_size + 1):
+            if(row_offset == 0 and column_offset == 0):
+                continue
+            neighbours = padded[window_size + row_offset:window_size + row_offset + height,
+                                window_size + column_offset:window_size + column_offset + width]
+            present = ~np.isnan(neighbours)
+            weight = 1 / np.hypot(row_offset, column_offset)
+            weight_sum += present * weight
+            weighted_sum += np.where(present, neighbours, 0) * weight
+
+    filled = raster.copy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filled[empty] = (weighted_sum / weight_sum)[empty]
+
+    return filled
+
+
+def get_points_bounds(points: np.array) -> tuple:
+    return tuple(np.min(points[:, :2], axis=0)) + tuple(np.max(points[:, :2], axis=0))
+
+
+def rasterize_band(points: np.array, bounds: tuple, resolution: float, radius: float, power: float, row_range: tuple) -> RasterAccumulator:
+    """Accumulates the points of one row band, used as the process pool worker of rasterize.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points of the band, halo rows included
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the whole raster
+    resolution : float
+        Width and height of a raster cell
+    radius : float
+        Distance from a cell center within which points contribute to the cell
+    power : float
+        Power of the inverse distance weighting
+    row_range : tuple
+        First and last (exclusive) raster row of the band
+
+    Returns
+    -------
+    RasterAccumulator
+        The accumulated band
+    """
+    accumulator = RasterAccumulator(
+        bounds, resolution, radius, power, row_range)
+    accumulator.add(points)
+
+    return accumulator
+
+
+def get_band_points(points: np.array, bounds: tuple, resolution: float, radius: float, row_range: tuple) -> np.array:
+    """Selects the points of a row band, with a halo of the rows the radius reaches into.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the whole raster
+    resolution : float
+        Width and height of a raster cell
+    radius : float
+        Distance from a cell center within which points contribute to the cell
+    row_range : tuple
+        First and last (exclusive) raster row of the band
+
+    Returns
+    -------
+    np.array
+        Copy of the points of the band
+    """
+    reach = int(np.ceil(radius / resolution))
+    rows = np.floor((bounds[3] - points[:, 1]) / resolution)
+
+    return points[(rows >= row_range[0] - reach) & (rows < row_range[1] + reach)]
+
+
+def rasterize_shared_band(descriptor: SharedCloudDescriptor, bounds: tuple, resolution: float, radius: float,
+                          power: float, row_range: tuple) -> RasterAccumulator:
+    """Accumulates one row band of a shared point cloud, used as the process pool worker of rasterize. The
+    cloud is attached without copying, only the points of the band are copied out of it.
+
+    Parameters
+    ----------
+    descriptor : SharedCloudDescriptor
+        Descriptor of the shared cloud points
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the whole raster
+    resolution : float
+        Width and height of a raster cell
+    radius : float
+        Distance from a cell center within which points contribute to the cell
+    power : float
+        Power of the inverse distance weighting
+    row_range : tuple
+        First and last (exclusive) raster row of the band
+
+    Returns
+    -------
+    RasterAccumulator
+        The accumulated band
+    """
+    cloud = SharedPointCloud.attach(descriptor)
+    try:
+        band_points = get_band_points(
+            cloud.points, bounds, resolution, radius, row_range)
+    finally:
+        cloud.close()
+
+    return rasterize_band(band_points, bounds, resolution, radius, power, row_range)
+
+
+def rasterize(points: np.array, resolution: float, bounds: tuple = None, radius: float = 0, power: float = 1.0,
+              max_workers: int = 1) -> RasterAccumulator:
+    """Bins in-memory cloud points into a raster. The raster is split in row bands accumulated in parallel
+    processes, which attach to the points in shared memory and only take the points within the radius of
+    their rows.
+
+    Parameters
+    ----------
+    points : np.array or SharedPointCloud
+        Cloud points with x, y and z values in a single element. A SharedPointCloud is used by the workers as
+        it is, other points are copied to shared memory once
+    resolution : float
+        Width and height of a raster cell
+    bounds : tuple, optional
+        (minx, miny, maxx, maxy) of the raster, defaults to the extent of the points
+    radius : float, optional
+        Distance from a cell center within which points contribute to the cell, defaults to resolution * sqrt(2)
+    power : float, optional
+        Power of the inverse distance weighting
+    max_workers : int, optional
+        Number of row bands accumulated at the same time, 0 uses every core
+
+    Returns
+    -------
+    RasterAccumulator
+        Accumulated raster, statistics are read with get_raster
+    """
+    cloud = points if isinstance(points, SharedPointCloud) else None
+    if(cloud is not None):
+        points = cloud.points
+
+    bounds = bounds if bounds is not None else get_points_bounds(points)
+    accumulator = RasterAccumulator(bounds, resolution, radius, power)
+    max_workers = min(max_workers if max_workers > 0 else (
+        os.cpu_count() or 1), accumulator.height)
+
+    if(max_workers <= 1 or len(points) == 0):
+        accumulator.add(points)
+        return accumulator
+
+    edges = np.linspace(0, accumulator.height, max_workers + 1).astype(int)
+    owned = cloud is None
+    if(owned):
+        cloud = SharedPointCloud.from_array(points)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            bands = list(executor.map(rasterize_shared_band, [cloud.descriptor] * max_workers, [bounds] * max_workers,
+                                      [resolution] * max_workers, [accumulator.radius] * max_workers,
+                                      [power] * max_workers, list(zip(edges[:-1], edges[1:]))))
+    finally:
+        if(owned):
+            cloud.close()
+            cloud.unlink()
+
+    accumulator.stack(bands)
+
+    logger.info(
+        f'Successfully Rasterized {len(points)} Points with {max_workers} Workers')
+
+    return accumulator
+
+
+def rasterize_chunks(get_chunks, resolution: float, bounds: tuple = None, radius: float = 0, power: float = 1.0) -> RasterAccumulator:
+    """Bins streamed cloud points into a raster, one chunk at a time.
+
+    Parameters
+    ----------
+    get_chunks : callable
+        Function without arguments returning a new iterable over the point chunks on every call, only called
+        twice when the bounds are not provided
+    resolution : float
+        Width and height of a raster cell
+    bounds : tuple, optional
+        (minx, miny, maxx, maxy) of the raster, defaults to the extent of the points
+    radius : float, optional
+        Distance from a cell center within which points contribute to the cell, defaults to resolution * sqrt(2)
+    power : float, optional
+        Power of the inverse distance weighting
+
+    Returns
+    -------
+    RasterAccumulator
+        Accumulated raster, statistics are read with get_raster
+    """
+    if(bounds is None):
+        minimum, maximum = np.full(2, np.inf), np.full(2, -np.inf)
+        for chunk in get_chunks():
+            if(len(chunk) > 0):
+                minimum = np.minimum(minimum, np.min(chunk[:, :2], axis=0))
+                maximum = np.maximum(maximum, np.max(chunk[:, :2], axis=0))
+        if(np.isinf(minimum).any()):
+            raise ValueError('No points to rasterize')
+        bounds = tuple(minimum) + tuple(maximum)
+
+    accumulator = RasterAccumulator(bounds, resolution, radius, power)
+    for chunk in get_chunks():
+        accumulator.add(chunk)
+
+    return accumulator
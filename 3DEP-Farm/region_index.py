@@ -0,0 +1,296 @@
+import os
+from ast import literal_eval
+from typing import List, NamedTuple
+import numpy as np
+from .logger_creator import CreateLogger
+from .catalog import load_catalog, get_variant_bounds
+
+logger = CreateLogger('RegionIndex')
+logger = logger.get_default_logger()
+
+# Region indexes already built in this process, keyed by the absolute catalog path
+_loaded_indexes = {}
+
+
+class RegionCandidate(NamedTuple):
+    """A single region/year variant of the AWS dataset matching a bounding box query.
+
+    Attributes
+    ----------
+    region : str
+        Region name as listed in the AWS dataset catalog
+    year : str
+        Year (or year range) of the region variant
+    access_url : str
+        Access url of the variant's ept.json file
+    bounds : tuple
+        Bounds of the variant in EPSG:3857 (minx, miny, maxx, maxy)
+    coverage : float
+        Fraction of the queried bounding box covered by the variant bounds
+    contains : bool
+        Whether the variant bounds fully contain the queried bounding box
+    """
+    region: str
+    year: str
+    access_url: str
+    bounds: tuple
+    coverage: float
+    contains: bool
+
+
+def str_pack_order(boxes: np.array, node_capacity: int) -> np.array:
+    """Calculates the Sort-Tile-Recursive packing order of the given boxes.
+
+    Parameters
+    ----------
+    boxes : np.array
+        Array of boxes with (minx, miny, maxx, maxy) values in a single element
+    node_capacity : int
+        Maximum number of boxes grouped into a single node
+
+    Returns
+    -------
+    np.array
+        Permutation of the box indices, consecutive runs of node_capacity boxes form a node
+    """
+    number_of_nodes = int(np.ceil(len(boxes) / node_capacity))
+    slice_size = int(np.ceil(np.sqrt(number_of_nodes))) * node_capacity
+
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    center_y = (boxes[:, 1] + boxes[:, 3]) / 2
+
+    rank_x = np.empty(len(boxes), dtype=np.int64)
+    rank_x[np.argsort(center_x, kind='stable')] = np.arange(len(boxes))
+
+    return np.lexsort((center_y, rank_x // slice_size))
+
+
+class RegionIndex():
+    """STR packed R-tree over the region bounds of the AWS dataset catalog, answering which
+    region variants contain or intersect a bounding box.
+
+    Parameters
+    ----------
+    bounds : np.array
+        Array of (minx, miny, maxx, maxy) values in EPSG:3857 for every region variant
+    regions : list
+        Region names for every region variant
+    years : list
+        Years of every region variant
+    access_urls : list
+        Access urls of every region variant
+    node_capacity : int, optional
+        Maximum number of children held by a single tree node
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, bounds: np.array, regions: list, years: list, access_urls: list, node_capacity: int = 16) -> None:
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self.regions = regions
+        self.years = years
+        self.access_urls = access_urls
+        self.node_capacity = node_capacity
+
+        self.build_tree()
+
+    def build_tree(self) -> None:
+        """Builds the tree levels bottom up, each level holding its node boxes and the packed order
+        of the children of its nodes.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        # Level 0 holds the region variants themselves
+        self.level_boxes = [self.bounds]
+        self.level_children = [None]
+
+        boxes = self.bounds
+        while len(boxes) > 1:
+            order = str_pack_order(boxes, self.node_capacity)
+            starts = np.arange(0, len(boxes), self.node_capacity)
+            packed = boxes[order]
+
+            boxes = np.column_stack((np.minimum.reduceat(packed[:, 0], starts),
+                                     np.minimum.reduceat(packed[:, 1], starts),
+                                     np.maximum.reduceat(packed[:, 2], starts),
+                                     np.maximum.reduceat(packed[:, 3], starts)))
+
+            self.level_boxes.append(boxes)
+            self.level_children.append(order)
+
+    def expand_children(self, level: int, nodes: np.array) -> np.array:
+        """Returns the children indices (in the level below) of the given nodes.
+
+        Parameters
+        ----------
+        level : int
+            Tree level the nodes belong to
+        nodes : np.array
+            Indices of the nodes in their level
+
+        Returns
+        -------
+        np.array
+            Indices of the children in the level below
+        """
+        order = self.level_children[level]
+        starts = nodes * self.node_capacity
+        counts = np.minimum(self.node_capacity, len(order) - starts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        return order[np.repeat(starts, counts) + offsets]
+
+    def query_indices(self, minx: float, miny: float, maxx: float, maxy: float) -> np.array:
+        """Searches the tree for the region variants whose bounds intersect a bounding box.
+
+        Parameters
+        ----------
+        minx : float
+            Minimum x value of the bounding box in EPSG:3857
+        miny : float
+            Minimum y value of the bounding box in EPSG:3857
+        maxx : float
+            Maximum x value of the bounding box in EPSG:3857
+        maxy : float
+            Maximum y value of the bounding box in EPSG:3857
+
+        Returns
+        -------
+        np.array
+            Catalog indices of the intersecting region variants
+        """
+        level = len(self.level_boxes) - 1
+        nodes = np.arange(len(self.level_boxes[level]))
+
+        while True:
+            boxes = self.level_boxes[level][nodes]
+            hits = (boxes[:, 0] <= maxx) & (boxes[:, 2] >= minx) & (
+                boxes[:, 1] <= maxy) & (boxes[:, 3] >= miny)
+            nodes = nodes[hits]
+
+            if(level == 0 or len(nodes) == 0):
+                return nodes
+
+            nodes = self.expand_children(level, nodes)
+            level -= 1
+
+    def query(self, minx: float, miny: float, maxx: float, maxy: float, predicate: str = 'intersects') -> List[RegionCandidate]:
+        """Returns every region variant which intersects or contains a bounding box ranked by how
+        much of the bounding box it covers.
+
+        Parameters
+        ----------
+        minx : float
+            Minimum x value of the bounding box in EPSG:3857
+        miny : float
+            Minimum y value of the bounding box in EPSG:3857
+        maxx : float
+            Maximum x value of the bounding box in EPSG:3857
+        maxy : float
+            Maximum y value of the bounding box in EPSG:3857
+        predicate : str, optional
+            Either 'intersects' or 'contains'
+
+        Returns
+        -------
+        List[RegionCandidate]
+            Matching region variants, best coverage first and catalog order among equal coverages
+        """
+        if(predicate not in ['intersects', 'contains']):
+            raise ValueError(f'Invalid predicate: {predicate}')
+
+        indices = np.sort(self.query_indices(minx, miny, maxx, maxy))
+        boxes = self.bounds[indices]
+
+        contains = (boxes[:, 0] <= minx) & (boxes[:, 1] <= miny) & (
+            boxes[:, 2] >= maxx) & (boxes[:, 3] >= maxy)
+
+        width = np.minimum(boxes[:, 2], maxx) - np.maximum(boxes[:, 0], minx)
+        height = np.minimum(boxes[:, 3], maxy) - np.maximum(boxes[:, 1], miny)
+        area = (maxx - minx) * (maxy - miny)
+        if(area > 0):
+            coverage = np.clip(width * height / area, 0, 1)
+        else:
+            coverage = contains.astype(np.float64)
+
+        if(predicate == 'contains'):
+            indices, boxes, contains, coverage = indices[contains], boxes[contains], contains[contains], coverage[contains]
+
+        ranking = np.argsort(-coverage, kind='stable')
+
+        return [RegionCandidate(self.regions[indices[i]], self.years[indices[i]], self.access_urls[indices[i]],
+                                tuple(boxes[i].tolist()), float(coverage[i]), bool(contains[i]))
+                for i in ranking]
+
+
+def read_catalog_csv(file_name: str) -> tuple:
+    """Reads the AWS dataset catalog CSV into one entry per region variant.
+
+    Parameters
+    ----------
+    file_name : str
+        Path plus file name of the aws_dataset.csv catalog
+
+    Returns
+    -------
+    tuple
+        Tuple of bounds array (minx, miny, maxx, maxy), region names, years and access urls lists
+    """
+    import pandas as pd
+
+    catalog = pd.read_csv(file_name)
+
+    bounds, regions, years, access_urls = [], [], [], []
+    for region, bound, year, access_url in zip(catalog['Region/s'], catalog['Bound/s'], catalog['Year/s'], catalog['Access Url/s']):
+        access_url = literal_eval(access_url)
+        for variant_bound, variant_year, variant_url in zip(get_variant_bounds(literal_eval(bound), len(access_url)),
+                                                            literal_eval(year), access_url):
+            # ept.json bounds: [minx, miny, minz, maxx, maxy, maxz]
+            bounds.append([variant_bound[0], variant_bound[1],
+                           variant_bound[3], variant_bound[4]])
+            regions.append(region)
+            years.append(variant_year)
+            access_urls.append(variant_url)
+
+    return np.array(bounds, dtype=np.float64), regions, years, access_urls
+
+
+def load_region_index(file_name: str = '') -> RegionIndex:
+    """Loads the region index of an AWS dataset catalog, building it only the first time the
+    catalog is requested in the process.
+
+    Parameters
+    ----------
+    file_name : str, optional
+        Path plus file name of a compiled .catalog file or an aws_dataset.csv catalog. If not provided
+        ./aws_dataset.catalog is used when it exists, otherwise ./aws_dataset.csv
+
+    Returns
+    -------
+    RegionIndex
+        Region index over every region variant of the catalog
+    """
+    if(file_name == ''):
+        file_name = './aws_dataset.catalog' if os.path.exists(
+            './aws_dataset.catalog') else './aws_dataset.csv'
+
+    key = os.path.abspath(file_name)
+    if(key not in _loaded_indexes):
+        if(file_name.endswith('.csv')):
+            _loaded_indexes[key] = RegionIndex(*read_catalog_csv(file_name))
+        else:
+            catalog = load_catalog(file_name)
+            _loaded_indexes[key] = RegionIndex(catalog.bounds[:, [0, 1, 3, 4]], catalog.regions,
+                                               catalog.years, catalog.access_urls)
+
+        logger.info(f'Successfully Built Region Index from {file_name}')
+
+    return _loaded_indexes[key]
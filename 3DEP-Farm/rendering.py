@@ -0,0 +1,238 @@
+import numpy as np
+from .logger_creator import CreateLogger
+from .rasterizer import fill_window, get_points_bounds
+from .mosaic import get_cell_sizes
+
+logger = CreateLogger('Rendering')
+logger = logger.get_default_logger()
+
+# Points binned at a time, bounding the memory of the pixel indices
+BIN_CHUNK_SIZE = 1 << 22
+
+
+def get_image_shape(bounds: tuple, pixels: int) -> tuple:
+    """Calculates the rows and columns of an image covering bounds, its longest side having pixels cells and
+    its cells being square.
+
+    Parameters
+    ----------
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the image
+    pixels : int
+        Number of cells along the longest side
+
+    Returns
+    -------
+    tuple
+        Number of rows and columns, and the width of a cell
+    """
+    minx, miny, maxx, maxy = bounds
+    cell_size = max(maxx - minx, maxy - miny, 1e-9) / pixels
+
+    return max(int(np.ceil((maxy - miny) / cell_size)), 1), max(int(np.ceil((maxx - minx) / cell_size)), 1), cell_size
+
+
+def bin_elevation(points: np.array, bounds: tuple, pixels: int = 1000) -> tuple:
+    """Bins cloud points into an image of their mean elevation per cell. Every point falls into a single
+    cell, so the image is built in one vectorized pass and its size does not depend on the number of points.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the image
+    pixels : int, optional
+        Number of cells along the longest side
+
+    Returns
+    -------
+    tuple
+        Elevation image with nan in the empty cells, row 0 being the northern edge, and the width of a cell
+    """
+    height, width, cell_size = get_image_shape(bounds, pixels)
+    minx, _, _, maxy = bounds
+    count = np.zeros(height * width)
+    total = np.zeros(height * width)
+
+    for start in range(0, len(points), BIN_CHUNK_SIZE):
+        chunk = points[start:start + BIN_CHUNK_SIZE]
+        rows = np.clip(((maxy - chunk[:, 1]) / cell_size).astype(np.int64), 0, height - 1)
+        columns = np.clip(((chunk[:, 0] - minx) / cell_size).astype(np.int64), 0, width - 1)
+        cells = rows * width + columns
+        count += np.bincount(cells, minlength=count.size)
+        total += np.bincount(cells, np.asarray(chunk[:, 2], dtype=np.float64), minlength=count.size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        elevation = (total / count).reshape(height, width)
+
+    return elevation, cell_size
+
+
+def get_ground_cell_size(cell_size: float, epsg: str, bounds: tuple) -> tuple:
+    """Converts the size of a cell in the units of a CRS to metres, the unit of 3DEP elevations, so slopes
+    are not inflated by degree or feet cells.
+
+    Parameters
+    ----------
+    cell_size : float
+        Width and height of a cell in the CRS units
+    epsg : str
+        CRS of the image
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the image
+
+    Returns
+    -------
+    tuple
+        Width and height of a cell in metres
+    """
+    width, height = get_cell_sizes(1, epsg, np.array([bounds[:2], bounds[2:]]))
+
+    return cell_size / width, cell_size / height
+
+
+def get_axis_labels(epsg: str) -> tuple:
+    """Names the horizontal axes of a CRS.
+
+    Parameters
+    ----------
+    epsg : str
+        CRS of the plotted points
+
+    Returns
+    -------
+    tuple
+        Labels of the x and y axes
+    """
+    from pyproj import CRS
+
+    crs = CRS.from_user_input(f'EPSG:{epsg}')
+    if(crs.is_geographic):
+        return 'Longitude', 'Latitude'
+
+    unit = crs.axis_info[0].unit_name
+
+    return f'Easting ({unit})', f'Northing ({unit})'
+
+
+def get_hillshade(elevation: np.array, cell_size, azimuth: float = 315, altitude: float = 45) -> np.array:
+    """Calculates the illumination of an elevation image lit from a light source.
+
+    Parameters
+    ----------
+    elevation : np.array
+        Elevation image, row 0 being the northern edge
+    cell_size : float or tuple
+        Width and height of a cell, in the units of the elevation
+    azimuth : float, optional
+        Direction the light comes from, in degrees clockwise from north
+    altitude : float, optional
+        Angle of the light above the horizon, in degrees
+
+    Returns
+    -------
+    np.array
+        Illumination between 0 and 1, nan where the slope is unknown
+    """
+    width, height = (cell_size, cell_size) if np.isscalar(cell_size) else cell_size
+    # Rows go south, so the northward gradient is the negated row gradient
+    row_gradient, east_gradient = np.gradient(elevation, height, width)
+    north_gradient = -row_gradient
+    azimuth = np.radians(azimuth)
+    altitude = np.radians(altitude)
+
+    # Cosine between the surface normal (-dz/dx, -dz/dy, 1) and the direction to the light
+    shade = (np.sin(altitude) - east_gradient * np.sin(azimuth) * np.cos(altitude) -
+             north_gradient * np.cos(azimuth) * np.cos(altitude)) / \
+        np.sqrt(1 + np.square(east_gradient) + np.square(north_gradient))
+
+    return np.clip(shade, 0, 1)
+
+
+def get_elevation_image(points: np.array, pixels: int = 1000, fill_size: int = 1, bounds: tuple = None) -> tuple:
+    """Bins cloud points into an elevation image, filling the cells left empty between neighbouring points.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+    pixels : int, optional
+        Number of cells along the longest side
+    fill_size : int, optional
+        Empty cells are filled from the non empty cells within this many cells
+    bounds : tuple, optional
+        (minx, miny, maxx, maxy) of the image, defaults to the bounds of the points
+
+    Returns
+    -------
+    tuple
+        Elevation image, the width of a cell and the bounds of the image
+    """
+    bounds = bounds if bounds is not None else get_points_bounds(points)
+    elevation, cell_size = bin_elevation(points, bounds, pixels)
+    if(fill_size > 0):
+        elevation = fill_window(elevation, fill_size)
+
+    return elevation, cell_size, bounds
+
+
+def draw_elevation_image(ax, elevation: np.array, cell_size: float, bounds: tuple, cmap: str = 'terrain',
+                         hillshade: bool = True, classes: int = 0, ground_cell_size=None):
+    """Draws an elevation image on matplotlib axes, colored by elevation and shaded by its hillshade.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes to draw on
+    elevation : np.array
+        Elevation image with nan in the empty cells, row 0 being the northern edge
+    cell_size : float
+        Width and height of a cell
+    bounds : tuple
+        (minx, miny, maxx, maxy) of the image
+    cmap : str, optional
+        Colormap of the elevation
+    hillshade : bool, optional
+        To darken the colors by the hillshade of the elevation
+    classes : int, optional
+        If provided, elevations are colored by this many quantile classes instead of continuously, unless the
+        elevations are all the same
+    ground_cell_size : float or tuple, optional
+        Width and height of a cell in the units of the elevation, used for the hillshade slopes (see
+        get_ground_cell_size). Defaults to cell_size, only right if the CRS and elevation units are the same
+
+    Returns
+    -------
+    matplotlib.cm.ScalarMappable
+        Mapping of the elevations to colors, for a colorbar
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import BoundaryNorm, Normalize
+
+    present = ~np.isnan(elevation)
+    values = elevation[present]
+    if(len(values) == 0):
+        values = np.zeros(1)
+
+    colormap = plt.get_cmap(cmap)
+    boundaries = np.unique(np.quantile(values, np.linspace(0, 1, classes + 1))) if classes > 0 else []
+    # A flat area (water, a parking lot) leaves a single boundary, colored continuously instead
+    if(len(boundaries) >= 2):
+        norm = BoundaryNorm(boundaries, colormap.N)
+    else:
+        norm = Normalize(values.min(), values.max())
+
+    image = colormap(norm(np.where(present, elevation, values.min())))
+    if(hillshade):
+        shade = get_hillshade(elevation, ground_cell_size if ground_cell_size is not None else cell_size)
+        image[..., :3] *= (0.35 + 0.65 * np.where(np.isnan(shade), 1, shade))[..., None]
+    image[..., 3] = present
+
+    minx, miny, maxx, maxy = bounds
+    height, width = elevation.shape
+    ax.imshow(image, extent=(minx, minx + width * cell_size, maxy - height * cell_size, maxy),
+              origin='upper', interpolation='nearest')
+
+    return ScalarMappable(norm=norm, cmap=colormap)
@@ -0,0 +1,454 @@
+import os
+import time
+import queue
+import threading
+import itertools
+import socketserver
+from json import dumps, loads
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from .logger_creator import CreateLogger
+from .metrics import Metrics
+from .exporters import export_points
+from .cli import DTYPES, fetch_points, sample_points
+
+logger = CreateLogger('FetchService')
+logger = logger.get_default_logger()
+
+# Spans kept for the JSON export of a long lived service, stage totals cover every span
+MAX_SPANS = 1000
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted to a full queue, the client should retry later."""
+
+
+class Job():
+    """A fetch or sample job and its outcome.
+
+    Parameters
+    ----------
+    job_id : str
+        Identifier of the job
+    job_type : str
+        Name of the runner executing the job, e.g fetch or sample
+    params : dict
+        Parameters passed to the runner
+    priority : int
+        Jobs with a lower priority value run first
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, job_id: str, job_type: str, params: dict, priority: int) -> None:
+        self.job_id = job_id
+        self.job_type = job_type
+        self.params = params
+        self.priority = priority
+        self.status = 'queued'
+        self.result = None
+        self.error = ''
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {'id': self.job_id, 'type': self.job_type, 'priority': self.priority, 'status': self.status,
+                'result': self.result, 'error': self.error, 'submitted': self.submitted,
+                'started': self.started, 'finished': self.finished}
+
+
+class JobQueue():
+    """Priority queue of jobs run by a fixed pool of worker threads. The number of queued jobs is bounded,
+    submitting to a full queue raises QueueFull instead of growing the backlog, which is the backpressure
+    signal clients retry on.
+
+    Parameters
+    ----------
+    runners : dict
+        Function running every job type, called with the job parameters and returning a JSON serializable result
+    workers : int, optional
+        Number of jobs running at the same time
+    max_queued : int, optional
+        Maximum number of jobs waiting for a worker
+    max_finished : int, optional
+        Number of finished jobs kept for status requests, the oldest are forgotten first
+    metrics : Metrics, optional
+        Metrics the job timings and counters are recorded in
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, runners: dict, workers: int = 2, max_queued: int = 64, max_finished: int = 1024,
+                 metrics: Metrics = None) -> None:
+        self.runners = runners
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.metrics = metrics if metrics is not None else Metrics(max_spans=MAX_SPANS)
+        self.jobs = {}
+        self.finished = []
+        self.queued = 0
+        self.running = 0
+        self.lock = threading.Lock()
+        self.queue = queue.PriorityQueue()
+        # Breaks priority ties in submission order
+        self.sequence = itertools.count()
+
+        self.threads = [threading.Thread(target=self.work, name=f'depfarm-worker-{index}', daemon=True)
+                        for index in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, job_type: str, params: dict, priority: int = 0) -> Job:
+        """Queues a job.
+
+        Parameters
+        ----------
+        job_type : str
+            Name of the runner executing the job
+        params : dict
+            Parameters passed to the runner
+        priority : int, optional
+            Jobs with a lower priority value run first
+
+        Returns
+        -------
+        Job
+            The queued job
+        """
+        if(job_type not in self.runners):
+            raise ValueError(
+                f'Unknown job type {job_type}, expected one of {sorted(self.runners)}')
+
+        with self.lock:
+            if(self.queued >= self.max_queued):
+                self.metrics.increment('jobs_rejected')
+                raise QueueFull(f'{self.queued} Jobs Already Queued')
+
+            sequence = next(self.sequence)
+            job = Job(f'{sequence:08d}', job_type, params, priority)
+            self.jobs[job.job_id] = job
+            self.queued += 1
+            self.queue.put((priority, sequence, job))
+
+        self.metrics.increment('jobs_submitted')
+
+        return job
+
+    def get_job(self, job_id: str) -> Job:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {'queued': self.queued, 'running': self.running, 'workers': len(self.threads),
+                    'max_queued': self.max_queued}
+
+    def run_job(self, job: Job) -> None:
+        job.status, job.started = 'running', time.time()
+        try:
+            with self.metrics.span(f'{job.job_type}_job'):
+                job.result = self.runners[job.job_type](job.params)
+            job.status = 'done'
+        # DataFetcher exits on failures, which must only fail the job and not the worker
+        except (Exception, SystemExit) as e:
+            logger.exception(f'Job {job.job_id} Failed')
+            self.metrics.increment('jobs_failed')
+            job.status, job.error = 'failed', f'{type(e).__name__}: {e}'
+
+        job.finished = time.time()
+
+    def work(self) -> None:
+        while(True):
+            _, _, job = self.queue.get()
+            if(job is None):
+                return
+
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+
+            self.run_job(job)
+
+            with self.lock:
+                self.running -= 1
+                self.finished.append(job.job_id)
+                while(len(self.finished) > self.max_finished):
+                    self.jobs.pop(self.finished.pop(0), None)
+            job.done.set()
+
+    def close(self) -> None:
+        for _ in self.threads:
+            self.queue.put((float('inf'), next(self.sequence), None))
+        for thread in self.threads:
+            thread.join()
+
+
+def get_points_result(points: np.array, params: dict, max_inline_points: int, epsg: str = None) -> dict:
+    """Writes the points of a job to its output file, or returns them inline when no output is given.
+
+    Parameters
+    ----------
+    points : np.array
+        Points produced by the job
+    params : dict
+        Job parameters, with the optional output file and format
+    max_inline_points : int
+        Maximum number of points returned inline
+    epsg : str, optional
+        CRS of the points, stored in LAS/LAZ output files
+
+    Returns
+    -------
+    dict
+        Job result
+    """
+    result = {'count': len(points)}
+    if(len(points) > 0):
+        result['bounds'] = np.min(points, axis=0).tolist() + \
+            np.max(points, axis=0).tolist()
+
+    if(params.get('output', '') != ''):
+        export_points(params['output'], points, params.get('format', ''), epsg=epsg)
+        result['output'] = params['output']
+    elif(len(points) <= max_inline_points):
+        result['points'] = np.asarray(points).tolist()
+    else:
+        raise ValueError(
+            f'{len(points)} Points Exceed the {max_inline_points} Points Returned Inline, Provide an Output File')
+
+    return result
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API of the fetch service.
+
+    POST /jobs        queues {"type": "fetch" or "sample", "priority": 0, "wait": false, "params": {...}}
+    GET  /jobs/<id>   status and result of a job
+    GET  /health      queue state
+    GET  /metrics     job metrics in the Prometheus text format
+    """
+
+    def send_json(self, status: int, body: dict, headers: dict = {}) -> None:
+        content = dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if(self.path.rstrip('/') != '/jobs'):
+            self.send_json(404, {'error': f'Unknown Path {self.path}'})
+            return
+
+        try:
+            request = loads(self.rfile.read(
+                int(self.headers.get('Content-Length', 0))) or b'{}')
+            job = service.jobs.submit(request.get('type', ''), request.get('params', {}),
+                                      int(request.get('priority', 0)))
+        except QueueFull as e:
+            self.send_json(503, {'error': str(e)}, {'Retry-After': '1'})
+            return
+        except (ValueError, TypeError, AttributeError) as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        if(request.get('wait', False)):
+            job.done.wait(request.get('timeout'))
+
+        self.send_json(200 if job.done.is_set() else 202, job.to_dict())
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        path = self.path.rstrip('/')
+        if(path == '/health'):
+            self.send_json(200, {'status': 'ok', **service.jobs.get_stats()})
+        elif(path == '/metrics'):
+            content = service.metrics.to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        elif(path.startswith('/jobs/')):
+            job = service.jobs.get_job(path[len('/jobs/'):])
+            if(job is None):
+                self.send_json(404, {'error': 'Unknown Job'})
+            else:
+                self.send_json(200, job.to_dict())
+        else:
+            self.send_json(404, {'error': f'Unknown Path {self.path}'})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FetchService():
+    """Long lived fetch service. The catalog index, the pipeline template, the EPT metadata cache and the
+    heavy imports are loaded once and stay warm in memory, and fetch and sample jobs are served over a local
+    HTTP or UNIX socket API by a bounded pool of workers.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of jobs running at the same time
+    max_queued : int, optional
+        Maximum number of jobs waiting for a worker, further jobs are rejected with a 503 response
+    cache_directory : str, optional
+        Directory of the on-disk fetch cache shared by the fetch jobs, no cache if not provided
+    max_inline_points : int, optional
+        Maximum number of points returned in a job result, larger results need an output file
+    runners : dict, optional
+        Extra or replacement job runners, called with the job parameters
+    warm : bool, optional
+        To load the catalog, the template and the imports when the service starts
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 64, cache_directory: str = '',
+                 max_inline_points: int = 1000000, runners: dict = {}, warm: bool = True) -> None:
+        self.metrics = Metrics(max_spans=MAX_SPANS)
+        self.max_inline_points = max_inline_points
+        self.cache = None
+        if(cache_directory != ''):
+            from .fetch_cache import FetchCache
+
+            self.cache = FetchCache(cache_directory)
+
+        if(warm):
+            self.warm()
+
+        self.jobs = JobQueue({'fetch': self.run_fetch_job, 'sample': self.run_sample_job, **runners},
+                             workers, max_queued, metrics=self.metrics)
+        self.servers = []
+
+    def warm(self) -> None:
+        """Loads everything fetch jobs would otherwise load on their first run.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        start = time.perf_counter()
+        try:
+            from .region_index import load_region_index
+            from .pipeline_spec import load_template_stages
+            from .ept_metadata_cache import get_default_metadata_cache
+            from . import data_fetcher
+
+            load_region_index()
+            if(os.path.exists('./aws_dataset.catalog')):
+                from .catalog import load_catalog
+
+                load_catalog().get_folder_set()
+            load_template_stages()
+            get_default_metadata_cache()
+            import pdal
+            import pyproj
+            from shapely.geometry import box
+        except Exception as e:
+            logger.warning(f'Failed to Warm the Service, Jobs Load What They Need: {e}')
+
+        logger.info(
+            f'Successfully Warmed the Service in {time.perf_counter() - start:.2f}s')
+
+    def run_fetch_job(self, params: dict) -> dict:
+        epsg = str(params.get('epsg', '4326'))
+        points = fetch_points(params['bounds'], epsg, params.get('region', ''),
+                              bool(params.get('multi_region', False)), float(params.get('tile_size', 0)),
+                              int(params.get('workers', 0)), DTYPES[params.get('dtype', 'float64')],
+                              self.cache, self.metrics, float(params.get('spacing', 0)),
+                              int(params.get('point_budget', 0)))
+
+        return get_points_result(points, params, self.max_inline_points, epsg)
+
+    def run_sample_job(self, params: dict) -> dict:
+        points = sample_points(params['input'], params.get('method', 'grid'), float(params.get('size', 1)),
+                               params.get('sampling_type', 'closest'), params.get('seed'),
+                               int(params.get('chunk_size', 0)))
+
+        return get_points_result(points, params, self.max_inline_points)
+
+    def create_server(self, host: str = '127.0.0.1', port: int = 8642, socket_path: str = ''):
+        """Creates a server of the API, bound but not yet serving.
+
+        Parameters
+        ----------
+        host : str, optional
+            Address the HTTP server listens on, keep it local since jobs read and write local files
+        port : int, optional
+            Port the HTTP server listens on, 0 picks a free port
+        socket_path : str, optional
+            If provided, the API is served on this UNIX socket instead of TCP
+
+        Returns
+        -------
+        socketserver.BaseServer
+            The server
+        """
+        if(socket_path != ''):
+            if(os.path.exists(socket_path)):
+                os.remove(socket_path)
+            server = UnixHTTPServer(socket_path, ServiceRequestHandler)
+        else:
+            server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+            server.daemon_threads = True
+
+        server.service = self
+        self.servers.append(server)
+
+        return server
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8642, socket_path: str = '') -> None:
+        """Serves the API until interrupted.
+
+        Parameters
+        ----------
+        host : str, optional
+            Address the HTTP server listens on
+        port : int, optional
+            Port the HTTP server listens on
+        socket_path : str, optional
+            If provided, the API is served on this UNIX socket instead of TCP
+
+        Returns
+        -------
+        None
+        """
+        server = self.create_server(host, port, socket_path)
+        logger.info(
+            f'Serving on {socket_path if socket_path != "" else f"http://{host}:{server.server_address[1]}"}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.server_close()
+            if(isinstance(server, UnixHTTPServer) and os.path.exists(server.server_address)):
+                os.remove(server.server_address)
+        self.servers = []
+        self.jobs.close()
@@ -0,0 +1,330 @@
+import os
+import sys
+import threading
+from typing import NamedTuple
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from .logger_creator import CreateLogger
+
+logger = CreateLogger('SharedCloud')
+logger = logger.get_default_logger()
+
+# Serializes attaching, which briefly disables the resource tracker registration on older Pythons
+_attach_lock = threading.Lock()
+
+# Whether a segment outlives the handles of the process that created it until it is unlinked. On Windows a
+# segment is destroyed with its last handle, so a worker can not publish points and close its handle before
+# the parent attached
+SHARED_HANDOFF = os.name == 'posix'
+
+# Whether segments can be attached without registering them with the resource tracker (Python 3.13+)
+ATTACH_UNTRACKED = sys.version_info >= (3, 13)
+
+
+class SharedCloudDescriptor(NamedTuple):
+    """Picklable reference to a shared point cloud, sent between processes instead of the points."""
+    name: str
+    shape: tuple
+    dtype: str
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing shared memory segment without registering it with the resource tracker of the
+    process, so the segment is not unlinked (and reported as leaked) when the attaching process exits.
+
+    Parameters
+    ----------
+    name : str
+        Name of the segment
+
+    Returns
+    -------
+    shared_memory.SharedMemory
+        The attached segment
+    """
+    if(ATTACH_UNTRACKED):
+        return shared_memory.SharedMemory(name, track=False)
+
+    # Before Python 3.13 attaching registers the segment like creating it does
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedPointCloud():
+    """Point cloud held in a shared memory segment, which other processes attach to without copying the
+    points. The process creating the cloud owns the segment: it stays alive until the owner unlinks it, even
+    if every handle is closed. Every process closes its own handle once done, after dropping the arrays it
+    took from points. Used as a context manager, the handle is closed on exit and the segment unlinked if
+    the handle is the owner's.
+
+    Parameters
+    ----------
+    segment : shared_memory.SharedMemory
+        Shared memory segment holding the points
+    shape : tuple
+        Shape of the points array
+    dtype : type
+        Numeric type of the points
+    owner : bool
+        Whether this handle created the segment
+
+    Returns
+    -------
+    None
+    """
+
+    def __init__(self, segment: shared_memory.SharedMemory, shape: tuple, dtype: type, owner: bool) -> None:
+        self.segment = segment
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self._points = np.ndarray(
+            self.shape, dtype=self.dtype, buffer=segment.buf)
+
+    @classmethod
+    def create(cls, count: int, dtype: type = np.float64, columns: int = 3) -> 'SharedPointCloud':
+        """Creates an uninitialized shared point cloud.
+
+        Parameters
+        ----------
+        count : int
+            Number of points
+        dtype : type, optional
+            Numeric type of the points
+        columns : int, optional
+            Values of every point
+
+        Returns
+        -------
+        SharedPointCloud
+            The owned cloud
+        """
+        shape = (count, columns)
+        # Segments can not be empty
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+
+        return cls(shared_memory.SharedMemory(create=True, size=size), shape, dtype, True)
+
+    @classmethod
+    def from_array(cls, points: np.array) -> 'SharedPointCloud':
+        """Creates a shared point cloud holding a copy of the points.
+
+        Parameters
+        ----------
+        points : np.array
+            Cloud points with x, y and z values in a single element
+
+        Returns
+        -------
+        SharedPointCloud
+            The owned cloud
+        """
+        cloud = cls.create(len(points), points.dtype,
+                           points.shape[1] if points.ndim > 1 else 3)
+        cloud.points[:] = points
+
+        return cloud
+
+    @classmethod
+    def attach(cls, descriptor: SharedCloudDescriptor) -> 'SharedPointCloud':
+        """Attaches to a shared point cloud created by another process, without copying.
+
+        Parameters
+        ----------
+        descriptor : SharedCloudDescriptor
+            Descriptor of the cloud
+
+        Returns
+        -------
+        SharedPointCloud
+            A handle which does not own the cloud
+        """
+        return cls(attach_shared_memory(descriptor.name), descriptor.shape, descriptor.dtype, False)
+
+    @property
+    def points(self) -> np.array:
+        if(self._points is None):
+            raise ValueError('Shared Point Cloud Already Closed')
+
+        return self._points
+
+    @property
+    def descriptor(self) -> SharedCloudDescriptor:
+        return SharedCloudDescriptor(self.segment.name, self.shape, self.dtype.str)
+
+    def close(self) -> None:
+        """Closes this handle. Arrays taken from points must be dropped before, they would point to unmapped
+        memory.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if(self._points is not None):
+            self._points = None
+            self.segment.close()
+
+    def unlink(self) -> None:
+        """Destroys the segment once every handle is closed, only the owner should call it.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self.segment.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        if(self.owner):
+            self.unlink()
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+
+def start_resource_tracker() -> None:
+    """Starts the resource tracker of the process before worker processes are, so the workers share it. The
+    segments workers publish then stay tracked until the parent unlinks them, instead of being unlinked by a
+    tracker of their own when they exit.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    """
+    if(os.name == 'posix'):
+        resource_tracker.ensure_running()
+
+
+def publish_points(points: np.array) -> SharedCloudDescriptor:
+    """Copies points into a new shared point cloud and closes the handle of the calling process, handing the
+    ownership of the segment over to the process the descriptor is sent to. Only supported where
+    SHARED_HANDOFF is set, elsewhere the segment would be destroyed with the handle.
+
+    Parameters
+    ----------
+    points : np.array
+        Cloud points with x, y and z values in a single element
+
+    Returns
+    -------
+    SharedCloudDescriptor
+        Descriptor of the cloud, the receiver must unlink it (see take_points)
+    """
+    cloud = SharedPointCloud.from_array(np.asarray(points))
+    descriptor = cloud.descriptor
+    cloud.close()
+
+    return descriptor
+
+
+def run_and_publish(worker, *args) -> SharedCloudDescriptor:
+    """Runs a worker returning cloud points and publishes them, used as the process pool worker so the points
+    are not pickled back to the parent process.
+
+    Parameters
+    ----------
+    worker : callable
+        Picklable function returning cloud points
+    args : tuple
+        Arguments of the worker
+
+    Returns
+    -------
+    SharedCloudDescriptor
+        Descriptor of the published points
+    """
+    return publish_points(worker(*args))
+
+
+def release_published(cloud: SharedPointCloud) -> None:
+    """Closes and unlinks an attached published cloud, and unregisters it from the resource tracker the
+    publishing worker registered it with. An untracked handle skips unregistering on unlink, which would
+    leave the tracker reporting the segment as leaked and unlinking it again at shutdown.
+
+    Parameters
+    ----------
+    cloud : SharedPointCloud
+        Cloud attached from a published descriptor
+
+    Returns
+    -------
+    None
+    """
+    cloud.close()
+    cloud.unlink()
+    if(ATTACH_UNTRACKED and os.name == 'posix'):
+        resource_tracker.unregister(cloud.segment._name, 'shared_memory')
+
+
+def take_points(descriptors: list, out: np.array = None) -> np.array:
+    """Gathers published point clouds into a single array and unlinks them.
+
+    Parameters
+    ----------
+    descriptors : list
+        Descriptors of the published clouds, every one having the same number of columns
+    out : np.array, optional
+        Array to write the points to, as many rows as the clouds have points together. A new array is
+        allocated if not provided
+
+    Returns
+    -------
+    np.array
+        Concatenated points of the clouds, in descriptor order
+    """
+    if(out is None):
+        total = sum(descriptor.shape[0] for descriptor in descriptors)
+        columns = descriptors[0].shape[1] if len(descriptors) > 0 else 3
+        dtype = descriptors[0].dtype if len(descriptors) > 0 else np.float64
+        out = np.empty((total, columns), dtype=dtype)
+
+    start = 0
+    for descriptor in descriptors:
+        cloud = SharedPointCloud.attach(descriptor)
+        try:
+            out[start:start + len(cloud)] = cloud.points
+            start += len(cloud)
+        finally:
+            release_published(cloud)
+
+    return out
+
+
+def discard_points(descriptors: list) -> None:
+    """Unlinks published point clouds which will not be taken, e.g when another worker of the batch failed.
+
+    Parameters
+    ----------
+    descriptors : list
+        Descriptors of the published clouds
+
+    Returns
+    -------
+    None
+    """
+    for descriptor in descriptors:
+        try:
+            cloud = SharedPointCloud.attach(descriptor)
+        except FileNotFoundError:
+            continue
+        release_published(cloud)
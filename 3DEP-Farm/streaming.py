@@ -0,0 +1,128 @@
+import os
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from .logger_creator import CreateLogger
+from .subsampler import grid_subsample_chunked, iter_array_chunks
+from .exporters import export_chunks
+
+logger = CreateLogger('Streaming')
+logger = logger.get_default_logger()
+
+
+def factor_sample_stream(batches, factor: int):
+    """Applies factor sampling on streamed point batches, keeping every factor-th point of the whole stream.
+
+    Parameters
+    ----------
+    batches : iterable
+        Point batches, each a numpy array consisting of 3 numeric values in a single element
+    factor : int
+        How many items to count to select the next sample
+
+    Returns
+    -------
+    generator
+        Sampled point batches
+    """
+    seen = 0
+    for batch in batches:
+        yield batch[(-seen) % factor::factor]
+        seen += len(batch)
+
+
+@contextmanager
+def spool_stream(batches, directory: str = None):
+    """Writes streamed point batches to a temporary file and memory maps it, so that stages needing
+    several passes over the points can run in bounded memory. Used as a context manager, the memory map is
+    closed and the file removed on exit, so arrays taken from it must be copies or dropped before.
+
+    Parameters
+    ----------
+    batches : iterable
+        Point batches, each a numpy array consisting of 3 numeric values in a single element
+    directory : str, optional
+        Directory to create the temporary file in
+
+    Returns
+    -------
+    np.memmap
+        Memory mapped (n, 3) array of all the streamed points
+    """
+    dtype = None
+    points = None
+    spool = tempfile.NamedTemporaryFile(dir=directory, suffix='.points', delete=False)
+    try:
+        with spool:
+            for batch in batches:
+                if(dtype is None):
+                    dtype = batch.dtype
+                spool.write(np.ascontiguousarray(batch, dtype=dtype).tobytes())
+
+        if(dtype is not None and os.path.getsize(spool.name) > 0):
+            points = np.memmap(spool.name, dtype=dtype, mode='r').reshape(-1, 3)
+
+        yield points if points is not None else np.zeros((0, 3))
+
+    finally:
+        # Windows can not remove a file while it is mapped
+        if(points is not None):
+            points._mmap.close()
+        os.remove(spool.name)
+
+
+def grid_sample_stream(batches, voxel_size: float, sampling_type: str = 'closest', chunk_size: int = 1000000, directory: str = None) -> np.array:
+    """Applies grid sampling on streamed point batches. The stream is spooled to disk and sampled with the
+    chunked grid sampling engine, so peak memory depends on the chunk size and the number of voxels.
+
+    Parameters
+    ----------
+    batches : iterable
+        Point batches, each a numpy array consisting of 3 numeric values in a single element
+    voxel_size : float
+        Voxel size by which points are gathered together
+    sampling_type : str, optional
+        Either 'closest' or 'barycenter_sample'
+    chunk_size : int, optional
+        Number of spooled points processed at a time
+    directory : str, optional
+        Directory to spool the points in
+
+    Returns
+    -------
+    np.array
+        Sampled Numpy Array of the Point Clouds
+    """
+    with spool_stream(batches, directory) as points:
+        barycenters, closest = grid_subsample_chunked(
+            lambda: iter_array_chunks(points, chunk_size), voxel_size)
+
+    logger.info('Successfully SubSampled Streamed Point Clouds')
+
+    return closest if sampling_type == 'closest' else barycenters
+
+
+def save_stream(batches, file_name: str, file_format: str = 'xyz', **options) -> int:
+    """Saves streamed point batches to a file, one batch at a time.
+
+    Parameters
+    ----------
+    batches : iterable
+        Point batches, each a numpy array consisting of 3 numeric values in a single element
+    file_name : str
+        Path plus name of the file to save the points on to
+    file_format : str, optional
+        One of xyz (ASCII), npy, las, laz, parquet or arrow, taken from the file extension if empty
+    options : dict, optional
+        Options passed to the exporter
+
+    Returns
+    -------
+    int
+        Number of points saved
+    """
+    count = export_chunks(file_name, batches, file_format, **options)
+
+    logger.info(f'Successfully Saved {count} Streamed Points')
+
+    return count
@@ -1,12 +1,676 @@
 import numpy as np
-import laspy as lp
 import sys
-from logger_creator import CreateLogger
+from .logger_creator import CreateLogger
+from .exporters import export_points
 
 logger = CreateLogger('CloudSubSampler')
 logger = logger.get_default_logger()
 
 
+def iter_array_chunks(points: np.array, chunk_size: int):
+    """Yields consecutive chunks of an array (or memory mapped array) of points.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    chunk_size : int
+        Number of points in a single chunk
+
+    Returns
+    -------
+    generator
+        Chunks of at most chunk_size points
+    """
+    for start in range(0, len(points), chunk_size):
+        yield points[start:start + chunk_size]
+
+
+def get_voxel_grid(minimum: np.array, maximum: np.array, voxel_size: float) -> tuple:
+    """Calculates the origin and the number of voxels along each axis of a voxel grid covering the points.
+
+    Parameters
+    ----------
+    minimum : np.array
+        Minimum x, y and z values of the points
+    maximum : np.array
+        Maximum x, y and z values of the points
+    voxel_size : float
+        Voxel size by which points are gathered together
+
+    Returns
+    -------
+    tuple
+        Origin of the grid and number of voxels along each axis
+    """
+    origin = np.asarray(minimum, dtype=np.float64)
+    grid_shape = ((np.asarray(maximum, dtype=np.float64) -
+                  origin) // voxel_size).astype(np.int64) + 1
+
+    if(np.prod(grid_shape.astype(np.float64)) >= np.iinfo(np.int64).max):
+        raise ValueError(
+            'Voxel size too small for the extent of the points, voxel keys overflow')
+
+    return origin, grid_shape
+
+
+def get_voxel_keys(points: np.array, origin: np.array, grid_shape: np.array, voxel_size: float) -> np.array:
+    """Calculates the linearized (x major) voxel key of every point.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    origin : np.array
+        Origin of the voxel grid
+    grid_shape : np.array
+        Number of voxels along each axis
+    voxel_size : float
+        Voxel size by which points are gathered together
+
+    Returns
+    -------
+    np.array
+        int64 voxel key of every point
+    """
+    cells = ((points - origin) // voxel_size).astype(np.int64)
+    np.clip(cells, 0, grid_shape - 1, out=cells)
+
+    return (cells[:, 0] * grid_shape[1] + cells[:, 1]) * grid_shape[2] + cells[:, 2]
+
+
+def get_segments(sorted_keys: np.array) -> tuple:
+    """Finds the runs of equal keys in a sorted key array.
+
+    Parameters
+    ----------
+    sorted_keys : np.array
+        Sorted voxel keys
+
+    Returns
+    -------
+    tuple
+        Start index, length and key of every run, and the run index of every element
+    """
+    if(len(sorted_keys) == 0):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty
+
+    starts = np.flatnonzero(
+        np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    counts = np.diff(np.append(starts, len(sorted_keys)))
+    segment_ids = np.repeat(np.arange(len(starts)), counts)
+
+    return starts, counts, sorted_keys[starts], segment_ids
+
+
+def get_segment_argmin(values: np.array, starts: np.array, segment_ids: np.array) -> np.array:
+    """Finds the index of the first minimum value of every run.
+
+    Parameters
+    ----------
+    values : np.array
+        Values grouped in runs
+    starts : np.array
+        Start index of every run
+    segment_ids : np.array
+        Run index of every value
+
+    Returns
+    -------
+    np.array
+        Index of the first minimum value of every run
+    """
+    minimums = np.minimum.reduceat(values, starts)
+    candidates = np.flatnonzero(values == minimums[segment_ids])
+    first = np.concatenate(
+        ([True], segment_ids[candidates][1:] != segment_ids[candidates][:-1]))
+
+    return candidates[first]
+
+
+def reduce_voxels(points: np.array, keys: np.array) -> tuple:
+    """Sums the points falling in every non-empty voxel.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    keys : np.array
+        Voxel key of every point
+
+    Returns
+    -------
+    tuple
+        Sorted non-empty voxel keys, points count and float64 points sum of every voxel
+    """
+    order = np.argsort(keys, kind='stable')
+    starts, counts, voxel_keys, _ = get_segments(keys[order])
+    if(len(starts) == 0):
+        return voxel_keys, counts, np.zeros((0, 3), dtype=np.float64)
+
+    sums = np.add.reduceat(points[order], starts, axis=0, dtype=np.float64)
+
+    return voxel_keys, counts, sums
+
+
+def merge_voxel_reductions(reductions: list) -> tuple:
+    """Merges partial voxel reductions of different chunks into one.
+
+    Parameters
+    ----------
+    reductions : list
+        List of (voxel keys, counts, sums) tuples
+
+    Returns
+    -------
+    tuple
+        Sorted non-empty voxel keys, points count and points sum of every voxel
+    """
+    keys = np.concatenate([reduction[0] for reduction in reductions])
+    counts = np.concatenate([reduction[1] for reduction in reductions])
+    sums = np.concatenate([reduction[2] for reduction in reductions])
+
+    order = np.argsort(keys, kind='stable')
+    starts, _, voxel_keys, _ = get_segments(keys[order])
+    if(len(starts) == 0):
+        return voxel_keys, counts, sums
+
+    return voxel_keys, np.add.reduceat(counts[order], starts), np.add.reduceat(sums[order], starts, axis=0)
+
+
+def get_closest_in_voxels(points: np.array, keys: np.array, voxel_keys: np.array, barycenters: np.array) -> tuple:
+    """Finds the point closest to its voxel barycenter among the given points for every voxel they fall in.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    keys : np.array
+        Voxel key of every point
+    voxel_keys : np.array
+        Sorted keys of every non-empty voxel of the whole point cloud
+    barycenters : np.array
+        Barycenter of every non-empty voxel of the whole point cloud
+
+    Returns
+    -------
+    tuple
+        Position (in voxel_keys) of every voxel the points fall in, with the squared distance and the
+        closest point of each of those voxels
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_points = points[order]
+    starts, _, segment_keys, segment_ids = get_segments(keys[order])
+    if(len(starts) == 0):
+        return starts, np.zeros(0), np.zeros((0, 3), dtype=points.dtype)
+
+    positions = np.searchsorted(voxel_keys, segment_keys)
+    distances = np.square(
+        sorted_points - barycenters[positions][segment_ids]).sum(axis=1)
+    closest = get_segment_argmin(distances, starts, segment_ids)
+
+    return positions, distances[closest], sorted_points[closest]
+
+
+def grid_subsample(points: np.array, voxel_size: float) -> tuple:
+    """Computes the barycenter and the point closest to the barycenter of every non-empty voxel
+    with a single sort of the linearized voxel keys and segment reductions.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    voxel_size : float
+        Voxel size by which points are gathered together
+
+    Returns
+    -------
+    tuple
+        Barycenter samples and closest to barycenter samples as (n, 3) arrays, ordered by voxel
+    """
+    origin, grid_shape = get_voxel_grid(
+        np.min(points, axis=0), np.max(points, axis=0), voxel_size)
+    keys = get_voxel_keys(points, origin, grid_shape, voxel_size)
+
+    voxel_keys, counts, sums = reduce_voxels(points, keys)
+    barycenters = sums / counts[:, np.newaxis]
+    _, _, closest = get_closest_in_voxels(
+        points, keys, voxel_keys, barycenters)
+
+    return barycenters, closest
+
+
+def grid_subsample_chunked(get_chunks, voxel_size: float) -> tuple:
+    """Memory bounded grid subsampling. Points are read chunk by chunk in three passes (extent, voxel sums,
+    closest points), so only one chunk and the per voxel results are held in memory at a time.
+
+    Parameters
+    ----------
+    get_chunks : callable
+        Function without arguments returning a new iterable over the point chunks on every call
+    voxel_size : float
+        Voxel size by which points are gathered together
+
+    Returns
+    -------
+    tuple
+        Barycenter samples and closest to barycenter samples as (n, 3) arrays, ordered by voxel
+    """
+    minimum = np.full(3, np.inf)
+    maximum = np.full(3, -np.inf)
+    dtype = None
+    for chunk in get_chunks():
+        if(len(chunk) > 0):
+            minimum = np.minimum(minimum, np.min(chunk, axis=0))
+            maximum = np.maximum(maximum, np.max(chunk, axis=0))
+            dtype = chunk.dtype
+
+    if(dtype is None):
+        return np.zeros((0, 3)), np.zeros((0, 3))
+
+    origin, grid_shape = get_voxel_grid(minimum, maximum, voxel_size)
+
+    # Partial reductions are merged once they outgrow the merged result, keeping merging cost amortized
+    merged = None
+    pending, pending_size = [], 0
+    for chunk in get_chunks():
+        pending.append(reduce_voxels(chunk, get_voxel_keys(
+            chunk, origin, grid_shape, voxel_size)))
+        pending_size += len(pending[-1][0])
+        if(merged is None or pending_size >= len(merged[0])):
+            merged = merge_voxel_reductions(
+                pending if merged is None else [merged] + pending)
+            pending, pending_size = [], 0
+
+    if(len(pending) > 0):
+        merged = merge_voxel_reductions([merged] + pending)
+
+    voxel_keys, counts, sums = merged
+    barycenters = sums / counts[:, np.newaxis]
+
+    best_distances = np.full(len(voxel_keys), np.inf)
+    closest = np.zeros((len(voxel_keys), 3), dtype=dtype)
+    for chunk in get_chunks():
+        positions, distances, points = get_closest_in_voxels(chunk, get_voxel_keys(
+            chunk, origin, grid_shape, voxel_size), voxel_keys, barycenters)
+        better = distances < best_distances[positions]
+        best_distances[positions[better]] = distances[better]
+        closest[positions[better]] = points[better]
+
+    return barycenters, closest
+
+
+def get_record_points(record, dtype: type = np.float64) -> np.array:
+    """Gathers the scaled x, y and z values of a laspy point record into a single (n, 3) array.
+
+    Parameters
+    ----------
+    record : laspy.ScaleAwarePointRecord
+        Point record read from a LAS/LAZ file
+    dtype : type, optional
+        Numeric type of the returned points
+
+    Returns
+    -------
+    np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    """
+    points = np.empty((len(record), 3), dtype=dtype)
+    points[:, 0] = record.x
+    points[:, 1] = record.y
+    points[:, 2] = record.z
+
+    return points
+
+
+def iter_las_chunks(file_name: str, chunk_size: int = 1000000, use_mmap: bool = None, dtype: type = np.float64):
+    """Streams the points of a LAS/LAZ file in fixed size chunks without reading the whole file. Compressed
+    (LAZ) files are decompressed chunk by chunk, uncompressed (LAS) files can be read through a read only memory
+    map of their point records.
+
+    Parameters
+    ----------
+    file_name : str
+        Path plus file name of the LAS/LAZ file
+    chunk_size : int, optional
+        Number of points in a single chunk
+    use_mmap : bool, optional
+        To memory map uncompressed files, defaults to memory mapping whenever the file is uncompressed
+    dtype : type, optional
+        Numeric type of the returned points
+
+    Returns
+    -------
+    generator
+        Chunks of at most chunk_size points
+    """
+    import laspy as lp
+
+    with lp.open(file_name) as reader:
+        header = reader.header
+        if(use_mmap is None):
+            use_mmap = not header.are_points_compressed
+
+        if(not use_mmap or header.are_points_compressed):
+            for record in reader.chunk_iterator(chunk_size):
+                yield get_record_points(record, dtype)
+            return
+
+    records = np.memmap(file_name, dtype=header.point_format.dtype(), mode='r',
+                        offset=header.offset_to_point_data, shape=(header.point_count,))
+    scales, offsets = header.scales, header.offsets
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        points = np.empty((len(chunk), 3), dtype=dtype)
+        for index, dimension in enumerate(['X', 'Y', 'Z']):
+            points[:, index] = chunk[dimension] * \
+                scales[index] + offsets[index]
+
+        yield points
+
+
+def get_neighbour_pairs(query_keys: np.array, target_keys: np.array, key_offsets: np.array, max_pairs: int = 0) -> tuple:
+    """Finds every (query, target) pair whose voxel keys differ by one of the given key offsets.
+
+    Parameters
+    ----------
+    query_keys : np.array
+        Voxel keys of the query points
+    target_keys : np.array
+        Sorted voxel keys of the target points
+    key_offsets : np.array
+        Linearized offsets of the neighbouring voxels to search
+    max_pairs : int, optional
+        If provided, no pairs are built when there are more than this many
+
+    Returns
+    -------
+    tuple
+        Query indices and target indices of every pair, or None if there are more than max_pairs pairs
+    """
+    # Searching sorted keys walks the target keys in order, several times faster than searching them randomly
+    query_order = np.argsort(query_keys, kind='stable')
+    sorted_queries = query_keys[query_order]
+
+    queries, targets = [], []
+    pair_count = 0
+    for offset in key_offsets:
+        shifted = sorted_queries + offset
+        lows = np.searchsorted(target_keys, shifted, side='left')
+        counts = np.searchsorted(target_keys, shifted, side='right') - lows
+        total = counts.sum()
+        if(total == 0):
+            continue
+
+        pair_count += total
+        if(max_pairs > 0 and pair_count > max_pairs):
+            return None
+
+        queries.append(np.repeat(query_order, counts))
+        targets.append(np.repeat(lows, counts) + np.arange(total) -
+                       np.repeat(np.cumsum(counts) - counts, counts))
+
+    if(len(queries) == 0):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    return np.concatenate(queries), np.concatenate(targets)
+
+
+def get_first_independent_set(size: int, lower: np.array, upper: np.array) -> np.array:
+    """Selects the candidates a sequential greedy pass would keep: a candidate is kept when no kept candidate
+    before it conflicts with it. Resolved in rounds over all conflicts at once instead of one candidate at a time.
+
+    Parameters
+    ----------
+    size : int
+        Number of candidates
+    lower : np.array
+        Earlier candidate of every conflicting pair
+    upper : np.array
+        Later candidate of every conflicting pair
+
+    Returns
+    -------
+    np.array
+        Boolean mask of the kept candidates
+    """
+    alive = np.ones(size, dtype=bool)
+    kept = np.zeros(size, dtype=bool)
+
+    while alive.any():
+        active = alive[lower] & alive[upper]
+        blocked = np.zeros(size, dtype=bool)
+        blocked[upper[active]] = True
+
+        # Candidates without an earlier undecided conflict are decided as kept
+        ready = alive & ~blocked
+        kept |= ready
+        alive &= ~ready
+        alive[upper[active & ready[lower]]] = False
+
+    return kept
+
+
+def get_distance_grid(minimum: np.array, maximum: np.array, radius: float) -> tuple:
+    """Builds the radius sized voxel grid used by minimum distance subsampling.
+
+    Parameters
+    ----------
+    minimum : np.array
+        Minimum x, y and z values of the points
+    maximum : np.array
+        Maximum x, y and z values of the points
+    radius : float
+        Minimum distance between two kept points
+
+    Returns
+    -------
+    tuple
+        Origin and shape of the grid, and the linearized key offsets of the 27 neighbouring voxels
+    """
+    # One voxel of padding on every side keeps neighbour offsets from wrapping around the grid
+    origin, grid_shape = get_voxel_grid(np.asarray(minimum) - radius,
+                                        np.asarray(maximum) + radius, radius)
+    steps = np.array([grid_shape[1] * grid_shape[2], grid_shape[2], 1])
+    key_offsets = (np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1],
+                                        indexing='ij'), axis=-1).reshape(-1, 3) * steps).sum(axis=1)
+
+    return origin, grid_shape, key_offsets
+
+
+def accept_distance_candidates(candidate_points: np.array, candidate_keys: np.array, kept_points: np.array,
+                               kept_keys: np.array, key_offsets: np.array, radius: float,
+                               max_pairs: int = 1 << 23) -> np.array:
+    """Accepts the candidates of a batch which are at least the radius away from every kept point and from
+    every earlier accepted candidate of the batch. Batches whose candidates are so dense that they would form
+    more than max_pairs candidate pairs are accepted half by half instead.
+
+    Parameters
+    ----------
+    candidate_points : np.array
+        Candidate points of the batch, in visiting order
+    candidate_keys : np.array
+        Voxel keys of the candidate points
+    kept_points : np.array
+        Points kept so far, ordered by voxel key
+    kept_keys : np.array
+        Sorted voxel keys of the kept points
+    key_offsets : np.array
+        Linearized offsets of the neighbouring voxels
+    radius : float
+        Minimum distance between two kept points
+    max_pairs : int, optional
+        Maximum number of candidate pairs compared at once, bounding the memory used
+
+    Returns
+    -------
+    np.array
+        Indices of the accepted candidates
+    """
+    squared_radius = radius * radius
+
+    # Candidates too close to an already kept point
+    queries, targets = get_neighbour_pairs(
+        candidate_keys, kept_keys, key_offsets)
+    close = np.square(candidate_points[queries] -
+                      kept_points[targets]).sum(axis=1) < squared_radius
+    free = np.ones(len(candidate_points), dtype=bool)
+    free[queries[close]] = False
+
+    # Conflicts between the remaining candidates of the batch
+    remaining = np.flatnonzero(free)
+    sorted_remaining = remaining[np.argsort(
+        candidate_keys[remaining], kind='stable')]
+    pairs = get_neighbour_pairs(
+        candidate_keys[remaining], candidate_keys[sorted_remaining], key_offsets, max_pairs if len(remaining) > 1 else 0)
+    if(pairs is None):
+        # Candidates are visited in order, so accepting the first half before the second one is equivalent
+        half = len(candidate_points) // 2
+        first = accept_distance_candidates(candidate_points[:half], candidate_keys[:half], kept_points,
+                                           kept_keys, key_offsets, radius, max_pairs)
+        kept_keys, kept_points = insert_kept(
+            kept_keys, kept_points, candidate_keys[first], candidate_points[first])
+        second = accept_distance_candidates(candidate_points[half:], candidate_keys[half:], kept_points,
+                                            kept_keys, key_offsets, radius, max_pairs)
+
+        return np.concatenate((first, half + second))
+
+    queries, targets = remaining[pairs[0]], sorted_remaining[pairs[1]]
+    conflicting = (queries < targets) & (np.square(
+        candidate_points[queries] - candidate_points[targets]).sum(axis=1) < squared_radius)
+
+    return remaining[get_first_independent_set(len(candidate_points), queries[conflicting],
+                                               targets[conflicting])[remaining]]
+
+
+def insert_kept(kept_keys: np.array, kept_values: np.array, keys: np.array, values: np.array) -> tuple:
+    """Inserts newly kept values into the key ordered kept arrays.
+
+    Parameters
+    ----------
+    kept_keys : np.array
+        Sorted voxel keys of the kept values
+    kept_values : np.array
+        Kept values ordered by voxel key
+    keys : np.array
+        Voxel keys of the new values
+    values : np.array
+        New values
+
+    Returns
+    -------
+    tuple
+        Updated kept keys and kept values
+    """
+    order = np.argsort(keys, kind='stable')
+    positions = np.searchsorted(kept_keys, keys[order], side='right')
+
+    return np.insert(kept_keys, positions, keys[order]), np.insert(kept_values, positions, values[order], axis=0)
+
+
+def distance_subsample(points: np.array, radius: float, batch_size: int = 65536, seed: int = None) -> np.array:
+    """Minimum distance (Poisson disk) subsampling, keeping points so that no two kept points are closer than
+    the radius. Points are hashed into a grid of radius sized voxels, so only the 27 neighbouring voxels are
+    searched, and candidates are accepted batch by batch against the kept points and each other.
+
+    Parameters
+    ----------
+    points : np.array
+        Numpy Array Type consisting of 3 numeric values in a single element
+    radius : float
+        Minimum distance between two kept points
+    batch_size : int, optional
+        Number of candidates accepted in a single pass
+    seed : int, optional
+        If provided, candidates are visited in a random order drawn from this seed instead of the points order
+
+    Returns
+    -------
+    np.array
+        Indices of the kept points, in the points order
+    """
+    if(len(points) == 0):
+        return np.zeros(0, dtype=np.int64)
+
+    origin, grid_shape, key_offsets = get_distance_grid(
+        np.min(points, axis=0), np.max(points, axis=0), radius)
+    order = np.arange(len(points)) if seed is None else np.random.default_rng(
+        seed).permutation(len(points))
+
+    kept_keys = np.zeros(0, dtype=np.int64)
+    kept_indices = np.zeros(0, dtype=np.int64)
+
+    for candidates in iter_array_chunks(order, batch_size):
+        candidate_points = points[candidates]
+        candidate_keys = get_voxel_keys(
+            candidate_points, origin, grid_shape, radius)
+
+        accepted = accept_distance_candidates(candidate_points, candidate_keys, points[kept_indices],
+                                              kept_keys, key_offsets, radius)
+        kept_keys, kept_indices = insert_kept(
+            kept_keys, kept_indices, candidate_keys[accepted], candidates[accepted])
+
+    return np.sort(kept_indices)
+
+
+def distance_subsample_chunked(get_chunks, radius: float, batch_size: int = 65536) -> np.array:
+    """Memory bounded minimum distance subsampling of chunked points, visited in chunk order. Only one chunk and
+    the kept points are held in memory at a time.
+
+    Parameters
+    ----------
+    get_chunks : callable
+        Function without arguments returning a new iterable over the point chunks on every call
+    radius : float
+        Minimum distance between two kept points
+    batch_size : int, optional
+        Number of candidates accepted in a single pass
+
+    Returns
+    -------
+    np.array
+        Kept points, in the points order
+    """
+    minimum = np.full(3, np.inf)
+    maximum = np.full(3, -np.inf)
+    dtype = None
+    for chunk in get_chunks():
+        if(len(chunk) > 0):
+            minimum = np.minimum(minimum, np.min(chunk, axis=0))
+            maximum = np.maximum(maximum, np.max(chunk, axis=0))
+            dtype = chunk.dtype
+
+    if(dtype is None):
+        return np.zeros((0, 3))
+
+    origin, grid_shape, key_offsets = get_distance_grid(
+        minimum, maximum, radius)
+
+    kept_keys = np.zeros(0, dtype=np.int64)
+    kept_points = np.zeros((0, 3), dtype=dtype)
+    kept_ids = np.zeros(0, dtype=np.int64)
+    seen = 0
+
+    for chunk in get_chunks():
+        for start in range(0, len(chunk), batch_size):
+            candidate_points = chunk[start:start + batch_size]
+            candidate_keys = get_voxel_keys(
+                candidate_points, origin, grid_shape, radius)
+
+            accepted = accept_distance_candidates(candidate_points, candidate_keys, kept_points,
+                                                  kept_keys, key_offsets, radius)
+            _, kept_ids = insert_kept(
+                kept_keys, kept_ids, candidate_keys[accepted], seen + accepted)
+            kept_keys, kept_points = insert_kept(
+                kept_keys, kept_points, candidate_keys[accepted], candidate_points[accepted])
+            seen += len(candidate_points)
+
+    return kept_points[np.argsort(kept_ids)]
+
+
 class CloudPoint():
     """Redefines a numpy array as an object to hold x,y,z class attributes.
 
@@ -35,24 +699,38 @@ class CloudSubSampler():
         Numpy Array Type consisting of 3 numeric values in a single element
     file_name : str
         String of the path plus name of the LAS or LAZ file to load point clouds from
+    chunk_size : int, optional
+        If provided with a file name, the file is never loaded as a whole. Points are streamed from it in
+        chunks of this size into the samplers, keeping memory use bounded
+    use_mmap : bool, optional
+        To memory map uncompressed LAS files when streaming, defaults to memory mapping whenever possible
 
     Returns
     -------
     None
     """
 
-    def __init__(self, point_cloud: np.array = [], file_name: str = '') -> None:
-        if((point_cloud == []) and (file_name == '')):
+    def __init__(self, point_cloud: np.array = [], file_name: str = '', chunk_size: int = 0, use_mmap: bool = None) -> None:
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.file_name = file_name
+
+        if((len(point_cloud) == 0) and (file_name == '')):
             logger.error(
                 'Invalid Usage:\n\t-> Please Provide Either Cloud Points(np.array type) or File Path to a LAS or LAZ file only')
             sys.exit(1)
 
-        elif((point_cloud != []) and (file_name == '')):
+        elif((len(point_cloud) != 0) and (file_name == '')):
             self.point_cloud = self.create_cloud_point_class(point_cloud)
             logger.info(
                 'Successfully Loaded Point Clouds')
 
-        elif((point_cloud == []) and (file_name != '')):
+        elif((len(point_cloud) == 0) and (file_name != '') and chunk_size > 0):
+            self.point_cloud = None
+            logger.info(
+                'Successfully Opened LAS/LAZ File for Chunked Reading')
+
+        elif((len(point_cloud) == 0) and (file_name != '')):
             self.point_cloud = self.read_point_cloud_file(file_name)
             logger.info(
                 'Successfully Loaded Point Clouds from LAS/LAZ File')
@@ -61,10 +739,44 @@ class CloudSubSampler():
                 'Invalid Usage:\n\t-> Please Provide Either Cloud Points(np.array type) or File Path to a LAS or LAZ file only')
             sys.exit(1)
 
-        self.available_samplings = ['factor', 'barycenter', 'closest']
+        self.available_samplings = [
+            'factor', 'barycenter', 'closest', 'distance']
 
         logger.info('Successfully Instantiated CloudSubSampler Class Object')
 
+    def is_streaming(self) -> bool:
+        """Whether points are streamed from the LAS/LAZ file instead of being held in memory.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        bool
+            True when streaming from the file
+        """
+        return self.point_cloud is None
+
+    def iter_point_chunks(self):
+        """Iterates over the points in chunks, streaming them from the LAS/LAZ file or slicing the in memory points.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        generator
+            Chunks of at most chunk_size points
+        """
+        if(self.is_streaming()):
+            return iter_las_chunks(self.file_name, self.chunk_size, self.use_mmap)
+
+        self.separate_points()
+
+        return iter_array_chunks(self.points, self.chunk_size if self.chunk_size > 0 else max(len(self.points), 1))
+
     def create_cloud_point_class(self, cloud_point_array: np.array) -> CloudPoint:
         """Create A CloudPoint Class instance from a given array.
 
@@ -96,6 +808,8 @@ class CloudSubSampler():
             Point Clouds read from a LAS/LAZ file
         """
         try:
+            import laspy as lp
+
             clouds = lp.read(file_name)
 
             logger.info(f'Successfully Loaded point cloud form {file_name}')
@@ -145,6 +859,17 @@ class CloudSubSampler():
         """
 
         try:
+            if(self.is_streaming()):
+                if(not hasattr(self, 'factored_points')):
+                    chunks, seen = [], 0
+                    for chunk in self.iter_point_chunks():
+                        chunks.append(chunk[(-seen) % factor::factor])
+                        seen += len(chunk)
+                    self.factored_points = np.concatenate(chunks) if len(
+                        chunks) > 0 else np.zeros((0, 3))
+
+                return self.factored_points
+
             self.separate_points()
             if(not hasattr(self, 'factored_points')):
                 self.factored_points = self.points[::factor]
@@ -159,7 +884,7 @@ class CloudSubSampler():
                 'Failed to sample cloud points using factoring')
             sys.exit(1)
 
-    def get_grid_subsampling(self, voxel_size: float, sampling_type: str = 'closest') -> np.array:
+    def get_grid_subsampling(self, voxel_size: float, sampling_type: str = 'closest', chunk_size: int = 0) -> np.array:
         """Perfroms Grid Sampling on Point Clouds based on the specified voxel size and sampling type selected.
 
         Parameters
@@ -169,6 +894,9 @@ class CloudSubSampler():
         sampling_type : str, optional
             Which typeof grid subsampling to perform. If no input is provided distance relative
             sub-sampling implemented
+        chunk_size : int, optional
+            If provided, points are processed in chunks of this size keeping memory use bounded by the chunk
+            size and the number of non-empty voxels
 
         Returns
         -------
@@ -176,32 +904,23 @@ class CloudSubSampler():
             Sampled Numpy Array of the Point Clouds
         """
 
-        self.separate_points()
+        if(not self.is_streaming()):
+            self.separate_points()
         if(sampling_type != 'closest' and sampling_type != 'barycenter_sample'):
             print('Invalid type of sampling')
             sys.exit(1)
-        elif(sampling_type == 'closest' and not hasattr(self, 'candidate_center') or sampling_type == 'barycenter_sample' and not hasattr(self, 'barycenter_sample')):
-            nb_vox = np.ceil((np.max(self.points, axis=0) -
-                             np.min(self.points, axis=0)) / voxel_size)
-
-            non_empty_voxel_keys, inverse, nb_pts_per_voxel = np.unique(
-                ((self.points - np.min(self.points, axis=0)) // voxel_size).astype(int), axis=0, return_inverse=True, return_counts=True)
-            idx_pts_vox_sorted = np.argsort(inverse)
-            voxel_grid = {}
-            grid_barycenter, grid_candidate_center = [], []
-            last_seen = 0
-
-            for idx, vox in enumerate(non_empty_voxel_keys):
-                voxel_grid[tuple(
-                    vox)] = self.points[idx_pts_vox_sorted[last_seen:last_seen+nb_pts_per_voxel[idx]]]
-                grid_barycenter.append(np.mean(voxel_grid[tuple(vox)], axis=0))
-                grid_candidate_center.append(voxel_grid[tuple(vox)][np.linalg.norm(
-                    voxel_grid[tuple(vox)]-np.mean(voxel_grid[tuple(vox)], axis=0), axis=1).argmin()])
-
-                last_seen += nb_pts_per_voxel[idx]
+        elif(getattr(self, 'grid_voxel_size', None) != voxel_size):
+            if(self.is_streaming()):
+                self.barycenter_sample, self.candidate_center = grid_subsample_chunked(
+                    self.iter_point_chunks, voxel_size)
+            elif(chunk_size > 0):
+                self.barycenter_sample, self.candidate_center = grid_subsample_chunked(
+                    lambda: iter_array_chunks(self.points, chunk_size), voxel_size)
+            else:
+                self.barycenter_sample, self.candidate_center = grid_subsample(
+                    self.points, voxel_size)
 
-            self.barycenter_sample = grid_barycenter
-            self.candidate_center = grid_candidate_center
+            self.grid_voxel_size = voxel_size
 
             logger.info('Successfully SubSampled Point Clouds')
 
@@ -211,8 +930,50 @@ class CloudSubSampler():
             logger.info('Sampling Already Done before, Using Previous Value')
             return self.candidate_center if sampling_type == 'closest' else self.barycenter_sample
 
-    def save_cloud(self, filename: str, sampling_type: str) -> None:
-        """Save the variable to an ASCII file to open in a 3D Software.
+    def get_distance_subsampling(self, radius: float, batch_size: int = 65536, seed: int = None) -> np.array:
+        """Performs Relative Distance Sampling, keeping points so that no two sampled points are closer than the radius.
+
+        Parameters
+        ----------
+        radius : float
+            Minimum distance between two sampled points
+        batch_size : int, optional
+            Number of candidate points accepted in a single pass
+        seed : int, optional
+            If provided, points are visited in a random order drawn from this seed. Ignored when streaming
+            from a file, where points are visited in file order
+
+        Returns
+        -------
+        np.array
+            Sampled Numpy Array of the Point Clouds
+        """
+        try:
+            if(getattr(self, 'distance_parameters', None) != (radius, seed)):
+                if(self.is_streaming()):
+                    # Chunks are visited in file order, only the kept points are held in memory
+                    self.distance_sample = distance_subsample_chunked(
+                        self.iter_point_chunks, radius, batch_size)
+                else:
+                    self.separate_points()
+                    self.distance_sample = self.points[distance_subsample(
+                        self.points, radius, batch_size, seed)]
+                self.distance_parameters = (radius, seed)
+
+                logger.info('Successfully SubSampled Point Clouds by Distance')
+            else:
+                logger.info(
+                    'Sampling Already Done before, Using Previous Value')
+
+            return self.distance_sample
+
+        except Exception as e:
+            logger.exception(
+                'Failed to sample cloud points using relative distance')
+            sys.exit(1)
+
+    def save_cloud(self, filename: str, sampling_type: str, file_format: str = 'xyz', **options) -> None:
+        """Save the variable to a file to open in a 3D Software.
 
         Parameters
         ----------
@@ -220,6 +981,10 @@ class CloudSubSampler():
             Name of the file to save the data in.
         sampling_type : str
             Which Sampling type to save from.
+        file_format : str, optional
+            One of xyz (ASCII), npy, las, laz, parquet or arrow, binary formats are faster and smaller
+        options : dict, optional
+            Options passed to the exporter, like precision, dtype, scales or compression
 
         Returns
         -------
@@ -232,11 +997,13 @@ class CloudSubSampler():
                 sample_data = self.candidate_center
             elif(sampling_type == 'factor'):
                 sample_data = self.factored_points
+            elif(sampling_type == 'distance'):
+                sample_data = self.distance_sample
 
-            np.savetxt(filename+f'_{sampling_type}'+"_sampled.xyz",
-                       sample_data, delimiter=";", fmt="%s")
+            export_points(filename+f'_{sampling_type}'+f"_sampled.{file_format}",
+                          sample_data, file_format, **options)
 
-            logger.info('Point Clouds Saved as ASCII File')
+            logger.info('Point Clouds Saved')
 
         except Exception as e:
-            logger.exception('Failed to Save Point Clouds as ASCII File')
+            logger.exception('Failed to Save Point Clouds')
@@ -0,0 +1,245 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .logger_creator import CreateLogger
+from .shared_cloud import SHARED_HANDOFF, start_resource_tracker, run_and_publish, take_points, discard_points
+
+logger = CreateLogger('TiledFetch')
+logger = logger.get_default_logger()
+
+
+def split_bounds(minx: float, miny: float, maxx: float, maxy: float, tile_size: float = 0, grid: tuple = (2, 2)) -> list:
+    """Splits bounds into a grid of tiles.
+
+    Parameters
+    ----------
+    minx : float
+        Minimum x value of the bounds
+    miny : float
+        Minimum y value of the bounds
+    maxx : float
+        Maximum x value of the bounds
+    maxy : float
+        Maximum y value of the bounds
+    tile_size : float, optional
+        Width and height of a tile, if provided the grid is derived from it
+    grid : tuple(int, int), optional
+        Number of tile columns and rows, used when no tile size is provided
+
+    Returns
+    -------
+    list
+        Tiles as (minx, miny, maxx, maxy, last_column, last_row) tuples, row by row
+    """
+    if(tile_size > 0):
+        columns = max(1, int(np.ceil((maxx - minx) / tile_size)))
+        rows = max(1, int(np.ceil((maxy - miny) / tile_size)))
+    else:
+        columns, rows = grid
+
+    x_edges = np.linspace(minx, maxx, columns + 1)
+    y_edges = np.linspace(miny, maxy, rows + 1)
+
+    tiles = []
+    for row in range(rows):
+        for column in range(columns):
+            tiles.append((float(x_edges[column]), float(y_edges[row]), float(x_edges[column + 1]),
+                          float(y_edges[row + 1]), column == columns - 1, row == rows - 1))
+
+    return tiles
+
+
+def get_tile_bounds(tile: tuple) -> str:
+    """Builds the readers.ept bounds string of a tile.
+
+    Parameters
+    ----------
+    tile : tuple
+        Tile as returned by split_bounds
+
+    Returns
+    -------
+    str
+        Bounds string as ([minx, maxx],[miny, maxy])
+    """
+    minx, miny, maxx, maxy = tile[:4]
+
+    return f"({[minx, maxx]},{[miny, maxy]})"
+
+
+def get_tile_range_filter(tile: tuple) -> dict:
+    """Builds a range filter keeping only the points owned by a tile. Tiles are half open
+    ([min, max)) except along the outer edges of the grid, so a point lying on a shared tile
+    edge is kept by exactly one tile.
+
+    Parameters
+    ----------
+    tile : tuple
+        Tile as returned by split_bounds
+
+    Returns
+    -------
+    dict
+        Pdal filters.range stage, to be applied before any reprojection
+    """
+    minx, miny, maxx, maxy, last_column, last_row = tile
+    x_close = ']' if last_column else ')'
+    y_close = ']' if last_row else ')'
+
+    return {
+        "type": "filters.range",
+        "limits": f"X[{minx!r}:{maxx!r}{x_close},Y[{miny!r}:{maxy!r}{y_close}"
+    }
+
+
+def run_pipelines(worker, pipeline_jsons: list, max_workers: int = 0, dtype: type = np.float64) -> list:
+    """Runs pipelines in a process pool with bounded concurrency, pickling their cloud points back to the
+    parent process. Used where shared memory can not be handed off (see shared_cloud.SHARED_HANDOFF).
+
+    Parameters
+    ----------
+    worker : callable
+        Picklable function executing a pipeline JSON and returning its cloud points, called with the
+        pipeline JSON and the dtype
+    pipeline_jsons : list
+        Pipeline JSON strings
+    max_workers : int, optional
+        Maximum number of pipelines running at the same time, defaults to the number of cores
+    dtype : type, optional
+        Numeric type of the cloud points
+
+    Returns
+    -------
+    list
+        Cloud points of every pipeline, in the order of the pipelines
+    """
+    if(len(pipeline_jsons) == 0):
+        return []
+
+    max_workers = min(max_workers if max_workers > 0 else (
+        os.cpu_count() or 1), len(pipeline_jsons))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            worker, pipeline_jsons, [dtype] * len(pipeline_jsons)))
+
+    logger.info(
+        f'Successfully Ran {len(pipeline_jsons)} Pipelines with {max_workers} Workers')
+
+    return results
+
+
+def publish_pipelines(worker, pipeline_jsons: list, max_workers: int = 0, dtype: type = np.float64) -> list:
+    """Runs pipelines in a process pool with bounded concurrency. Workers publish their cloud points in shared
+    memory instead of pickling them back to the parent process.
+
+    Parameters
+    ----------
+    worker : callable
+        Picklable function executing a pipeline JSON and returning its cloud points, called with the
+        pipeline JSON and the dtype
+    pipeline_jsons : list
+        Pipeline JSON strings
+    max_workers : int, optional
+        Maximum number of pipelines running at the same time, defaults to the number of cores
+    dtype : type, optional
+        Numeric type of the cloud points
+
+    Returns
+    -------
+    list
+        SharedCloudDescriptor of the cloud points of every pipeline, in the order of the pipelines. The caller
+        owns the published clouds and must unlink them, see shared_cloud.take_points
+    """
+    if(len(pipeline_jsons) == 0):
+        return []
+
+    max_workers = min(max_workers if max_workers > 0 else (
+        os.cpu_count() or 1), len(pipeline_jsons))
+
+    start_resource_tracker()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_and_publish, worker, pipeline_json, dtype)
+                   for pipeline_json in pipeline_jsons]
+
+    errors = [future.exception() for future in futures if future.exception() is not None]
+    if(len(errors) > 0):
+        discard_points([future.result() for future in futures if future.exception() is None])
+        raise errors[0]
+
+    logger.info(
+        f'Successfully Ran {len(pipeline_jsons)} Pipelines with {max_workers} Workers')
+
+    return [future.result() for future in futures]
+
+
+def fetch_pipelines(worker, pipeline_jsons: list, max_workers: int = 0, dtype: type = np.float64) -> list:
+    """Runs pipelines in a process pool with bounded concurrency, handing their cloud points over in shared
+    memory where supported.
+
+    Parameters
+    ----------
+    worker : callable
+        Picklable function executing a pipeline JSON and returning its cloud points, called with the
+        pipeline JSON and the dtype
+    pipeline_jsons : list
+        Pipeline JSON strings
+    max_workers : int, optional
+        Maximum number of pipelines running at the same time, defaults to the number of cores
+    dtype : type, optional
+        Numeric type of the cloud points
+
+    Returns
+    -------
+    list
+        Cloud points of every pipeline, in the order of the pipelines
+    """
+    if(not SHARED_HANDOFF):
+        return run_pipelines(worker, pipeline_jsons, max_workers, dtype)
+
+    return [take_points([descriptor]) for descriptor in publish_pipelines(worker, pipeline_jsons, max_workers, dtype)]
+
+
+def fetch_tiles(worker, pipeline_jsons: list, max_workers: int = 0, dtype: type = np.float64, allocate=None) -> np.array:
+    """Runs one pipeline per tile in a process pool and merges the tile cloud points in tile order. Tile points
+    are copied once, from the shared memory the workers published them in to the merged array (from the
+    unpickled tile points where shared memory can not be handed off).
+
+    Parameters
+    ----------
+    worker : callable
+        Picklable function executing a pipeline JSON and returning its cloud points, called with the
+        pipeline JSON and the dtype
+    pipeline_jsons : list
+        Pipeline JSON string of every tile
+    max_workers : int, optional
+        Maximum number of pipelines running at the same time, defaults to the number of cores
+    dtype : type, optional
+        Numeric type of the cloud points
+    allocate : callable, optional
+        Function called with the total number of points, returning the (n, 3) array the tiles are merged
+        into, e.g the points of a SharedPointCloud. A new array is allocated if not provided
+
+    Returns
+    -------
+    np.array
+        Merged cloud points of all the tiles
+    """
+    if(allocate is None):
+        def allocate(total: int) -> np.array:
+            return np.empty((total, 3), dtype=dtype)
+
+    if(not SHARED_HANDOFF):
+        tiles = run_pipelines(worker, pipeline_jsons, max_workers, dtype)
+        merged = allocate(sum(len(points) for points in tiles))
+        start = 0
+        for points in tiles:
+            merged[start:start + len(points)] = points
+            start += len(points)
+
+        return merged
+
+    descriptors = publish_pipelines(
+        worker, pipeline_jsons, max_workers, dtype)
+
+    return take_points(descriptors, allocate(sum(descriptor.shape[0] for descriptor in descriptors)))
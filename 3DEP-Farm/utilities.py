@@ -1,35 +1,41 @@
 from logging import log
-from urllib.request import urlopen
 from json import dump, loads
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import sys
-from copy import copy
-from logger_creator import CreateLogger
+import copy
+from ast import literal_eval
+import numpy as np
+from .logger_creator import CreateLogger
+from .catalog import write_catalog, get_variant_bounds
+from .http_client import ConnectionPool, TokenBucket, request_with_retries
+from .ept_metadata_cache import EptMetadataCache, get_default_metadata_cache
 
 logger = CreateLogger('Utilities')
 logger = logger.get_default_logger()
 
 
-def get_info(url_str: str) -> tuple:
-    """Retrieve ept.json information from the AWS storage using python urlopen request
+def get_info(url_str: str, cache: EptMetadataCache = None) -> tuple:
+    """Retrieve ept.json information from the AWS storage through the EPT metadata cache, so repeated lookups
+    of the same file in a process make no request and later processes only revalidate it.
 
     Parameters
     ----------
     url_str : str
         URL to the ept.json file.
+    cache : EptMetadataCache, optional
+        Metadata cache to use, the process wide cache is used if not provided.
 
     Returns
     -------
     tuple
-        A tuple with bounds, numbers of points, reprojection and schema information extracted from the ept.json file.
+        A tuple with bounds and numbers of points extracted from the ept.json file.
     """
     try:
-        # store the response of URL
-        response = urlopen(url_str)
-        # storing the JSON response
-        # read data from response
-        data_json = loads(response.read())
+        if(cache is None):
+            cache = get_default_metadata_cache()
+
+        data_json = cache.get_ept(url_str)
 
         return_data = data_json['bounds'], data_json['points']
 
@@ -44,9 +50,92 @@ def get_info(url_str: str) -> tuple:
         sys.exit(1)
 
 
-def construct_aws_dataset_json(directories_path: str = './filename.txt', save: bool = False) -> dict:
+def fetch_ept_info(url_str: str, pool: ConnectionPool, retries: int = 3, backoff: float = 0.5, rate_limiter: TokenBucket = None) -> tuple:
+    """Retrieve ept.json information over a pooled connection, retrying failed requests.
+
+    Parameters
+    ----------
+    url_str : str
+        URL to the ept.json file.
+    pool : ConnectionPool
+        Connection pool to send the request over.
+    retries : int, optional
+        Number of retries after the first attempt.
+    backoff : float, optional
+        Delay before the first retry in seconds, doubled on every further retry.
+    rate_limiter : TokenBucket, optional
+        Rate limiter shared by all the requests.
+
+    Returns
+    -------
+    tuple
+        A tuple with bounds and numbers of points extracted from the ept.json file.
+    """
+    _, _, body = request_with_retries(
+        pool, url_str, retries=retries, backoff=backoff, rate_limiter=rate_limiter)
+    data_json = loads(body)
+
+    return data_json['bounds'], data_json['points']
+
+
+def add_dataset_location(dataset_json: dict, location: str, folder_url: str, bound: list, points: int) -> str:
+    """Adds the information of a single AWS dataset folder to the dataset information, grouping years
+    of the same location together.
+
+    Parameters
+    ----------
+    dataset_json : dict
+        The AWS Data Information being built.
+    location : str
+        Folder name of the location in the AWS dataset storage.
+    folder_url : str
+        URL to the ept.json file of the folder.
+    bound : list
+        Bounds of the folder.
+    points : int
+        Number of points of the folder.
+
+    Returns
+    -------
+    str
+        The location file name the folder was grouped under.
+    """
+    location = location.split('_')
+    if('LAS' in location and location[location.index('LAS') - 1].isnumeric()):
+        file_name = '_'.join(location[:-3])
+        year = location[-3] + '-' + location[-1]
+    else:
+        file_name = '_'.join(location[:-1])
+        year = location[-1]
+
+    if(file_name not in dataset_json.keys()):
+        new_file = {}
+        new_file['bounds'] = [bound]
+        new_file['years'] = [year]
+        new_file['points'] = [points]
+        new_file['access_url'] = [folder_url]
+        new_file['len'] = 1
+        dataset_json[file_name] = new_file
+
+    else:
+        dict_value = dataset_json[file_name]
+        dict_value['bounds'].append(bound)
+        dict_value['years'].append(year)
+        dict_value['points'].append(points)
+        dict_value['access_url'].append(folder_url)
+        dict_value['len'] = dict_value['len'] + 1
+
+    return file_name
+
+
+def construct_aws_dataset_json(directories_path: str = './filename.txt', save: bool = False,
+                               main_url: str = "https://usgs-lidar-public.s3.us-west-2.amazonaws.com/",
+                               max_connections: int = 32, requests_per_second: float = 100, retries: int = 3,
+                               backoff: float = 0.5) -> dict:
     """Construct AWS Dataset Data Information. It extracts and identifies similar locations and organize them
-    properly. It can also save the generated JSON file if needed.
+    properly. It can also save the generated JSON file if needed. The ept.json files are fetched concurrently over
+    a pool of keep-alive connections, throttled by a token bucket rate limiter, and every result is added to the
+    dataset information as soon as it arrives.
 
     Parameters
     ----------
@@ -55,59 +144,59 @@ def construct_aws_dataset_json(directories_path: str = './filename.txt', save: b
         If filename of the directories is not given providing the file location is a must.
     save: bool, optional
         To save the generated json file in the same directory where the function was called.
+    main_url : str, optional
+        Base URL of the AWS dataset storage.
+    max_connections : int, optional
+        Number of requests running at the same time, and size of the connection pool.
+    requests_per_second : float, optional
+        Sustained request rate allowed by the rate limiter.
+    retries : int, optional
+        Number of retries of a failed request.
+    backoff : float, optional
+        Delay before the first retry of a request in seconds, doubled on every further retry.
     Returns
     -------
     dict
         The generated AWS Data Information in a json/dictionary format.
     """
 
-    main_url = "https://usgs-lidar-public.s3.us-west-2.amazonaws.com/"
-
     dataset_json = {}
+    folder_orders = {}
 
-    with open('./filename.txt', 'r') as locations:
-        locations_list = locations.readlines()
+    with open(directories_path, 'r') as locations:
+        locations_list = [location.strip().strip('/')
+                          for location in locations.readlines() if location.strip() != '']
 
-    for index, location in enumerate(locations_list):
-        try:
-            location = location.replace('\n', "")[:-1]
-            folder_url = main_url + location + '/ept.json'
-            bound, points, reprojection, schema = get_info(folder_url)
-            location = location.split('_')
-            if('LAS' in location and location[location.index('LAS') - 1].isnumeric()):
-                file_name = '_'.join(location[:-3])
-                year = location[-3] + '-' + location[-1]
-            else:
-                file_name = '_'.join(location[:-1])
-                year = location[-1]
-
-            if(file_name not in dataset_json.keys()):
-                new_file = {}
-                new_file['bounds'] = [bound]
-                new_file['years'] = [year]
-                new_file['points'] = [points]
-                new_file['access_url'] = [folder_url]
-                new_file['len'] = 1
-                dataset_json[file_name] = new_file
-
-            else:
-                dict_value = dataset_json[file_name]
-                dict_value['bounds'].append(bound)
-                dict_value['years'].append(year)
-                dict_value['points'] = [points]
-                dict_value['access_url'].append(folder_url)
-                dict_value['len'] = dict_value['len'] + 1
-
-                dataset_json.update({file_name: dict_value})
-
-            print(index, end=', ')
-            if(index % 100 == 0):
-                sleep(5)
+    pool = ConnectionPool(max_connections=max_connections)
+    rate_limiter = TokenBucket(requests_per_second)
 
-        except Exception as e:
-            logger.info('Failed To retrieve:\n\tfile_index -> ', index)
-            logger.info("Reason:\n\t -> ", e)
-            continue
+    with ThreadPoolExecutor(max_workers=max_connections) as executor:
+        futures = {}
+        for index, location in enumerate(locations_list):
+            folder_url = main_url + location + '/ept.json'
+            futures[executor.submit(fetch_ept_info, folder_url, pool,
+                                    retries, backoff, rate_limiter)] = (index, location, folder_url)
+
+        for future in as_completed(futures):
+            index, location, folder_url = futures[future]
+            try:
+                bound, points = future.result()
+                file_name = add_dataset_location(
+                    dataset_json, location, folder_url, bound, points)
+                folder_orders.setdefault(file_name, []).append(index)
+
+            except Exception as e:
+                logger.info(
+                    f'Failed To retrieve:\n\tfile_index -> {index}\nReason:\n\t -> {e}')
+
+    pool.close()
+
+    # Results arrive in completion order, restore the folder listing order of every location's variants
+    for file_name, orders in folder_orders.items():
+        order = sorted(range(len(orders)), key=lambda i: orders[i])
+        for key in ['bounds', 'years', 'points', 'access_url']:
+            dataset_json[file_name][key] = [
+                dataset_json[file_name][key][i] for i in order]
 
     if(save):
         with open('./aws_dataset_info.json', 'w') as file_handler:
@@ -140,7 +229,7 @@ def get_values_list(json_data: dict) -> tuple:
         len_list = []
         for value in json_data.values():
             bounds_list.append(value['bounds'])
-            points_list.append(value['points'])
+            points_list.append(value.get('points', [-1] * value['len']))
             years_list.append(value['years'])
             access_list.append(value['access_url'])
             len_list.append(value['len'])
@@ -230,7 +319,7 @@ def fix_bound_reptition_and_build_csv(json_data: dict, save: bool = True) -> pd.
     pd.DataFrame
         Pandas DataFrame representation of the JSON file with all bound similarities merged.
     """
-    file_names, bounds_list, points_list, reprojection_list, schema_list, years_list, access_list, len_list = get_values_list(
+    file_names, bounds_list, points_list, years_list, access_list, len_list = get_values_list(
         json_data)
 
     final_json = merge_similar_bounds(json_data, file_names, bounds_list)
@@ -255,6 +344,57 @@ def fix_bound_reptition_and_build_csv(json_data: dict, save: bool = True) -> pd.
     return aws_dataset_df
 
 
+def build_binary_catalog(aws_dataset_df: pd.DataFrame, file_name: str = './aws_dataset.catalog', directories_path: str = './filename.txt') -> None:
+    """Builds the compiled binary catalog from the output of fix_bound_reptition_and_build_csv (or the saved
+    aws_dataset.csv read back with pandas). Bounds, point counts, years and access urls are stored one row per
+    region variant in columnar form, so that loading the catalog needs no string parsing.
+
+    Parameters
+    ----------
+    aws_dataset_df : pd.DataFrame
+        Pandas DataFrame representation of the AWS dataset information.
+    file_name : str, optional
+        Path plus file name to save the compiled catalog on to.
+    directories_path : str, optional
+        Path plus filename of the text file which contains the names of folders which are located in the AWS
+        dataset storage.
+
+    Returns
+    -------
+    None
+    """
+    def as_list(value):
+        return literal_eval(value) if isinstance(value, str) else list(value)
+
+    try:
+        bounds, points, regions, years, access_urls = [], [], [], [], []
+        for _, row in aws_dataset_df.iterrows():
+            row_urls = as_list(row['Access Url/s'])
+            row_bounds = get_variant_bounds(as_list(row['Bound/s']), len(row_urls))
+            row_points = as_list(row['NumberOfPoints']) if 'NumberOfPoints' in row else []
+            if(len(row_points) != len(row_urls)):
+                row_points = [-1] * len(row_urls)
+
+            for bound, point, year, access_url in zip(row_bounds, row_points, as_list(row['Year/s']), row_urls):
+                bounds.append(bound)
+                points.append(point)
+                regions.append(row['Region/s'])
+                years.append(year)
+                access_urls.append(access_url)
+
+        with open(directories_path, 'r') as locations:
+            folders = [location.strip().strip('/')
+                       for location in locations.readlines() if location.strip() != '']
+
+        write_catalog(file_name, np.array(bounds, dtype=np.float64), np.array(points, dtype=np.int64),
+                      regions, years, access_urls, folders)
+
+        logger.info('Successfully Built Compiled Catalog File')
+
+    except Exception as e:
+        logger.exception('Failed to Build Compiled Catalog File')
+
+
 if __name__ == "__main__":
     final = construct_aws_dataset_json()
     df = fix_bound_reptition_and_build_csv(final, save=False)
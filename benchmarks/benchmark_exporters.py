@@ -0,0 +1,75 @@
+"""Compares the write throughput and file size of the point cloud exporters against the ASCII output
+(np.savetxt) used before.
+
+Run from the repository root:
+
+    python benchmarks/benchmark_exporters.py --points 2000000
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+import importlib.util
+import numpy as np
+
+PACKAGE = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), '3DEP-Farm')
+# The package directory is not a valid module name, so the checkout is loaded as the depfarm package
+spec = importlib.util.spec_from_file_location('depfarm', os.path.join(PACKAGE, '__init__.py'),
+                                              submodule_search_locations=[PACKAGE])
+sys.modules['depfarm'] = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sys.modules['depfarm'])
+
+from depfarm.exporters import export_points  # noqa: E402
+
+
+def benchmark_ascii(file_name: str, points: np.array) -> None:
+    np.savetxt(file_name, points, delimiter=";", fmt="%s")
+
+
+def benchmark_format(file_name: str, points: np.array, chunk_size: int) -> None:
+    export_points(file_name, points, chunk_size=chunk_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=1000000,
+                        help='Number of random points written')
+    parser.add_argument('--chunk-size', type=int, default=250000,
+                        help='Number of points written at a time by the exporters')
+    parser.add_argument('--formats', nargs='+', default=['npy', 'las', 'laz', 'parquet'],
+                        help='Exporter formats compared against ASCII')
+    args = parser.parse_args()
+
+    # Projected coordinates with millimeter detail, like a fetched 3DEP cloud
+    points = np.random.default_rng(0).uniform(
+        0, 1000, (args.points, 3)) + [-10430000, 5140000, 200]
+
+    runs = [('ascii (np.savetxt)', 'xyz', lambda file_name: benchmark_ascii(file_name, points))]
+    for file_format in args.formats:
+        runs.append((file_format, file_format, lambda file_name: benchmark_format(
+            file_name, points, args.chunk_size)))
+
+    print(f'{"format":<20}{"seconds":>10}{"Mpoints/s":>12}{"MiB":>10}{"x ascii":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        ascii_size = None
+        for name, extension, run in runs:
+            file_name = os.path.join(directory, f'points.{extension}')
+            start = time.perf_counter()
+            try:
+                run(file_name)
+            except ImportError as e:
+                print(f'{name:<20}skipped, {e}')
+                continue
+            elapsed = time.perf_counter() - start
+
+            size = os.path.getsize(file_name)
+            ascii_size = ascii_size or size
+            print(f'{name:<20}{elapsed:>10.3f}{args.points / elapsed / 1e6:>12.2f}'
+                  f'{size / 1024 ** 2:>10.1f}{size / ascii_size:>10.2f}')
+            os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
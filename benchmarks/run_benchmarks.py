@@ -0,0 +1,280 @@
+"""Benchmark suite of the fetch, conversion, sampling, catalog and export hot paths.
+
+Every benchmark is timed (best of several runs) and its peak traced memory recorded. Results are appended to a
+JSON history file, and every timing or peak memory more than the threshold over the last result of a previous
+version is flagged as a regression.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --sizes 1e5 1e6 1e7
+    python benchmarks/run_benchmarks.py --sizes 1e8 --repeat 1 --only sampling
+"""
+import os
+import sys
+import time
+import json
+import platform
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import importlib.util
+from datetime import datetime, timezone
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.join(ROOT, '3DEP-Farm')
+# The package directory is not a valid module name, so the checkout is loaded as the depfarm package, unless
+# the suite is imported by code that already imported it (the tests)
+if('depfarm' not in sys.modules):
+    spec = importlib.util.spec_from_file_location('depfarm', os.path.join(PACKAGE, '__init__.py'),
+                                                  submodule_search_locations=[PACKAGE])
+    sys.modules['depfarm'] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(sys.modules['depfarm'])
+
+from depfarm.subsampler import CloudSubSampler  # noqa: E402
+from depfarm.region_index import load_region_index  # noqa: E402
+from depfarm.catalog import read_catalog  # noqa: E402
+from depfarm.exporters import export_points  # noqa: E402
+
+LAZ_FILE = os.path.join(PACKAGE, 'farm_land_IA_FullState.laz')
+DEFAULT_RESULTS = os.path.join(ROOT, 'benchmarks', 'results.json')
+# Groups of the synthetic cloud benchmarks, the clouds are not created if none of them is run
+POINT_GROUPS = ['conversion', 'sampling', 'export']
+
+
+def create_points(size: int) -> np.array:
+    # Projected (EPSG:26915 like) coordinates over a square with about one point per square meter
+    side = np.sqrt(size)
+    points = np.random.default_rng(0).uniform(0, side, (size, 3))
+    points[:, 0] += 440000
+    points[:, 1] += 4640000
+    points[:, 2] = 300 + 5 * np.sin(points[:, 0] / 50) + points[:, 2] / side
+
+    return points
+
+
+def create_pipeline_array(points: np.array) -> np.array:
+    # Pdal arrays carry more dimensions than X, Y, Z and in no guaranteed order
+    array = np.zeros(len(points), dtype=[('Z', '<f8'), ('Intensity', '<u2'), ('X', '<f8'),
+                                         ('Classification', 'u1'), ('Y', '<f8')])
+    array['X'], array['Y'], array['Z'] = points[:, 0], points[:, 1], points[:, 2]
+
+    return array
+
+
+def get_fetcher(points: np.array):
+    """Builds a DataFetcher holding the points as the result of an already executed pipeline, so conversions
+    are measured without any download."""
+    from depfarm.data_fetcher import DataFetcher
+
+    fetcher = DataFetcher.__new__(DataFetcher)
+    fetcher.epsg = '26915'
+    fetcher.pipeline = type('Pipeline', (), {'arrays': [create_pipeline_array(points)]})()
+
+    return fetcher
+
+
+def get_point_cases(size: int, directory: str) -> list:
+    """Returns the (group, name, setup, run) benchmarks of a synthetic cloud size. setup is called before every
+    run and its result passed to run, so only run is measured. The cloud lives as long as the returned list,
+    so sizes are created and measured one at a time."""
+    points = create_points(size)
+    voxel_size = 2.0
+
+    def get_converted_fetcher():
+        fetcher = get_fetcher(points)
+        fetcher.cloud_points = points
+        return fetcher
+
+    cases = [
+        ('conversion', 'create_cloud_points', lambda: get_fetcher(points),
+         lambda fetcher: fetcher.create_cloud_points()),
+        ('conversion', 'get_elevation_geodf', get_converted_fetcher,
+         lambda fetcher: fetcher.get_elevation_geodf()),
+        ('sampling', 'factor_subsampling', lambda: CloudSubSampler(points),
+         lambda sampler: sampler.get_factor_subsampling(10)),
+        ('sampling', 'grid_subsampling', lambda: CloudSubSampler(points),
+         lambda sampler: sampler.get_grid_subsampling(voxel_size)),
+        ('sampling', 'distance_subsampling', lambda: CloudSubSampler(points),
+         lambda sampler: sampler.get_distance_subsampling(voxel_size))
+    ]
+
+    file_formats = ['npy', 'las']
+    # ASCII is the reference the binary exporters replaced, only measured on small clouds
+    if(size <= 1000000):
+        file_formats.append('xyz')
+    for file_format in file_formats:
+        cases.append(('export', f'export_{file_format}', lambda file_format=file_format: os.path.join(directory, f'points.{file_format}'),
+                      lambda file_name: export_points(file_name, points)))
+
+    return cases
+
+
+def get_file_cases() -> list:
+    """Returns the benchmarks of the bundled LAZ file and of the catalog."""
+    cases = [
+        ('sampling', 'laz_grid_subsampling', lambda: CloudSubSampler(file_name=LAZ_FILE),
+         lambda sampler: sampler.get_grid_subsampling(2.0)),
+        ('sampling', 'laz_streamed_grid_subsampling', lambda: CloudSubSampler(file_name=LAZ_FILE, chunk_size=100000),
+         lambda sampler: sampler.get_grid_subsampling(2.0)),
+        ('catalog', 'catalog_open', lambda: None,
+         lambda _: read_catalog(os.path.join(PACKAGE, 'aws_dataset.catalog'))),
+    ]
+
+    def query_regions(boxes):
+        index = load_region_index(os.path.join(
+            PACKAGE, 'aws_dataset.catalog'))
+        for box in boxes:
+            index.query(*box, predicate='contains')
+
+    def get_query_boxes():
+        index = load_region_index(os.path.join(
+            PACKAGE, 'aws_dataset.catalog'))
+        rng = np.random.default_rng(0)
+        centers = index.bounds[rng.integers(0, len(index.bounds), 1000)]
+        centers = (centers[:, :2] + centers[:, 2:]) / 2
+
+        return np.hstack((centers - 500, centers + 500))
+
+    cases.append(('catalog', 'catalog_lookup_1000',
+                 get_query_boxes, query_regions))
+
+    return cases
+
+
+def measure(setup, run, repeat: int) -> dict:
+    """Measures the best time of a benchmark over several runs, and its peak traced memory over a separate
+    run so tracing does not slow the timed runs down."""
+    times = []
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = setup()
+    tracemalloc.start()
+    run(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def run_cases(cases: list, results: dict, only: list, repeat: int, suffix: str = '') -> None:
+    """Measures the benchmarks of the selected groups, storing their results under their name and suffix."""
+    for group, name, setup, run in cases:
+        if(len(only) > 0 and group not in only):
+            continue
+        name += suffix
+        try:
+            results[name] = measure(setup, run, repeat)
+        except ImportError as e:
+            print(f'{name:<45}skipped, {e}')
+            continue
+        print(f'{name:<45}{results[name]["seconds"]:>10.4f}{results[name]["peak_bytes"] / 1024 ** 2:>12.1f}')
+
+
+def get_version() -> str:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def find_regressions(history: list, record: dict, threshold: float, min_seconds: float) -> list:
+    """Compares a run with the last run of a previous version (or the last run if there is none).
+
+    Returns
+    -------
+    list
+        (benchmark, metric, baseline value, new value) of every regression
+    """
+    previous = [old for old in history if old['version'] != record['version']
+                and old['machine'] == record['machine']]
+    if(len(previous) == 0):
+        previous = [old for old in history if old['machine']
+                    == record['machine']]
+    if(len(previous) == 0):
+        return []
+
+    baseline = previous[-1]['results']
+    regressions = []
+    for name, result in record['results'].items():
+        if(name not in baseline):
+            continue
+        old = baseline[name]
+        if(result['seconds'] > old['seconds'] * (1 + threshold) and result['seconds'] - old['seconds'] > min_seconds):
+            regressions.append(
+                (name, 'seconds', old['seconds'], result['seconds']))
+        if(result['peak_bytes'] > old['peak_bytes'] * (1 + threshold) and result['peak_bytes'] - old['peak_bytes'] > 1024 ** 2):
+            regressions.append(
+                (name, 'peak_bytes', old['peak_bytes'], result['peak_bytes']))
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e5, 1e6],
+                        help='Synthetic cloud sizes, from 1e5 up to 1e8 points')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs of every benchmark, the best one is kept')
+    parser.add_argument('--only', nargs='+', default=[],
+                        help='Benchmark groups to run, among conversion, sampling, catalog and export')
+    parser.add_argument('--results', default=DEFAULT_RESULTS,
+                        help='JSON file the results history is kept in')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown or memory growth flagged as a regression')
+    parser.add_argument('--min-seconds', type=float, default=0.01,
+                        help='Slowdowns smaller than this many seconds are not flagged')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not append the results to the history')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    results = {}
+    print(f'{"benchmark":<45}{"seconds":>10}{"peak MiB":>12}')
+    try:
+        run_cases(get_file_cases(), results, args.only, args.repeat)
+        if(len(args.only) == 0 or any(group in args.only for group in POINT_GROUPS)):
+            for size in args.sizes:
+                # Only a single synthetic cloud is held at a time, a 1e8 cloud alone takes 2.4 GB
+                run_cases(get_point_cases(int(size), directory), results, args.only, args.repeat,
+                          f'[{int(size):.0e}]')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    record = {
+        'version': get_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'machine': f'{platform.node()} {platform.machine()} {os.cpu_count()} cores',
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results
+    }
+
+    history = []
+    if(os.path.exists(args.results)):
+        with open(args.results, 'r') as file_handler:
+            history = json.load(file_handler)
+
+    regressions = find_regressions(
+        history, record, args.threshold, args.min_seconds)
+    for name, metric, old, new in regressions:
+        print(
+            f'REGRESSION {name} {metric}: {old:.4g} -> {new:.4g} ({new / old - 1:+.0%})')
+
+    if(not args.no_save):
+        history.append(record)
+        with open(args.results, 'w') as file_handler:
+            json.dump(history, file_handler, indent=2)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
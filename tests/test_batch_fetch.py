@@ -0,0 +1,84 @@
+import unittest
+import os
+from json import loads
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import box
+from depfarm import batch_fetch
+
+package_path = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), '3DEP-Farm')
+
+
+def grid_worker(pipeline_json: str, dtype: type = np.float64) -> np.array:
+    # Stands in for a Pdal read: a 5 meter grid of points over the read bounds, cropped to the fields
+    stages = loads(pipeline_json)
+    (minx, maxx), (miny, maxy) = loads(
+        stages[0]['bounds'].replace('(', '[').replace(')', ']'))
+    x, y = np.meshgrid(np.arange(np.ceil(minx / 5) * 5, maxx + 1e-6, 5),
+                       np.arange(np.ceil(miny / 5) * 5, maxy + 1e-6, 5))
+    points = np.stack((x.ravel(), y.ravel(), np.zeros(x.size)), axis=1)
+    crop = shapely.union_all([shapely.from_wkt(wkt) for wkt in stages[1]['polygon']])
+
+    return points[shapely.intersects_xy(crop, points[:, 0], points[:, 1])].astype(dtype)
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        # Fields in Story County, Iowa, two of them next to each other and one far away
+        self.fields = gpd.GeoDataFrame({'name': ['a', 'b', 'c']}, geometry=[
+            box(-10425000, 5165000, -10424900, 5165100),
+            box(-10424850, 5165000, -10424700, 5165080),
+            box(-10400000, 5150000, -10399900, 5150050)], crs='EPSG:3857')
+
+    def get_fetcher(self, **options) -> batch_fetch.BatchFetcher:
+        return batch_fetch.BatchFetcher(self.fields, '3857', id_column='name',
+                                        catalog_file=os.path.join(
+                                            package_path, 'aws_dataset.catalog'),
+                                        template_file=os.path.join(package_path, 'pipeline_template.json'), **options)
+
+    def test_group_fields(self):
+        bounds = np.array([[0, 0, 10, 10], [20, 0, 30, 10], [5000, 0, 5010, 10], [0, 0, 10, 10]])
+
+        groups = batch_fetch.group_fields(bounds, ['r1', 'r1', 'r1', 'r2'], group_size=1000)
+        limited = batch_fetch.group_fields(bounds, ['r1'] * 4, group_size=1000, max_fields=2)
+
+        self.assertEqual([('r1', [0, 1]), ('r1', [2]), ('r2', [3])],
+                         [(region, indices.tolist()) for region, indices in groups])
+        self.assertEqual([[0, 3], [1], [2]], [indices.tolist() for _, indices in limited])
+
+    def test_split_points(self):
+        points = np.random.default_rng(0).uniform(0, 10, (2000, 3))
+        polygons = [box(0, 0, 5, 5), shapely.Polygon([(2, 2), (9, 3), (4, 9)])]
+
+        indices = batch_fetch.split_points(points, polygons)
+
+        for polygon, field_indices in zip(polygons, indices):
+            expected = np.flatnonzero([polygon.intersects(shapely.Point(point[:2])) for point in points])
+            self.assertTrue(np.array_equal(expected, field_indices))
+
+    def test_fetch_shares_reads(self):
+        fetcher = self.get_fetcher()
+
+        results = {result.field_id: result for result in fetcher.fetch(max_workers=1, worker=grid_worker)}
+
+        self.assertEqual(2, len(fetcher.groups))
+        self.assertEqual({'a', 'b', 'c'}, set(results))
+        self.assertTrue(results['a'].access_url.endswith('IA_FullState/ept.json'))
+        # Points on the boundaries are kept: 21 x 21, 31 x 17 and 21 x 11 grid points
+        self.assertEqual([441, 527, 231], [len(results[name].cloud_points) for name in ['a', 'b', 'c']])
+        self.assertEqual([1, 2], sorted(len(loads(fetcher.get_group_pipeline(*group))[1]['polygon'])
+                                        for group in fetcher.groups))
+
+    def test_fetch_in_process_pool(self):
+        fetcher = self.get_fetcher(group_size=100)
+
+        results = list(fetcher.fetch(max_workers=2, worker=grid_worker))
+
+        self.assertEqual(3, len(fetcher.groups))
+        self.assertEqual(1199, sum(len(result.cloud_points) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
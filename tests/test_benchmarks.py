@@ -0,0 +1,49 @@
+import unittest
+import os
+import importlib.util
+
+spec = importlib.util.spec_from_file_location('run_benchmarks', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'run_benchmarks.py'))
+run_benchmarks = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(run_benchmarks)
+
+
+def get_record(version: str, results: dict, machine: str = 'host x86_64 4 cores') -> dict:
+    return {'version': version, 'machine': machine,
+            'results': {name: {'seconds': seconds, 'peak_bytes': peak} for name, (seconds, peak) in results.items()}}
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.history = [get_record('v1', {'grid': (1.0, 100 * 1024 ** 2), 'export': (0.001, 1024)}),
+                        get_record('v2', {'grid': (2.0, 100 * 1024 ** 2)}),
+                        get_record('v1', {'grid': (0.1, 1024)}, machine='other x86_64 64 cores')]
+
+    def test_find_regressions_against_previous_version(self):
+        record = get_record('v2', {'grid': (1.5, 130 * 1024 ** 2), 'export': (0.005, 4096), 'factor': (9.0, 1024)})
+
+        regressions = run_benchmarks.find_regressions(self.history, record, threshold=0.2, min_seconds=0.01)
+
+        # Compared with v1 on the same machine, not with an earlier v2 run or another machine. The export
+        # slowdown is under min_seconds and its memory growth under a MiB, the new factor benchmark has no baseline
+        self.assertEqual([('grid', 'seconds', 1.0, 1.5), ('grid', 'peak_bytes', 100 * 1024 ** 2, 130 * 1024 ** 2)],
+                         regressions)
+
+    def test_find_regressions_within_threshold(self):
+        record = get_record('v3', {'grid': (2.3, 110 * 1024 ** 2)})
+
+        self.assertEqual([], run_benchmarks.find_regressions(self.history, record, threshold=0.2, min_seconds=0.01))
+        self.assertEqual([('grid', 'seconds', 2.0, 2.3)],
+                         run_benchmarks.find_regressions(self.history, record, threshold=0.1, min_seconds=0.01))
+
+    def test_find_regressions_without_history(self):
+        record = get_record('v1', {'grid': (5.0, 1024)}, machine='new x86_64 2 cores')
+
+        self.assertEqual([], run_benchmarks.find_regressions(self.history, record, threshold=0.2, min_seconds=0.01))
+        # Without a previous version, the last run of the same version is the baseline
+        self.assertEqual([('grid', 'seconds', 0.1, 0.5)], run_benchmarks.find_regressions(
+            self.history[2:], get_record('v1', {'grid': (0.5, 1024)}, machine='other x86_64 64 cores'), 0.2, 0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
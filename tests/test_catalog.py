@@ -0,0 +1,30 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import catalog
+
+
+class TestCases(unittest.TestCase):
+    def test_write_read_round_trip(self):
+        bounds = np.arange(12, dtype=np.float64).reshape(2, 6)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'test.catalog')
+            catalog.write_catalog(file_name, bounds, [10, -1], ['IA', 'MN'], ['FullState', '2012'],
+                                  ['url_1', 'url_2'], ['IA_FullState', 'MN_2012', 'ünicode'])
+
+            loaded = catalog.read_catalog(file_name)
+
+            self.assertEqual(2, len(loaded))
+            self.assertEqual(bounds.tolist(), loaded.bounds.tolist())
+            self.assertEqual([10, -1], loaded.points.tolist())
+            self.assertEqual(['IA', 'MN'], loaded.regions.to_list())
+            self.assertEqual('2012', loaded.years[-1])
+            self.assertEqual('url_1', loaded.access_urls[0])
+            self.assertEqual({'IA_FullState', 'MN_2012', 'ünicode'}, loaded.get_folder_set())
+            self.assertIsInstance(loaded.bounds.base, np.memmap)
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()
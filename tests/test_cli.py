@@ -0,0 +1,108 @@
+import unittest
+import os
+import logging
+import sys
+import time
+import tempfile
+import subprocess
+import importlib
+from configparser import ConfigParser
+import numpy as np
+from depfarm import cli
+
+root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCases(unittest.TestCase):
+    def test_startup_within_budget(self):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-m', 'depfarm.cli', '--help'],
+                                capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertIn('fetch', result.stdout)
+        self.assertLess(elapsed, cli.STARTUP_BUDGET)
+
+    def test_heavy_modules_not_imported(self):
+        code = ('import sys; import depfarm.cli, depfarm.data_fetcher, depfarm.batch_fetch; '
+                'print(" ".join(sorted(name for name in ["pdal", "geopandas", "pandas", "matplotlib", '
+                '"mpl_toolkits", "laspy"] if name in sys.modules)))')
+        result = subprocess.run([sys.executable, '-c', code],
+                                capture_output=True, text=True)
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual('', result.stdout.strip())
+
+    def test_console_script_entry_point(self):
+        setup = ConfigParser()
+        setup.read(os.path.join(root_path, 'setup.cfg'))
+        scripts = dict(line.split(' = ') for line in setup['options.entry_points']
+                       ['console_scripts'].strip().splitlines())
+        module_name, function_name = scripts['depfarm'].split(':')
+
+        # Imported like the generated depfarm script does
+        main = getattr(importlib.import_module(module_name), function_name)
+
+        self.assertIs(cli.main, main)
+        self.assertEqual('3DEP-Farm', setup['options']['package_dir'].split('=')[1].strip())
+        self.assertTrue(os.path.exists(os.path.join(root_path, '3DEP-Farm', module_name.split('.')[1] + '.py')))
+
+    def test_export_and_sample(self):
+        self.addCleanup(logging.disable, logging.NOTSET)
+        points = np.random.default_rng(0).uniform(0, 100, (5000, 3))
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'points.npy')
+            np.save(source, points)
+
+            self.assertEqual(0, cli.main(['--quiet', 'export', source, os.path.join(directory, 'points.laz'),
+                                          '--chunk-size', '1200']))
+            self.assertEqual(0, cli.main(['--quiet', 'sample', os.path.join(directory, 'points.laz'),
+                                          os.path.join(directory, 'sampled.xyz'), '--method', 'grid',
+                                          '--size', '10', '--chunk-size', '1000']))
+
+            exported = np.concatenate(list(cli.iter_file_chunks(
+                os.path.join(directory, 'points.laz'))))
+            sampled = np.loadtxt(os.path.join(
+                directory, 'sampled.xyz'), delimiter=';')
+
+        self.assertTrue(np.allclose(points, exported, atol=1e-3))
+        self.assertLessEqual(len(sampled), 1000)
+        self.assertGreater(len(sampled), 0)
+
+    def test_read_back_exported_xyz(self):
+        self.addCleanup(logging.disable, logging.NOTSET)
+        points = np.random.default_rng(0).uniform(0, 100, (50, 3))
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'points.npy')
+            np.save(source, points)
+            spaced = os.path.join(directory, 'spaced.xyz')
+            np.savetxt(spaced, points)
+
+            self.assertEqual(0, cli.main(['--quiet', 'export', source, os.path.join(directory, 'points.xyz')]))
+            self.assertEqual(0, cli.main(['--quiet', 'export', os.path.join(directory, 'points.xyz'),
+                                          os.path.join(directory, 'copy.npy')]))
+            self.assertEqual(0, cli.main(['--quiet', 'sample', os.path.join(directory, 'points.xyz'),
+                                          os.path.join(directory, 'sampled.npy'), '--method', 'factor', '--size', '2']))
+
+            copied = np.load(os.path.join(directory, 'copy.npy'))
+            sampled = np.load(os.path.join(directory, 'sampled.npy'))
+            spaced_points = np.concatenate(list(cli.iter_file_chunks(spaced)))
+
+        self.assertTrue(np.allclose(points, copied, atol=1e-3))
+        self.assertEqual(25, len(sampled))
+        self.assertTrue(np.allclose(points, spaced_points))
+
+    def test_unknown_format_exits(self):
+        with self.assertRaises(SystemExit):
+            cli.main(['export', 'points.npy', 'points.unknown'])
+
+    def test_uncached_fetch_with_cache_exits(self):
+        arguments = ['fetch', '--bounds', '0', '0', '1', '1', '--output', 'points.npy', '--cache', 'cache']
+        for option in [['--chunk-size', '1000'], ['--tile-size', '500'], ['--multi-region']]:
+            with self.assertRaises(SystemExit):
+                cli.main(arguments + option)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import data_fetcher
+from depfarm.fetch_cache import FetchCache
+
+template_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), '3DEP-Farm', 'pipeline_template.json')
+
+
+def create_pipeline_array(size: int) -> np.array:
+    # Pdal arrays carry more dimensions than X, Y, Z and in no guaranteed order
+    dtype = [('Z', '<f8'), ('Intensity', '<u2'), ('X', '<f8'),
+             ('Classification', 'u1'), ('Y', '<f8')]
+    points = np.zeros(size, dtype=dtype)
+    points['X'] = np.arange(size)
+    points['Y'] = np.arange(size) * 2
+    points['Z'] = np.arange(size) * 3
+
+    return points
+
+
+class TestCases(unittest.TestCase):
+    def test_get_xyz_points(self):
+        cloud_points = data_fetcher.get_xyz_points(create_pipeline_array(5))
+
+        self.assertEqual((5, 3), cloud_points.shape)
+        self.assertEqual([4.0, 8.0, 12.0], cloud_points[4].tolist())
+
+    def test_get_xyz_points_float32(self):
+        cloud_points = data_fetcher.get_xyz_points(
+            create_pipeline_array(5), np.float32)
+
+        self.assertEqual(np.float32, cloud_points.dtype)
+        self.assertEqual([1.0, 2.0, 3.0], cloud_points[1].tolist())
+
+    def test_get_elevation_geodf_cached(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.epsg = '26915'
+        fetcher.cloud_points = np.arange(12, dtype=np.float64).reshape(4, 3)
+
+        elevation = fetcher.get_elevation_geodf()
+
+        self.assertEqual([2.0, 5.0, 8.0, 11.0], elevation['elevation'].tolist())
+        self.assertEqual((9.0, 10.0), elevation.geometry[3].coords[0])
+        self.assertIs(elevation, fetcher.get_elevation_geodf())
+
+        fetcher.cloud_points = fetcher.cloud_points[::2]
+        self.assertEqual(2, len(fetcher.get_elevation_geodf()))
+
+    def test_lazy_original_elevation_geodf(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.epsg = '26915'
+        fetcher.pipeline = type('Pipeline', (), {'execute': lambda self: 4,
+                                                 'arrays': [create_pipeline_array(4)]})()
+
+        fetcher.get_data(lazy_geodf=True)
+
+        self.assertFalse(hasattr(fetcher, 'elevation_geodf'))
+        self.assertEqual(4, len(fetcher.original_elevation_geodf))
+        self.assertIs(fetcher.original_elevation_geodf, fetcher.elevation_geodf)
+
+    def test_iter_cloud_points(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        array = create_pipeline_array(10)
+        fetcher.pipeline = type('Pipeline', (), {'iterator': lambda self, chunk_size: (
+            array[i:i + chunk_size] for i in range(0, len(array), chunk_size))})()
+
+        batches = list(fetcher.iter_cloud_points(chunk_size=4))
+
+        self.assertEqual([4, 4, 2], [len(batch) for batch in batches])
+        self.assertEqual(10, fetcher.data_count)
+        self.assertEqual([9.0, 18.0, 27.0], batches[-1][-1].tolist())
+
+    def test_get_simple_pipeline_stages(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.load_pipeline_template(template_path)
+        fetcher.epsg = '26915'
+        fetcher.file_location = 'ept.json'
+        fetcher.extraction_bounds = '([0, 10],[0, 10])'
+        fetcher.polygon_cropping = 'POLYGON((0 0,0 10,10 10,0 0))'
+        range_filter = {'type': 'filters.range', 'limits': 'X[0.0:5.0),Y[0.0:10.0]'}
+
+        stages = fetcher.get_simple_pipeline_stages('([0, 5],[0, 10])', [range_filter])
+
+        self.assertEqual('([0, 5],[0, 10])', stages[0]['bounds'])
+        self.assertEqual(range_filter, stages[1])
+        self.assertEqual('filters.crop', stages[2]['type'])
+        self.assertEqual('EPSG:26915', stages[-1]['out_srs'])
+        self.assertNotEqual('ept.json', fetcher.template_pipeline['reader']['filename'])
+
+    def test_resolution_plan_limits_reader(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.load_pipeline_template(template_path)
+        fetcher.epsg = '26915'
+        fetcher.file_location = 'ept.json'
+        fetcher.extraction_bounds = '([0, 10],[0, 10])'
+        fetcher.polygon_cropping = 'POLYGON((0 0,0 10,10 10,0 0))'
+        full_hash = fetcher.get_simple_pipeline_spec().get_hash()
+
+        fetcher.resolution_plan = data_fetcher.ResolutionPlan(2, 2.5, 10, 40, 12, 360)
+        spec = fetcher.get_simple_pipeline_spec()
+
+        self.assertEqual(2.5, spec.to_list()[0]['resolution'])
+        self.assertNotEqual(full_hash, spec.get_hash())
+        self.assertIsNone(fetcher.limit_resolution())
+        self.assertNotIn('resolution', fetcher.get_simple_pipeline_stages()[0])
+
+    def test_multi_region_plans_every_source(self):
+        from json import loads
+        from depfarm.region_index import RegionCandidate
+
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.load_pipeline_template(template_path)
+        fetcher.epsg = '26915'
+        fetcher.file_location = 'a/ept.json'
+        fetcher.polygon_bounds = (0, 0, 20, 10)
+        fetcher.polygon_cropping = 'POLYGON((0 0,0 10,20 10,0 0))'
+        fetcher.region_candidates = [RegionCandidate('a', '2012', 'a/ept.json', (0, 0, 10, 10), 0.5, False),
+                                     RegionCandidate('b', '2018', 'b/ept.json', (10, 0, 30, 10), 0.5, False)]
+        plans, pipelines = [], []
+
+        def plan_resolution(ept_url, bounds, spacing, point_budget):
+            plans.append((ept_url, bounds, spacing))
+            # Source b has a span twice as coarse, so it needs a deeper level
+            depth = 1 if ept_url == 'a/ept.json' else 2
+            return data_fetcher.ResolutionPlan(depth, 4.0 / depth, 0, 0, 12, 0)
+
+        def fetch_pipelines(worker, pipeline_jsons, max_workers, dtype):
+            pipelines.extend(loads(pipeline_json) for pipeline_json in pipeline_jsons)
+            return [np.zeros((0, 3), dtype=dtype) for _ in pipeline_jsons]
+
+        for name, function in [('plan_resolution', plan_resolution), ('fetch_pipelines', fetch_pipelines)]:
+            self.addCleanup(setattr, data_fetcher, name, getattr(data_fetcher, name))
+            setattr(data_fetcher, name, function)
+
+        fetcher.limit_resolution(spacing=2)
+        fetcher.get_data_multi_region()
+
+        self.assertEqual([('a/ept.json', (0, 0, 20, 10), 2), ('b/ept.json', (10, 0, 20, 10), 2),
+                          ('a/ept.json', (0, 0, 10, 10), 2)], plans)
+        self.assertEqual({'b/ept.json': 2.0, 'a/ept.json': 4.0},
+                         {pipeline[0]['filename']: pipeline[0]['resolution'] for pipeline in pipelines})
+
+    def test_get_data_cache_hit_skips_pipeline(self):
+        executions = []
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.epsg = '26915'
+        fetcher.file_location = 'ept.json'
+        fetcher.extraction_bounds = '([0, 10],[0, 10])'
+        fetcher.polygon_cropping = 'POLYGON((0 0,0 10,10 10,0 0))'
+        fetcher.pipeline_json = '[{"type": "readers.ept"}]'
+        fetcher.pipeline = type('Pipeline', (), {'execute': lambda self: executions.append(1) or 3,
+                                                 'arrays': [create_pipeline_array(3)]})()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = FetchCache(directory)
+
+            fetcher.get_data(lazy_geodf=True, cache=cache)
+            fetcher.get_data(lazy_geodf=True, cache=cache)
+
+        self.assertEqual(1, len(executions))
+        self.assertEqual([2.0, 4.0, 6.0], fetcher.cloud_points[2].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
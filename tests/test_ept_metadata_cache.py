@@ -0,0 +1,78 @@
+import unittest
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from depfarm import ept_metadata_cache
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    """Local stand-in serving EPT metadata with an ETag and answering matching conditional requests with 304."""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get('If-None-Match')))
+        body = json.dumps({'path': self.path, 'points': 10}).encode()
+        etag = '"' + str(len(self.path)) + '"'
+
+        if(self.headers.get('If-None-Match') == etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        EtagHandler.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), EtagHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/IA_FullState/ept.json'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_memo_and_conditional_revalidation(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache = ept_metadata_cache.EptMetadataCache(directory)
+
+        self.assertEqual(10, cache.get_ept(self.url)['points'])
+        self.assertEqual(10, cache.get_ept(self.url)['points'])
+        self.assertEqual(1, len(EtagHandler.requests))
+
+        revalidating_cache = ept_metadata_cache.EptMetadataCache(directory)
+        self.assertEqual('/IA_FullState/ept.json', revalidating_cache.get_ept(self.url)['path'])
+        self.assertEqual(2, len(EtagHandler.requests))
+        self.assertIsNotNone(EtagHandler.requests[-1][1])
+        self.assertEqual(0, revalidating_cache.bytes_fetched)
+
+        offline_cache = ept_metadata_cache.EptMetadataCache(directory, revalidate=False)
+        offline_cache.get_ept(self.url)
+        self.assertEqual(2, len(EtagHandler.requests))
+
+    def test_get_hierarchy(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache = ept_metadata_cache.EptMetadataCache(directory)
+
+        hierarchy = cache.get_hierarchy(self.url, '1-0-0-0')
+
+        self.assertEqual('/IA_FullState/ept-hierarchy/1-0-0-0.json', hierarchy['path'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from depfarm import ept_resolution
+
+
+class FakeMetadataCache():
+    """Stand-in serving an in-memory EPT dataset, recording the hierarchy files requested."""
+
+    def __init__(self, ept: dict, hierarchies: dict) -> None:
+        self.ept = ept
+        self.hierarchies = hierarchies
+        self.requested = []
+
+    def get_ept(self, ept_url: str) -> dict:
+        return self.ept
+
+    def get_hierarchy(self, ept_url: str, key: str = '0-0-0-0') -> dict:
+        self.requested.append(key)
+
+        return self.hierarchies[key]
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        ept = {'bounds': [0, 0, 0, 1024, 1024, 1024], 'span': 128, 'srs': {'horizontal': '26915'},
+               'schema': [{'name': name, 'size': 4} for name in 'XYZ']}
+        self.cache = FakeMetadataCache(ept, {
+            '0-0-0-0': {'0-0-0-0': 100, '1-0-0-0': 200, '1-1-0-0': 200, '2-0-0-0': -1, '2-2-0-0': -1},
+            '2-0-0-0': {'2-0-0-0': 400, '3-0-0-0': 800}})
+        # Covers the node 1-0-0-0 and a quarter of the root node
+        self.bounds = (0, 0, 512, 512)
+
+    def test_count_depth_points(self):
+        counts = ept_resolution.count_depth_points('ept.json', self.bounds, self.cache)
+
+        self.assertEqual([25, 200, 400, 800], counts.tolist())
+        # The subtree outside of the bounds is never fetched
+        self.assertEqual(['0-0-0-0', '2-0-0-0'], self.cache.requested)
+
+    def test_count_depth_points_skips_sibling_subtrees(self):
+        hierarchy = {'0-0-0-0': 1, '1-0-0-0': 1, '2-0-0-0': -1, '2-1-0-0': -1, '2-1-1-0': -1}
+        cache = FakeMetadataCache(self.cache.ept, {
+            '0-0-0-0': hierarchy, '2-0-0-0': {'2-0-0-0': 16},
+            '2-1-0-0': {'2-1-0-0': 16}, '2-1-1-0': {'2-1-1-0': 16}})
+
+        counts = ept_resolution.count_depth_points('ept.json', (0, 0, 128, 128), cache)
+
+        self.assertEqual([1 / 64, 1 / 16, 4], counts.tolist())
+        self.assertEqual(['0-0-0-0', '2-0-0-0'], cache.requested)
+
+    def test_plan_resolution_spacing(self):
+        plan = ept_resolution.plan_resolution('ept.json', self.bounds, spacing=2, cache=self.cache)
+
+        self.assertEqual((2, 2.0, 625, 1425, 12, 9600), tuple(plan))
+        # Finer than the deepest level reads every level
+        self.assertEqual(3, ept_resolution.plan_resolution(
+            'ept.json', self.bounds, spacing=0.1, cache=self.cache).depth)
+
+    def test_plan_resolution_point_budget(self):
+        plan = ept_resolution.plan_resolution('ept.json', self.bounds, point_budget=700, cache=self.cache)
+
+        self.assertEqual((2, 2.0), (plan.depth, plan.resolution))
+        self.assertEqual(0, ept_resolution.plan_resolution(
+            'ept.json', self.bounds, point_budget=10, cache=self.cache).depth)
+        with self.assertRaises(ValueError):
+            ept_resolution.plan_resolution('ept.json', self.bounds, cache=self.cache)
+
+    def test_ground_scale_of_web_mercator(self):
+        y = ept_resolution.MERCATOR_RADIUS * np.arcsinh(np.tan(np.radians(60)))
+        ept = {'srs': {'horizontal': '3857'}}
+
+        self.assertAlmostEqual(2, ept_resolution.get_ground_scale(ept, (0, y, 10, y)))
+        self.assertAlmostEqual(1, ept_resolution.get_ground_scale(ept, (0, -10, 10, 10)))
+        self.assertEqual(1, ept_resolution.get_ground_scale(self.cache.ept, (0, y, 10, y)))
+
+
+if __name__ == '__main__':
+    unittest.main()
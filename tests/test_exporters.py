@@ -0,0 +1,114 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import laspy
+from depfarm import exporters
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(
+            0, 1000, (2500, 3)) + [500000, 4600000, 0]
+        self.chunks = [self.points[start:start + 700]
+                       for start in range(0, len(self.points), 700)]
+
+    def test_npy_writer_streams_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.npy')
+
+            count = exporters.export_chunks(file_name, iter(self.chunks))
+            loaded = exporters.load_npy(file_name)
+
+            self.assertEqual(2500, count)
+            self.assertIsInstance(loaded, np.memmap)
+            self.assertTrue(np.array_equal(self.points, loaded))
+            self.assertTrue(np.array_equal(self.points, np.load(file_name)))
+
+    def test_npy_writer_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.npy')
+
+            exporters.export_chunks(file_name, iter([]), dtype=np.float32)
+
+            self.assertEqual((0, 3), exporters.load_npy(file_name).shape)
+
+    def test_las_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.las')
+
+            exporters.export_chunks(file_name, iter(self.chunks), scales=(0.01, 0.01, 0.01))
+            las = laspy.read(file_name)
+
+            self.assertEqual(2500, las.header.point_count)
+            self.assertTrue(np.allclose(self.points, np.vstack((las.x, las.y, las.z)).transpose(), atol=0.005))
+            self.assertTrue(np.allclose(np.min(self.points, axis=0), las.header.mins, atol=0.005))
+
+    def test_las_writer_crs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.laz')
+
+            exporters.export_points(file_name, self.points, epsg='26915')
+            exporters.export_points(os.path.join(directory, 'points.las'), self.points)
+            # Formats without a CRS ignore it
+            exporters.export_points(os.path.join(directory, 'points.xyz'), self.points, epsg='26915')
+
+            self.assertEqual(26915, laspy.read(file_name).header.parse_crs().to_epsg())
+            self.assertIsNone(laspy.read(os.path.join(directory, 'points.las')).header.parse_crs())
+
+    def test_ascii_writer_precision(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.xyz')
+
+            exporters.export_points(file_name, self.points, chunk_size=1000, precision=2)
+
+            self.assertTrue(np.allclose(self.points, np.loadtxt(file_name, delimiter=';'), atol=0.005))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_arrow_writer(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            parquet_name = os.path.join(directory, 'points.parquet')
+            arrow_name = os.path.join(directory, 'points.arrow')
+
+            self.assertEqual(2500, exporters.export_chunks(parquet_name, iter(self.chunks)))
+            exporters.export_points(arrow_name, self.points, chunk_size=1000, dtype=np.float32)
+            parquet = pyarrow.parquet.ParquetFile(parquet_name)
+            with pyarrow.ipc.open_file(arrow_name) as reader:
+                arrow = reader.read_all()
+
+            self.assertEqual(4, parquet.num_row_groups)
+            self.assertTrue(np.array_equal(self.points, np.column_stack(
+                [parquet.read().column(column).to_numpy() for column in exporters.COLUMNS])))
+            self.assertEqual(pyarrow.float32(), arrow.schema.field('z').type)
+            self.assertTrue(np.allclose(self.points, np.column_stack(
+                [arrow.column(column).to_numpy() for column in exporters.COLUMNS])))
+
+    def test_chunk_writer_is_abstract(self):
+        with self.assertRaises(TypeError):
+            exporters.ChunkWriter('points.xyz')
+
+    def test_flat_chunks_counted_by_point(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.npy')
+
+            count = exporters.export_chunks(file_name, (chunk.ravel() for chunk in self.chunks))
+
+            self.assertEqual(2500, count)
+            self.assertTrue(np.array_equal(self.points, exporters.load_npy(file_name)))
+
+    def test_get_file_format(self):
+        self.assertEqual('laz', exporters.get_file_format('points.LAZ'))
+        self.assertEqual('npy', exporters.get_file_format('points.bin', 'npy'))
+        self.assertRaises(ValueError, exporters.get_file_format, 'points.bin')
+
+
+if __name__ == '__main__':
+    unittest.main()
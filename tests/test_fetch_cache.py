@@ -0,0 +1,50 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import fetch_cache
+
+
+class TestCases(unittest.TestCase):
+    def test_put_get_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = fetch_cache.FetchCache(directory)
+            key = cache.get_key('url', '([0, 1],[0, 1])', 'POLYGON', '[]')
+            points = np.arange(30, dtype=np.float32).reshape(10, 3)
+
+            self.assertIsNone(cache.get(key))
+            cache.put(key, points)
+
+            cached = cache.get(key)
+            self.assertEqual(np.float32, cached.dtype)
+            self.assertTrue(np.array_equal(points, cached))
+            self.assertEqual([], [name for name in os.listdir(os.path.dirname(
+                cache.get_path(key))) if name.endswith('.tmp')])
+
+    def test_key_depends_on_pipeline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = fetch_cache.FetchCache(directory)
+
+            self.assertEqual(cache.get_key('url', 'b', 'p', '[1]'), cache.get_key('url', 'b', 'p', '[1]'))
+            self.assertNotEqual(cache.get_key('url', 'b', 'p', '[1]'), cache.get_key('url', 'b', 'p', '[2]'))
+            self.assertNotEqual(cache.get_key('url', 'b', 'p', '[1]'),
+                                cache.get_key('url', 'b', 'p', '[1]', np.float32))
+
+    def test_least_recently_used_evicted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            points = np.zeros((100, 3))
+            cache = fetch_cache.FetchCache(directory, max_bytes=int(points.nbytes * 2.5))
+
+            for index, key in enumerate(['a' * 64, 'b' * 64, 'c' * 64]):
+                cache.put(key, points)
+                os.utime(cache.get_path(key), (index, index))
+                if(key == 'b' * 64):
+                    cache.get('a' * 64)
+
+            self.assertIsNotNone(cache.get('a' * 64))
+            self.assertIsNone(cache.get('b' * 64))
+            self.assertIsNotNone(cache.get('c' * 64))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import lod_pyramid
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 16, (3000, 3))
+
+    def test_build_lod_order(self):
+        order, offsets, voxel_sizes = lod_pyramid.build_lod_order(self.points, 1, 4)
+
+        self.assertEqual([8, 4, 2, 1], voxel_sizes)
+        self.assertTrue(np.array_equal(np.arange(len(self.points)), np.sort(order)))
+        self.assertEqual(len(self.points), offsets[-1])
+        self.assertEqual(sorted(offsets), offsets)
+
+        # Every voxel of a level holds exactly one point of that level
+        origin = np.min(self.points, axis=0)
+        for level, size in enumerate(voxel_sizes):
+            level_points = self.points[order[:offsets[level + 1]]]
+            occupied = np.unique((self.points - origin) // size, axis=0)
+            level_voxels = np.unique((level_points - origin) // size, axis=0)
+            self.assertEqual(len(occupied), len(level_voxels))
+            self.assertEqual(len(level_points), len(level_voxels))
+
+    def test_write_and_read_levels(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'cloud_lod.npy')
+            lod_pyramid.write_lod_pyramid(file_name, self.points, 1, 4)
+            pyramid = lod_pyramid.LodPyramid(file_name)
+
+            self.assertEqual(5, pyramid.get_level_count())
+            self.assertTrue(np.array_equal(np.sort(self.points, axis=0),
+                                           np.sort(pyramid.get_level(-1), axis=0)))
+            self.assertTrue(np.array_equal(pyramid.get_level(2), pyramid.get_level(3)[:len(pyramid.get_level(2))]))
+            self.assertEqual(pyramid.offsets[2], len(pyramid.get_level(pyramid.get_level_for_budget(pyramid.offsets[2] + 1))))
+            self.assertEqual(0, pyramid.get_level_for_budget(0))
+
+    def test_empty_points(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'cloud_lod.npy')
+            lod_pyramid.write_lod_pyramid(file_name, np.zeros((0, 3)), levels=3)
+
+            self.assertEqual(0, len(lod_pyramid.LodPyramid(file_name).get_level(1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import metrics, data_fetcher
+
+
+def create_pipeline_array(size: int) -> np.array:
+    points = np.zeros(size, dtype=[('X', '<f8'), ('Y', '<f8'), ('Z', '<f8')])
+    points['X'] = np.arange(size)
+
+    return points
+
+
+PIPELINE_LOG = """(pdal pipeline Debug) Executing pipeline
+(readers.ept Debug) Fetched 12 nodes in 1.5 s
+(readers.ept Debug) Decompressed nodes in 250 ms
+(filters.smrf Debug) progressive filter took 0.75 seconds
+(filters.crop Debug) Cropping with 1 polygon
+"""
+
+PIPELINE_METADATA = {'metadata': {'readers.ept': {'count': 120, 'srs': {}},
+                                  'filters.crop': [{'count': 80}],
+                                  'filters.reprojection': {}}}
+
+
+class TestCases(unittest.TestCase):
+    def test_spans_and_counters(self):
+        recorded = metrics.Metrics()
+        with recorded.span('catalog_lookup'):
+            pass
+        recorded.add_span('catalog_lookup', 2.0)
+        recorded.increment('points_returned', 10)
+        recorded.increment('points_returned', 5)
+
+        totals = recorded.get_stage_totals()
+
+        self.assertEqual(2, totals['catalog_lookup']['count'])
+        self.assertGreaterEqual(totals['catalog_lookup']['seconds'], 2.0)
+        self.assertEqual({'points_returned': 15}, recorded.to_dict()['counters'])
+
+    def test_bounded_spans_keep_totals(self):
+        recorded = metrics.Metrics(max_spans=3)
+        for job in range(10):
+            recorded.add_span('pipeline_execute', 1.0, job=job)
+
+        self.assertEqual([7, 8, 9], [span['job'] for span in recorded.to_dict()['spans']])
+        self.assertEqual({'seconds': 10.0, 'count': 10}, recorded.get_stage_totals()['pipeline_execute'])
+        self.assertIn('depfarm_stage_runs_total{stage="pipeline_execute"} 10', recorded.to_prometheus())
+
+        recorded.reset()
+        self.assertEqual(({}, []), (recorded.get_stage_totals(), recorded.to_dict()['spans']))
+
+    def test_null_metrics(self):
+        null = metrics.NULL_METRICS
+        with null.span('catalog_lookup'):
+            null.increment('points_returned')
+
+        self.assertIs(null.span('a'), null.span('b'))
+        self.assertEqual({'spans': [], 'counters': {}}, null.to_dict())
+        self.assertIs(metrics.NULL_METRICS, metrics.get_metrics())
+
+    def test_exports(self):
+        recorded = metrics.Metrics()
+        recorded.add_span('pdal.readers.ept', 1.5)
+        recorded.increment('filters.crop.points', 80)
+
+        with tempfile.TemporaryDirectory() as directory:
+            prometheus_file = os.path.join(directory, 'depfarm.prom')
+            recorded.to_prometheus(prometheus_file)
+            recorded.to_json(os.path.join(directory, 'metrics.json'))
+
+            with open(prometheus_file) as file_handler:
+                text = file_handler.read()
+
+        self.assertIn('depfarm_stage_seconds_total{stage="pdal.readers.ept"} 1.5\n', text)
+        self.assertIn('depfarm_filters_crop_points_total 80\n', text)
+
+    def test_parse_pipeline_log_and_metadata(self):
+        self.assertEqual({'readers.ept': 1.75, 'filters.smrf': 0.75},
+                         metrics.parse_pipeline_log(PIPELINE_LOG))
+        self.assertEqual({'readers.ept': 120, 'filters.crop': 80},
+                         metrics.parse_pipeline_metadata(PIPELINE_METADATA))
+        self.assertEqual({}, metrics.parse_pipeline_metadata('not json'))
+
+    def test_data_fetcher_stages(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher._metrics = metrics.Metrics()
+        fetcher.epsg = '26915'
+        fetcher.pipeline_json = '{}'
+        fetcher.pipeline = type('Pipeline', (), {'execute': lambda self: 4, 'log': PIPELINE_LOG,
+                                                 'metadata': PIPELINE_METADATA,
+                                                 'arrays': [create_pipeline_array(4)]})()
+
+        fetcher.get_data()
+        report = fetcher.get_metrics_report()
+
+        for stage in ['pipeline_execute', 'array_conversion', 'geodataframe_build', 'pdal.readers.ept']:
+            self.assertIn(stage, report['stages'])
+        self.assertEqual(4, report['counters']['points_returned'])
+        self.assertEqual(80, report['counters']['filters.crop.points'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+from depfarm import mosaic
+from depfarm.region_index import RegionCandidate
+
+
+def create_candidate(region: str, year: str) -> RegionCandidate:
+    return RegionCandidate(region, year, f'{region}_{year}/ept.json', (0, 0, 1, 1), 1.0, True)
+
+
+class TestCases(unittest.TestCase):
+    def test_get_year_value(self):
+        self.assertEqual(2012, mosaic.get_year_value('2012'))
+        self.assertEqual(2016, mosaic.get_year_value('2015-2016'))
+        self.assertEqual(-1, mosaic.get_year_value('FullState'))
+
+    def test_order_sources(self):
+        candidates = [create_candidate('IA', 'FullState'), create_candidate('IA_Story', '2019'),
+                      create_candidate('IA_Boone', '2008-2010')]
+
+        newest = mosaic.order_sources(candidates, 'newest')
+        listed = mosaic.order_sources(candidates, ['IA_Boone_2008-2010'])
+
+        self.assertEqual(['IA_Story', 'IA_Boone', 'IA'], [c.region for c in newest])
+        self.assertEqual(['IA_Boone', 'IA', 'IA_Story'], [c.region for c in listed])
+
+    def test_resolve_overlaps(self):
+        points = np.array([[0.5, 0.5, 1], [0.6, 0.5, 1], [0.5, 0.6, 2],
+                           [1.5, 0.5, 2], [2.5, 0.5, 1]], dtype=np.float64)
+        sources = np.array([1, 1, 0, 1, 1])
+
+        keep = mosaic.resolve_overlaps(points, sources, cell_size=1)
+
+        self.assertEqual([False, False, True, True, True], keep.tolist())
+
+    def test_resolve_overlaps_in_degrees(self):
+        # A newer survey covering the western half of a field in EPSG:4326, over an older one covering all of it
+        rng = np.random.default_rng(0)
+        newer = np.column_stack([rng.uniform(-93.756, -93.752, 800), rng.uniform(41.918, 41.921, 800),
+                                 np.zeros(800)])
+        older = np.column_stack([rng.uniform(-93.756, -93.747, 1800), rng.uniform(41.918, 41.921, 1800),
+                                 np.ones(1800)])
+        points = np.concatenate([newer, older])
+        sources = np.repeat([0, 1], [len(newer), len(older)])
+
+        cell_sizes = mosaic.get_cell_sizes(50, '4326', points)
+        keep = mosaic.resolve_overlaps(points, sources, cell_sizes)
+
+        self.assertAlmostEqual(50 / 111319.49, cell_sizes[1], places=9)
+        self.assertAlmostEqual(cell_sizes[1] / np.cos(np.radians(41.9195)), cell_sizes[0], places=9)
+        self.assertTrue(keep[:len(newer)].all())
+        # Older points are only dropped in cells the newer survey covers
+        self.assertTrue(keep[len(newer):][older[:, 0] > -93.752 + cell_sizes[0]].all())
+        self.assertFalse(keep[len(newer):][older[:, 0] < -93.752 - cell_sizes[0]].any())
+
+    def test_get_cell_sizes_projected(self):
+        points = np.zeros((1, 3))
+
+        self.assertEqual((2, 2), mosaic.get_cell_sizes(2, '26915', points))
+        self.assertAlmostEqual(1 / 0.3048006096, mosaic.get_cell_sizes(1, '2236', points)[0], places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import os
+from json import loads
+from concurrent.futures import ThreadPoolExecutor
+from depfarm import pipeline_spec
+from depfarm import data_fetcher
+
+template_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), '3DEP-Farm', 'pipeline_template.json')
+
+
+def get_fetcher(epsg: str = '26915') -> data_fetcher.DataFetcher:
+    fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+    fetcher.load_pipeline_template(template_path)
+    fetcher.epsg = epsg
+    fetcher.file_location = 'ept.json'
+    fetcher.extraction_bounds = '([0, 10],[0, 10])'
+    fetcher.polygon_cropping = 'POLYGON((0 0,0 10,10 10,0 0))'
+
+    return fetcher
+
+
+class TestCases(unittest.TestCase):
+    def test_hash_ignores_option_order(self):
+        first = pipeline_spec.PipelineSpec((pipeline_spec.create_stage(
+            {'type': 'readers.ept', 'bounds': '([0, 1],[0, 1])', 'filename': 'a'}),))
+        second = pipeline_spec.PipelineSpec((pipeline_spec.create_stage(
+            {'filename': 'a', 'bounds': '([0, 1],[0, 1])', 'type': 'readers.ept'}),))
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first.get_hash(), second.get_hash())
+        self.assertIs(first.to_json(), second.to_json())
+
+    def test_hash_depends_on_stage_order_and_types(self):
+        reader = pipeline_spec.create_stage({'type': 'readers.ept'})
+        cropper = pipeline_spec.create_stage({'type': 'filters.crop', 'polygon': ['a', 'b']})
+        mapping = pipeline_spec.create_stage({'type': 'filters.crop', 'polygon': {'a': 'b'}})
+
+        self.assertNotEqual(pipeline_spec.PipelineSpec((reader, cropper)).get_hash(),
+                            pipeline_spec.PipelineSpec((cropper, reader)).get_hash())
+        self.assertNotEqual(cropper, mapping)
+        self.assertNotEqual(pipeline_spec.PipelineSpec((cropper,)).get_hash(),
+                            pipeline_spec.PipelineSpec((mapping,)).get_hash())
+
+    def test_with_options_returns_new_stage(self):
+        reader = pipeline_spec.create_stage({'type': 'readers.ept', 'filename': 'a'})
+
+        changed = reader.with_options(filename='b', resolution=2)
+
+        self.assertEqual('a', reader.get('filename'))
+        self.assertEqual('b', changed.get('filename'))
+        self.assertEqual(2, changed.get('resolution'))
+        self.assertEqual('readers.ept', changed.get_type())
+
+    def test_pipelines_leave_template_untouched(self):
+        fetcher = get_fetcher()
+        fetcher.data_location = 'https://s3-us-west-2.amazonaws.com/usgs-lidar-public/'
+        fetcher.region = 'IA_FullState'
+        template = data_fetcher.load_template_stages(template_path)
+        original = {name: stage.to_dict() for name, stage in template.items()}
+
+        fetcher.get_simple_pipeline_spec('([0, 5],[0, 10])')
+        stages = fetcher.template_stages
+        spec = data_fetcher.PipelineSpec((stages['reader'].with_options(filename='other'),
+                                           stages['tif_writer'].with_options(resolution=5)))
+        spec.to_json()
+
+        self.assertEqual(original, {name: stage.to_dict()
+                         for name, stage in data_fetcher.load_template_stages(template_path).items()})
+        self.assertIs(template['reader'], fetcher.template_stages['reader'])
+
+    def test_simple_pipeline_is_memoized(self):
+        first = get_fetcher().get_simple_pipeline_spec()
+        second = get_fetcher().get_simple_pipeline_spec()
+        other = get_fetcher('4326').get_simple_pipeline_spec()
+
+        self.assertIs(pipeline_spec.compile_pipeline(first),
+                      pipeline_spec.compile_pipeline(second))
+        self.assertNotEqual(first.get_hash(), other.get_hash())
+        self.assertEqual('EPSG:4326', loads(other.to_json())[-1]['out_srs'])
+
+    def test_concurrent_composition(self):
+        def compose(epsg: int) -> str:
+            return get_fetcher(str(epsg)).get_simple_pipeline_spec().to_json()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pipelines = list(executor.map(compose, [26915, 4326] * 50))
+
+        self.assertEqual(2, len(set(pipelines)))
+        self.assertEqual(['EPSG:26915', 'EPSG:4326'] * 50,
+                         [loads(pipeline)[-1]['out_srs'] for pipeline in pipelines])
+
+
+if __name__ == '__main__':
+    unittest.main()
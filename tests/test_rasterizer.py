@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from depfarm import rasterizer
+
+
+def naive_rasterize(points: np.array, bounds: tuple, resolution: float, radius: float) -> dict:
+    height, width = rasterizer.get_raster_shape(bounds, resolution)
+    rasters = {output: np.full((height, width), np.nan) for output in ['min', 'max', 'mean', 'idw', 'count']}
+    for row in range(height):
+        for column in range(width):
+            center = (bounds[0] + (column + 0.5) * resolution, bounds[3] - (row + 0.5) * resolution)
+            distances = np.hypot(points[:, 0] - center[0], points[:, 1] - center[1])
+            values = points[distances <= radius, 2]
+            rasters['count'][row, column] = len(values)
+            if(len(values) > 0):
+                weights = 1 / distances[distances <= radius]
+                rasters['min'][row, column] = values.min()
+                rasters['max'][row, column] = values.max()
+                rasters['mean'][row, column] = values.mean()
+                rasters['idw'][row, column] = (weights * values).sum() / weights.sum()
+
+    return rasters
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 20, (1500, 3))
+        self.points[:, :2] += [1000, 2000]
+
+    def test_rasterize_matches_naive(self):
+        accumulator = rasterizer.rasterize(self.points, 2)
+        expected = naive_rasterize(self.points, accumulator.bounds, 2, 2 * np.sqrt(2))
+
+        for output, raster in expected.items():
+            self.assertTrue(np.allclose(raster, accumulator.get_raster(output), equal_nan=True), output)
+
+    def test_parallel_and_chunked_match(self):
+        serial = rasterizer.rasterize(self.points, 1.5, radius=1)
+        parallel = rasterizer.rasterize(self.points, 1.5, radius=1, max_workers=3)
+        chunked = rasterizer.rasterize_chunks(
+            lambda: (self.points[start:start + 400] for start in range(0, len(self.points), 400)), 1.5, radius=1)
+
+        for output in rasterizer.RASTER_OUTPUTS:
+            self.assertTrue(np.allclose(serial.get_raster(output), parallel.get_raster(output), equal_nan=True))
+            self.assertTrue(np.allclose(serial.get_raster(output), chunked.get_raster(output), equal_nan=True))
+
+    def test_fill_window(self):
+        raster = np.array([[1, np.nan, 3], [np.nan, np.nan, np.nan], [np.nan, np.nan, np.nan]])
+
+        filled = rasterizer.fill_window(raster, 1)
+
+        self.assertEqual(2, filled[0, 1])
+        self.assertTrue(np.isnan(filled[2, 1]))
+        self.assertEqual(1, filled[0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
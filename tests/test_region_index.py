@@ -0,0 +1,65 @@
+import unittest
+import os
+from ast import literal_eval
+import numpy as np
+import pandas as pd
+from depfarm import region_index
+
+catalog_path = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), '3DEP-Farm', 'aws_dataset.csv')
+
+# Small field in Boone County, Iowa (EPSG:3857)
+field_bounds = (-10436953.0, 5148315.0, -10435971.0, 5148823.0)
+
+
+class TestCases(unittest.TestCase):
+    def test_query_matches_linear_scan(self):
+        rng = np.random.default_rng(0)
+        mins = rng.uniform(0, 1000, (500, 2))
+        bounds = np.hstack((mins, mins + rng.uniform(1, 100, (500, 2))))
+        names = [str(i) for i in range(500)]
+        index = region_index.RegionIndex(bounds, names, names, names, node_capacity=4)
+
+        for minx, miny in rng.uniform(0, 1000, (20, 2)):
+            maxx, maxy = minx + 50, miny + 50
+            expected = np.flatnonzero((bounds[:, 0] <= maxx) & (bounds[:, 2] >= minx) &
+                                      (bounds[:, 1] <= maxy) & (bounds[:, 3] >= miny))
+            found = np.sort(index.query_indices(minx, miny, maxx, maxy))
+
+            self.assertEqual(expected.tolist(), found.tolist())
+
+    def test_query_ranked_by_coverage(self):
+        bounds = [[0, 0, 10, 10], [5, 0, 20, 10], [0, 0, 100, 100]]
+        index = region_index.RegionIndex(bounds, ['a', 'b', 'c'], ['1', '2', '3'], ['ua', 'ub', 'uc'])
+
+        candidates = index.query(4, 2, 8, 6)
+
+        self.assertEqual(['a', 'c', 'b'], [c.region for c in candidates])
+        self.assertEqual([1.0, 1.0, 0.75], [c.coverage for c in candidates])
+        self.assertEqual(['a', 'c'], [c.region for c in index.query(4, 2, 8, 6, predicate='contains')])
+
+    def test_catalog_every_year_variant(self):
+        index = region_index.load_region_index(catalog_path)
+
+        candidates = index.query(*field_bounds, predicate='contains')
+        regions = [f'{c.region}_{c.year}' for c in candidates]
+
+        self.assertIn('IA_FullState', regions)
+        self.assertIs(index, region_index.load_region_index(catalog_path))
+
+    def test_catalog_merged_rows_keep_every_variant(self):
+        bounds, _, _, _ = region_index.read_catalog_csv(catalog_path)
+        # CO_DenverDNC and CO_Denver share a single bound in the catalog
+        index = region_index.load_region_index(catalog_path)
+
+        candidates = index.query(-11680000, 4830000, -11679000, 4831000, predicate='contains')
+        urls = [c.access_url for c in candidates]
+
+        self.assertEqual(sum(len(literal_eval(urls)) for urls in pd.read_csv(catalog_path)['Access Url/s']),
+                         len(bounds))
+        self.assertIn('https://usgs-lidar-public.s3.us-west-2.amazonaws.com/CO_DenverDNC_2008/ept.json', urls)
+        self.assertIn('https://usgs-lidar-public.s3.us-west-2.amazonaws.com/CO_Denver_2008/ept.json', urls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import matplotlib
+import numpy as np
+from depfarm import rendering, data_fetcher
+
+matplotlib.use('Agg')
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 20, (3000, 3))
+
+    def test_bin_elevation_matches_naive(self):
+        bounds = (0, 0, 20, 10)
+        points = self.points[self.points[:, 1] <= 10]
+        rendering.BIN_CHUNK_SIZE, chunk_size = 500, rendering.BIN_CHUNK_SIZE
+        self.addCleanup(setattr, rendering, 'BIN_CHUNK_SIZE', chunk_size)
+
+        elevation, cell_size = rendering.bin_elevation(points, bounds, pixels=8)
+
+        self.assertEqual(((4, 8), 2.5), (elevation.shape, cell_size))
+        rows = np.minimum(((10 - points[:, 1]) // 2.5).astype(int), 3)
+        columns = np.minimum((points[:, 0] // 2.5).astype(int), 7)
+        for row, column in [(0, 0), (3, 7), (2, 5)]:
+            inside = (rows == row) & (columns == column)
+            self.assertAlmostEqual(points[inside, 2].mean(), elevation[row, column])
+
+    def test_hillshade(self):
+        slope = np.tile(np.arange(10.0), (10, 1))
+
+        self.assertAlmostEqual(np.sin(np.radians(45)), rendering.get_hillshade(np.zeros((3, 3)), 1)[1, 1])
+        # Rising eastwards, the surface faces west
+        self.assertAlmostEqual(1, rendering.get_hillshade(slope, 1, azimuth=270)[5, 5])
+        self.assertAlmostEqual(0, rendering.get_hillshade(slope, 1, azimuth=90)[5, 5])
+
+    def test_hillshade_of_geographic_cells(self):
+        # A 2% slope rising eastwards, at the latitude of Iowa, with degree cells
+        bounds = (-93.756, 41.918, -93.747, 41.921)
+        cell_size = 0.00005
+        ground_width, ground_height = rendering.get_ground_cell_size(cell_size, '4326', bounds)
+        elevation = np.tile(np.arange(180) * ground_width * 0.02, (60, 1))
+
+        shade = rendering.get_hillshade(elevation, (ground_width, ground_height), azimuth=270)
+
+        self.assertAlmostEqual(cell_size * 111319.49 * np.cos(np.radians(41.9195)), ground_width, places=4)
+        self.assertAlmostEqual(cell_size * 111319.49, ground_height, places=4)
+        self.assertAlmostEqual(np.cos(np.radians(45) - np.arctan(0.02)), shade[30, 90])
+        self.assertEqual((2, 2), rendering.get_ground_cell_size(2, '26915', bounds))
+
+    def test_axis_labels(self):
+        self.assertEqual(('Longitude', 'Latitude'), rendering.get_axis_labels('4326'))
+        self.assertEqual(('Easting (metre)', 'Northing (metre)'), rendering.get_axis_labels('26915'))
+
+    def test_draw_elevation_image(self):
+        import matplotlib.pyplot as plt
+
+        elevation = np.arange(12, dtype=np.float64).reshape(3, 4)
+        elevation[0, 0] = np.nan
+        fig, ax = plt.subplots()
+        self.addCleanup(plt.close, fig)
+
+        mappable = rendering.draw_elevation_image(ax, elevation, 1, (0, 0, 4, 3), classes=3)
+        image = ax.get_images()[0].get_array()
+
+        self.assertEqual((3, 4, 4), image.shape)
+        self.assertEqual(0, image[0, 0, 3])
+        self.assertEqual(1, image[2, 3, 3])
+        self.assertEqual(4, len(mappable.norm.boundaries))
+
+    def test_draw_flat_elevation_image(self):
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots()
+        self.addCleanup(plt.close, fig)
+
+        mappable = rendering.draw_elevation_image(ax, np.full((4, 4), 250.0), 1, (0, 0, 4, 4), classes=5)
+
+        self.assertNotIsInstance(mappable.norm, matplotlib.colors.BoundaryNorm)
+        self.assertTrue(np.all(ax.get_images()[0].get_array()[..., 3] == 1))
+
+    def test_terrain_map_image_skips_geodf(self):
+        fetcher = data_fetcher.DataFetcher.__new__(data_fetcher.DataFetcher)
+        fetcher.cloud_points = self.points
+        fetcher.epsg = '26915'
+
+        plot = fetcher.get_terrain_map(fig_size=(4, 4), render='image', pixels=50)
+        self.addCleanup(plot.close, 'all')
+
+        self.assertEqual((50, 50), plot.gca().get_images()[0].get_array().shape[:2])
+        self.assertFalse(hasattr(fetcher, 'elevation_geodf'))
+        self.assertEqual('Easting (metre)', plot.gca().get_xlabel())
+        with self.assertRaises(ValueError):
+            fetcher.get_scatter_plot(render='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import socket
+import tempfile
+import threading
+from json import dumps, loads
+from http.client import HTTPConnection
+import numpy as np
+from depfarm import service
+
+
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: str) -> None:
+        super().__init__('localhost')
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.order = []
+        runners = {'block': lambda params: self.started.set() or self.release.wait(5) and {},
+                   'record': lambda params: self.order.append(params['name']) or {'name': params['name']}}
+        self.service = service.FetchService(workers=1, max_queued=2, runners=runners, warm=False)
+        self.addCleanup(self.service.close)
+        self.addCleanup(self.release.set)
+
+    def start(self, **options) -> HTTPConnection:
+        server = self.service.create_server(port=0, **options)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(server.shutdown)
+        if('socket_path' in options):
+            return UnixHTTPConnection(options['socket_path'])
+
+        return HTTPConnection('127.0.0.1', server.server_address[1])
+
+    def request(self, connection: HTTPConnection, method: str, path: str, body: dict = None) -> tuple:
+        connection.request(method, path, body=dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        content = response.read()
+        if(response.getheader('Content-Type') == 'application/json'):
+            content = loads(content)
+
+        return response.status, content
+
+    def test_priorities_and_backpressure(self):
+        connection = self.start()
+        self.assertEqual(202, self.request(connection, 'POST', '/jobs', {'type': 'block'})[0])
+        # Waits for the worker to pick the blocking job up, so the next jobs stay queued
+        self.started.wait(5)
+
+        low = self.request(connection, 'POST', '/jobs', {'type': 'record', 'priority': 5,
+                                                         'params': {'name': 'low'}})[1]
+        self.request(connection, 'POST', '/jobs', {'type': 'record', 'priority': 1,
+                                                   'params': {'name': 'high'}})
+        status, _ = self.request(connection, 'POST', '/jobs', {'type': 'record',
+                                                               'params': {'name': 'rejected'}})
+
+        self.assertEqual(503, status)
+        self.assertEqual(2, self.request(connection, 'GET', '/health')[1]['queued'])
+
+        self.release.set()
+        self.service.jobs.get_job(low['id']).done.wait(5)
+
+        self.assertEqual(['high', 'low'], self.order)
+        status, job = self.request(connection, 'GET', f'/jobs/{low["id"]}')
+        self.assertEqual((200, 'done', {'name': 'low'}), (status, job['status'], job['result']))
+        self.assertIn('depfarm_jobs_rejected_total 1', self.request(connection, 'GET', '/metrics')[1].decode())
+
+    def test_invalid_and_failed_jobs(self):
+        connection = self.start()
+
+        self.assertEqual(400, self.request(connection, 'POST', '/jobs', {'type': 'unknown'})[0])
+        status, job = self.request(connection, 'POST', '/jobs', {'type': 'sample', 'wait': True,
+                                                                 'params': {'input': 'missing.npy'}})
+        self.assertEqual((200, 'failed'), (status, job['status']))
+        self.assertEqual(404, self.request(connection, 'GET', '/jobs/missing')[0])
+
+    def test_sample_job_over_unix_socket(self):
+        points = np.random.default_rng(0).uniform(0, 100, (5000, 3))
+        with tempfile.TemporaryDirectory() as directory:
+            np.save(os.path.join(directory, 'points.npy'), points)
+            connection = self.start(socket_path=os.path.join(directory, 'service.sock'))
+
+            status, inline = self.request(connection, 'POST', '/jobs', {
+                'type': 'sample', 'wait': True,
+                'params': {'input': os.path.join(directory, 'points.npy'), 'method': 'grid', 'size': 25}})
+            status, written = self.request(connection, 'POST', '/jobs', {
+                'type': 'sample', 'wait': True,
+                'params': {'input': os.path.join(directory, 'points.npy'), 'method': 'distance', 'size': 10,
+                           'output': os.path.join(directory, 'sampled.npy')}})
+            sampled = np.load(os.path.join(directory, 'sampled.npy'))
+
+        self.assertEqual(200, status)
+        self.assertEqual('done', inline['status'])
+        self.assertEqual(inline['result']['count'], len(inline['result']['points']))
+        self.assertEqual(written['result']['count'], len(sampled))
+        self.assertNotIn('points', written['result'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from depfarm import shared_cloud, rasterizer
+
+
+def sum_shared_points(descriptor: shared_cloud.SharedCloudDescriptor) -> float:
+    cloud = shared_cloud.SharedPointCloud.attach(descriptor)
+    try:
+        total = float(cloud.points.sum())
+        cloud.points[0] = -1
+    finally:
+        cloud.close()
+
+    return total
+
+
+def make_points(count: int) -> np.array:
+    return np.full((count, 3), count, dtype=np.float32)
+
+
+def segment_exists(name: str) -> bool:
+    # Attaching works on every platform, unlike looking for the segment under /dev/shm
+    try:
+        shared_cloud.attach_shared_memory(name).close()
+    except FileNotFoundError:
+        return False
+
+    return True
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 20, (1500, 3))
+
+    def test_attach_in_worker_process(self):
+        with shared_cloud.SharedPointCloud.from_array(self.points) as cloud:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                total = executor.submit(sum_shared_points, cloud.descriptor).result()
+
+            self.assertAlmostEqual(self.points.sum(), total)
+            # Writes of the worker are visible without copying back
+            self.assertTrue(np.array_equal([-1, -1, -1], cloud.points[0]))
+            name = cloud.segment.name
+
+        self.assertFalse(segment_exists(name))
+        with self.assertRaises(ValueError):
+            cloud.points
+
+    @unittest.skipUnless(shared_cloud.SHARED_HANDOFF, 'Segments do not outlive their handles on this platform')
+    def test_publish_and_take_points(self):
+        shared_cloud.start_resource_tracker()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            descriptors = list(executor.map(shared_cloud.run_and_publish, [make_points] * 3, [2, 0, 3]))
+
+        points = shared_cloud.take_points(descriptors)
+
+        self.assertEqual((5, 3), points.shape)
+        self.assertEqual(np.float32, points.dtype)
+        self.assertEqual([2, 2, 3, 3, 3], points[:, 0].tolist())
+        self.assertFalse(any(segment_exists(descriptor.name) for descriptor in descriptors))
+
+    @unittest.skipUnless(shared_cloud.SHARED_HANDOFF, 'Segments do not outlive their handles on this platform')
+    def test_discard_points(self):
+        descriptors = [shared_cloud.publish_points(make_points(2)) for _ in range(2)]
+        shared_cloud.take_points(descriptors[:1])
+
+        shared_cloud.discard_points(descriptors)
+
+        self.assertFalse(any(segment_exists(descriptor.name) for descriptor in descriptors))
+
+    @unittest.skipUnless(shared_cloud.SHARED_HANDOFF, 'Segments do not outlive their handles on this platform')
+    def test_taken_points_unregistered_once(self):
+        unregistered = []
+        unregister = shared_cloud.resource_tracker.unregister
+
+        def record_unregister(name, rtype):
+            unregistered.append(name)
+            unregister(name, rtype)
+
+        shared_cloud.resource_tracker.unregister = record_unregister
+        self.addCleanup(setattr, shared_cloud.resource_tracker, 'unregister', unregister)
+        descriptors = [shared_cloud.publish_points(make_points(2)) for _ in range(3)]
+
+        shared_cloud.take_points(descriptors[:2])
+        shared_cloud.discard_points(descriptors)
+
+        # Whether unlink unregisters the segment itself depends on the Python version, never both
+        self.assertEqual(sorted('/' + descriptor.name for descriptor in descriptors), sorted(unregistered))
+
+    def test_rasterize_shared_cloud(self):
+        serial = rasterizer.rasterize(self.points, 1.5, radius=1)
+        with rasterizer.SharedPointCloud.from_array(self.points) as cloud:
+            parallel = rasterizer.rasterize(cloud, 1.5, radius=1, max_workers=2)
+            self.assertTrue(segment_exists(cloud.segment.name))
+
+        for output in rasterizer.RASTER_OUTPUTS:
+            self.assertTrue(np.allclose(serial.get_raster(output), parallel.get_raster(output), equal_nan=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from depfarm import streaming, subsampler
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 10, (1000, 3))
+        self.batches = list(subsampler.iter_array_chunks(self.points, 97))
+
+    def test_factor_sample_stream(self):
+        sampled = np.concatenate(
+            list(streaming.factor_sample_stream(self.batches, 7)))
+
+        self.assertTrue(np.array_equal(self.points[::7], sampled))
+
+    def test_grid_sample_stream(self):
+        expected = subsampler.grid_subsample(self.points, 2)[1]
+
+        sampled = streaming.grid_sample_stream(
+            iter(self.batches), 2, 'closest', chunk_size=50)
+
+        self.assertTrue(np.array_equal(expected, sampled))
+
+    def test_spool_stream_removes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with streaming.spool_stream(iter(self.batches), directory) as points:
+                self.assertTrue(np.array_equal(self.points, points))
+                self.assertEqual(1, len(os.listdir(directory)))
+            with self.assertRaises(RuntimeError):
+                with streaming.spool_stream(iter(self.batches), directory):
+                    raise RuntimeError('Failed consuming the spooled points')
+            with streaming.spool_stream(iter([]), directory) as points:
+                self.assertEqual((0, 3), points.shape)
+
+            self.assertEqual([], os.listdir(directory))
+
+    def test_save_stream(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'points.xyz')
+
+            count = streaming.save_stream(iter(self.batches), file_name)
+
+            self.assertEqual(1000, count)
+            self.assertTrue(np.allclose(self.points, np.loadtxt(file_name, delimiter=';')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import laspy
+from depfarm import subsampler
+
+
+def naive_grid_subsampling(points: np.array, voxel_size: float) -> tuple:
+    keys = ((points - np.min(points, axis=0)) // voxel_size).astype(int)
+    barycenters, closest = [], []
+    for key in np.unique(keys, axis=0):
+        voxel = points[(keys == key).all(axis=1)]
+        barycenter = voxel.mean(axis=0)
+        barycenters.append(barycenter)
+        closest.append(voxel[np.linalg.norm(voxel - barycenter, axis=1).argmin()])
+
+    return np.array(barycenters), np.array(closest)
+
+
+def naive_distance_subsampling(points: np.array, radius: float, order: np.array) -> np.array:
+    kept = []
+    for index in order:
+        if(all(np.linalg.norm(points[index] - points[other]) >= radius for other in kept)):
+            kept.append(index)
+
+    return np.sort(np.array(kept))
+
+
+class TestCases(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(0).uniform(0, 10, (2000, 3))
+
+    def test_grid_subsample_matches_naive(self):
+        barycenters, closest = subsampler.grid_subsample(self.points, 2.5)
+        expected_barycenters, expected_closest = naive_grid_subsampling(
+            self.points, 2.5)
+
+        self.assertTrue(np.allclose(expected_barycenters, barycenters))
+        self.assertTrue(np.array_equal(expected_closest, closest))
+
+    def test_grid_subsample_chunked_matches_in_memory(self):
+        barycenters, closest = subsampler.grid_subsample(self.points, 1.5)
+        chunked_barycenters, chunked_closest = subsampler.grid_subsample_chunked(
+            lambda: subsampler.iter_array_chunks(self.points, 123), 1.5)
+
+        self.assertTrue(np.allclose(barycenters, chunked_barycenters))
+        self.assertTrue(np.array_equal(closest, chunked_closest))
+
+    def test_get_grid_subsampling(self):
+        sampler = subsampler.CloudSubSampler(self.points)
+
+        closest = sampler.get_grid_subsampling(5, 'closest')
+        barycenters = sampler.get_grid_subsampling(5, 'barycenter_sample')
+
+        self.assertIsInstance(closest, np.ndarray)
+        self.assertEqual((8, 3), closest.shape)
+        self.assertEqual((8, 3), barycenters.shape)
+
+    def test_distance_subsample_matches_naive(self):
+        points = self.points[:400]
+        for batch_size in [1, 7, 65536]:
+            kept = subsampler.distance_subsample(points, 2.0, batch_size)
+            self.assertTrue(np.array_equal(
+                naive_distance_subsampling(points, 2.0, np.arange(len(points))), kept))
+
+        order = np.random.default_rng(3).permutation(len(points))
+        self.assertTrue(np.array_equal(naive_distance_subsampling(points, 2.0, order),
+                                       subsampler.distance_subsample(points, 2.0, 50, seed=3)))
+
+    def test_distance_subsample_dense_cells(self):
+        # Far more candidates in a voxel than max_pairs allows, accepted half by half
+        points = np.random.default_rng(0).uniform(0, 1, (20000, 3))
+        kept = subsampler.distance_subsample(points, 5.0)
+
+        self.assertEqual([0], kept.tolist())
+
+        points = self.points[:400]
+        origin, grid_shape, key_offsets = subsampler.get_distance_grid(
+            points.min(axis=0), points.max(axis=0), 2.0)
+        keys = subsampler.get_voxel_keys(points, origin, grid_shape, 2.0)
+        accepted = subsampler.accept_distance_candidates(points, keys, np.zeros((0, 3)), np.zeros(0, dtype=np.int64),
+                                                         key_offsets, 2.0, max_pairs=10)
+
+        self.assertTrue(np.array_equal(naive_distance_subsampling(
+            points, 2.0, np.arange(len(points))), np.sort(accepted)))
+
+    def test_distance_subsample_chunked_matches_in_memory(self):
+        kept = self.points[subsampler.distance_subsample(self.points, 1.5, 100)]
+        chunked = subsampler.distance_subsample_chunked(
+            lambda: subsampler.iter_array_chunks(self.points, 123), 1.5, 100)
+
+        self.assertTrue(np.array_equal(kept, chunked))
+        distances = np.linalg.norm(kept[:, None] - kept[None], axis=2)
+        self.assertGreaterEqual(distances[~np.eye(len(kept), dtype=bool)].min(), 1.5)
+
+    def write_las(self, directory: str) -> str:
+        file_name = os.path.join(directory, 'points.las')
+        header = laspy.LasHeader(point_format=3, version='1.2')
+        header.scales = [0.001, 0.001, 0.001]
+        header.offsets = [100, 200, 0]
+        las = laspy.LasData(header)
+        las.x, las.y, las.z = self.points[:, 0] + 100, self.points[:, 1] + 200, self.points[:, 2]
+        las.write(file_name)
+
+        return file_name
+
+    def test_iter_las_chunks_mmap_and_reader(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = self.write_las(directory)
+
+            mapped = list(subsampler.iter_las_chunks(file_name, 300))
+            read = list(subsampler.iter_las_chunks(file_name, 300, use_mmap=False))
+
+            self.assertEqual([300, 300, 300, 300, 300, 300, 200], [len(chunk) for chunk in mapped])
+            self.assertTrue(np.allclose(np.concatenate(mapped), np.concatenate(read)))
+            self.assertTrue(np.allclose(self.points[:, 0] + 100, np.concatenate(mapped)[:, 0], atol=1e-3))
+
+    def test_chunked_file_sampling_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = self.write_las(directory)
+            in_memory = subsampler.CloudSubSampler(file_name=file_name)
+            streaming = subsampler.CloudSubSampler(file_name=file_name, chunk_size=128)
+
+            self.assertTrue(streaming.is_streaming())
+            self.assertTrue(np.allclose(in_memory.get_factor_subsampling(9),
+                                        streaming.get_factor_subsampling(9)))
+            self.assertTrue(np.allclose(in_memory.get_grid_subsampling(3),
+                                        streaming.get_grid_subsampling(3)))
+            self.assertFalse(hasattr(streaming, 'points'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from depfarm import tiled_fetch
+
+
+def constant_worker(pipeline_json: str, dtype: type) -> np.array:
+    return np.full((2, 3), float(pipeline_json), dtype=dtype)
+
+
+class TestCases(unittest.TestCase):
+    def test_split_bounds_grid(self):
+        tiles = tiled_fetch.split_bounds(0, 0, 10, 4, grid=(2, 2))
+
+        self.assertEqual(4, len(tiles))
+        self.assertEqual((0.0, 0.0, 5.0, 2.0, False, False), tiles[0])
+        self.assertEqual((5.0, 2.0, 10.0, 4.0, True, True), tiles[-1])
+
+    def test_split_bounds_tile_size(self):
+        tiles = tiled_fetch.split_bounds(0, 0, 10, 4, tile_size=3)
+
+        self.assertEqual(4 * 2, len(tiles))
+
+    def test_tile_range_filter_half_open(self):
+        tiles = tiled_fetch.split_bounds(0, 0, 10, 4, grid=(2, 1))
+
+        self.assertEqual('X[0.0:5.0),Y[0.0:4.0]',
+                         tiled_fetch.get_tile_range_filter(tiles[0])['limits'])
+        self.assertEqual('X[5.0:10.0],Y[0.0:4.0]',
+                         tiled_fetch.get_tile_range_filter(tiles[1])['limits'])
+        self.assertEqual('([5.0, 10.0],[0.0, 4.0])',
+                         tiled_fetch.get_tile_bounds(tiles[1]))
+
+    def test_fetch_tiles_merges_in_order(self):
+        points = tiled_fetch.fetch_tiles(
+            constant_worker, ['1', '2', '3'], max_workers=2, dtype=np.float32)
+
+        self.assertEqual(np.float32, points.dtype)
+        self.assertEqual([1, 1, 2, 2, 3, 3], points[:, 0].tolist())
+
+    def test_fetch_without_shared_handoff(self):
+        # Platforms destroying a segment with its last handle get the points pickled back instead
+        handoff = tiled_fetch.SHARED_HANDOFF
+        tiled_fetch.SHARED_HANDOFF = False
+        self.addCleanup(setattr, tiled_fetch, 'SHARED_HANDOFF', handoff)
+
+        points = tiled_fetch.fetch_tiles(
+            constant_worker, ['1', '2'], max_workers=2, dtype=np.float32)
+        pipelines = tiled_fetch.fetch_pipelines(constant_worker, ['3'], max_workers=1, dtype=np.float32)
+
+        self.assertEqual([1, 1, 2, 2], points[:, 0].tolist())
+        self.assertEqual([[3, 3, 3]] * 2, pipelines[0].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,52 @@
 import unittest
-from depfarm import utilities
+from depfarm import utilities, catalog
 import os
+import json
+import tempfile
+import threading
+from ast import literal_eval
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 file_names = ['AK_BrooksCamp_2012/\n', 'AK_Coastal_2009/\n']
 
+package_path = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), '3DEP-Farm')
+
 get_info_1 = ([-17347360, 8065364, -12414, -
               17321558, 8091166, 13388], 529285317)
 get_info_2 = ([-15730544, 10937407, -19027, -
               15691854, 10976097, 19663], 55711772)
 
 
+class EptStandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the AWS storage, answering every ept.json request with fake bounds and points,
+    and failing the first request of flaky folders."""
+    protocol_version = 'HTTP/1.1'
+    failed = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        folder = self.path.strip('/').split('/')[0]
+        with self.lock:
+            fail = folder.startswith('Flaky') and folder not in self.failed
+            self.failed.add(folder)
+
+        if(fail):
+            body, status = b'{}', 503
+        else:
+            index = int(folder.split('_')[-1][-1])
+            body, status = json.dumps({'bounds': [index] * 6, 'points': index}).encode(), 200
+
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
 class TestCases(unittest.TestCase):
     def test_get_info_1(self):
         value = utilities.get_info('https://s3-us-west-2.amazonaws.com/usgs-lidar-public/' +
@@ -23,6 +60,66 @@ class TestCases(unittest.TestCase):
 
         self.assertEqual(get_info_2, value)
 
+    def test_construct_aws_dataset_json_concurrently(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), EptStandInHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        folders = ['AK_Coastal_2009/', 'Flaky_Region_2011/', 'AK_Coastal_2012/', 'USGS_LPC_IA_2016_LAS_2018/']
+        with tempfile.TemporaryDirectory() as directory:
+            directories_path = os.path.join(directory, 'filename.txt')
+            with open(directories_path, 'w') as file_handler:
+                file_handler.write('\n'.join(folders) + '\n')
+
+            dataset = utilities.construct_aws_dataset_json(
+                directories_path, main_url=f'http://127.0.0.1:{server.server_port}/',
+                max_connections=4, requests_per_second=1000, backoff=0.01)
+
+        server.shutdown()
+        server.server_close()
+
+        self.assertEqual(['2009', '2012'], dataset['AK_Coastal']['years'])
+        self.assertEqual([[9] * 6, [2] * 6], dataset['AK_Coastal']['bounds'])
+        self.assertEqual([9, 2], dataset['AK_Coastal']['points'])
+        self.assertEqual(['2011'], dataset['Flaky_Region']['years'])
+        self.assertEqual(['2016-2018'], dataset['USGS_LPC_IA']['years'])
+
+    def test_build_binary_catalog_round_trip(self):
+        aws_dataset_df = pd.read_csv(os.path.join(package_path, 'aws_dataset.csv'))
+        directories_path = os.path.join(package_path, 'filename.txt')
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'aws_dataset.catalog')
+            self.addCleanup(catalog._loaded_catalogs.pop, os.path.abspath(file_name), None)
+
+            utilities.build_binary_catalog(aws_dataset_df, file_name, directories_path)
+            built = catalog.load_catalog(file_name)
+
+            # Every access url of every CSV row is a catalog row, in order. Rows merged by merge_similar_bounds
+            # hold a single bound shared by their variants
+            rows = []
+            for _, row in aws_dataset_df.iterrows():
+                row_bounds, row_urls = literal_eval(row['Bound/s']), literal_eval(row['Access Url/s'])
+                row_bounds += [row_bounds[-1]] * (len(row_urls) - len(row_bounds))
+                rows += [(row['Region/s'], bound, year, access_url) for bound, year, access_url in zip(
+                    row_bounds, literal_eval(row['Year/s']), row_urls)]
+            self.assertEqual(sum(len(literal_eval(urls)) for urls in aws_dataset_df['Access Url/s']), len(built))
+            self.assertEqual(len(rows), len(built))
+            self.assertIn('https://usgs-lidar-public.s3.us-west-2.amazonaws.com/CO_Denver_2008/ept.json',
+                          built.access_urls.to_list())
+            self.assertEqual([row[0] for row in rows], built.regions.to_list())
+            self.assertEqual([row[1] for row in rows], built.bounds.tolist())
+            self.assertEqual([row[2] for row in rows], built.years.to_list())
+            self.assertEqual([row[3] for row in rows], built.access_urls.to_list())
+            self.assertEqual([-1] * len(rows), built.points.tolist())
+            with open(directories_path, 'r') as locations:
+                self.assertEqual([location.strip().strip('/') for location in locations if location.strip() != ''],
+                                 built.folders.to_list())
+
+            del built
+
+            # The shipped catalog is up to date with the shipped CSV
+            with open(file_name, 'rb') as rebuilt, open(os.path.join(package_path, 'aws_dataset.catalog'), 'rb') as shipped:
+                self.assertTrue(rebuilt.read() == shipped.read())
+
 
 if __name__ == '__main__':
     unittest.main()